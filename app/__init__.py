@@ -1,9 +1,22 @@
 # app/__init__.py
+import click
 from flask import Flask
 
 from app.route.routes import register_routes
-from app.config import AUTH_TOKEN
+from app.config import AUTH_TOKEN, CACHE_SWEEP_INTERVAL, PREWARM_AT, SERVER_TIMING
 from app.middleware.auth import register_auth_middleware
+from app.middleware.timing import register_timing_middleware
+from app.services.cache import init_db
+from app.services.prewarm import start_prewarm_scheduler
+from app.services.sweeper import purge_expired_cache, start_cache_sweeper
+
+
+def register_commands(app: Flask) -> None:
+    @app.cli.command("purge-cache")
+    def purge_cache_command():
+        """Delete cached menus dated before today."""
+        deleted = purge_expired_cache()
+        click.echo(f"Deleted {deleted} expired menu(s).")
 
 
 def create_app() -> Flask:
@@ -18,5 +31,13 @@ def create_app() -> Flask:
 
     register_routes(app)
     register_auth_middleware(app)
+    register_timing_middleware(app, server_timing=SERVER_TIMING)
+    register_commands(app)
+
+    init_db()
+    # Queued jobs are resumed by the serving entry points (main.py, the ASGI
+    # lifespan), not here: CLI commands and imports must not run extractions.
+    start_cache_sweeper(CACHE_SWEEP_INTERVAL)
+    start_prewarm_scheduler(PREWARM_AT)
 
     return app
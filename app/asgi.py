@@ -0,0 +1,113 @@
+# app/asgi.py
+import asyncio
+import json
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import Flask
+
+from app.services.async_db import run_db
+from app.services.async_http import close_async_clients
+from app.domain.responses import negotiate
+from app.services.async_menu_service import handle_menu_request_async
+from app.services.jobs import resume_pending_jobs
+from app.services.menu_service import cached_menu_response
+
+
+async def _read_json(receive) -> dict:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    try:
+        payload = json.loads(b"".join(chunks) or b"{}")
+    except ValueError:
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+async def _send_json(send, body: dict, status: int) -> None:
+    data = json.dumps(body).encode("utf-8")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(data)).encode("ascii")),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": data})
+
+
+async def _send_bytes(send, status: int, body: bytes, headers: dict) -> None:
+    raw_headers = [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in headers.items()
+    ]
+    raw_headers.append((b"content-length", str(len(body)).encode("ascii")))
+    await send(
+        {"type": "http.response.start", "status": status, "headers": raw_headers}
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _lifespan(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await asyncio.to_thread(resume_pending_jobs)
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await close_async_clients()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+def create_asgi_app(flask_app: Flask):
+    """Serve POST /api/menu natively on the event loop; delegate the rest to Flask."""
+    wsgi_app = WsgiToAsgi(flask_app)
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            await _lifespan(receive, send)
+            return
+
+        if not (
+            scope["type"] == "http"
+            and scope["path"] == "/api/menu"
+            and scope["method"] == "POST"
+        ):
+            await wsgi_app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        expected = flask_app.config.get("AUTH_TOKEN")
+        if expected and not flask_app.testing:
+            token = headers.get(b"auth_token", b"").decode("latin-1")
+            if token != expected:
+                await _send_json(send, {"error": "Invalid or missing AUTH_TOKEN"}, 401)
+                return
+
+        payload = await _read_json(receive)
+        encoded = await run_db(
+            cached_menu_response, payload.get("url"), payload.get("date")
+        )
+        if encoded is not None:
+            status, body, response_headers = negotiate(
+                encoded,
+                headers.get(b"accept-encoding", b"").decode("latin-1") or None,
+                headers.get(b"if-none-match", b"").decode("latin-1") or None,
+            )
+            await _send_bytes(send, status, body, response_headers)
+            return
+
+        body, status = await handle_menu_request_async(
+            url=payload.get("url"),
+            date_str=payload.get("date"),
+        )
+        await _send_json(send, body, status)
+
+    return app
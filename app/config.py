@@ -14,3 +14,123 @@ if not OPENAI_API_KEY:
     raise RuntimeError("OPENAI_API_KEY is missing in .env file")
 
 AUTH_TOKEN = os.getenv("AUTH_TOKEN")
+
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", "8"))
+
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "8"))
+SQLITE_BUSY_TIMEOUT = float(os.getenv("SQLITE_BUSY_TIMEOUT", "5"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(64 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "8192"))
+
+# How often the background sweeper checks whether the day has rolled over and
+# expired cache rows should be purged. 0 disables the thread (use the CLI).
+CACHE_SWEEP_INTERVAL = int(os.getenv("CACHE_SWEEP_INTERVAL", "3600"))
+
+# Size of the in-process LRU in front of SQLite; 0 disables it.
+MEMORY_CACHE_MAX_ENTRIES = int(os.getenv("MEMORY_CACHE_MAX_ENTRIES", "1024"))
+
+# Cross-process single-flight: how long an extraction lease lives before other
+# workers may take over, and how often waiters poll for the leader's result.
+EXTRACTION_LEASE_TTL = float(os.getenv("EXTRACTION_LEASE_TTL", "300"))
+EXTRACTION_LEASE_POLL = float(os.getenv("EXTRACTION_LEASE_POLL", "0.5"))
+
+# Extract the whole week of a page in one LLM call and reuse it for every date
+# as long as the page text is unchanged.
+WEEKLY_EXTRACTION = os.getenv("WEEKLY_EXTRACTION", "1").lower() not in ("0", "false")
+
+FETCH_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", "15"))
+FETCH_POOL_SIZE = int(os.getenv("FETCH_POOL_SIZE", "4"))
+FETCH_USER_AGENT = os.getenv(
+    "FETCH_USER_AGENT", "Mozilla/5.0 (compatible; MenuScraper/1.0)"
+)
+
+# "local" extracts in one LLM round trip and normalizes prices in Python;
+# "tool" lets the model call the normalize_prices tool (two round trips).
+LLM_PRICE_MODE = os.getenv("LLM_PRICE_MODE", "local")
+
+# Page text sent to the LLM is reduced to the requested day's section plus this
+# many characters of page header, and capped at PROMPT_TEXT_LIMIT characters.
+PROMPT_CONTEXT_CHARS = int(os.getenv("PROMPT_CONTEXT_CHARS", "500"))
+PROMPT_TEXT_LIMIT = int(os.getenv("PROMPT_TEXT_LIMIT", "15000"))
+SCRAPED_TEXT_LIMIT = int(os.getenv("SCRAPED_TEXT_LIMIT", "200000"))
+
+# HTML parser backend: "auto" picks selectolax, then lxml, then html.parser.
+HTML_PARSER = os.getenv("HTML_PARSER", "auto")
+# Downloads are streamed and cut off after this many bytes.
+FETCH_MAX_BYTES = int(os.getenv("FETCH_MAX_BYTES", str(2 * 1024 * 1024)))
+
+# Pre-warming of subscribed restaurants: daily local time ("HH:MM", empty to
+# disable the in-process scheduler), whether to also fill the rest of the
+# working week, how many restaurants run at once and how many start per minute.
+PREWARM_AT = os.getenv("PREWARM_AT", "")
+PREWARM_WEEK = os.getenv("PREWARM_WEEK", "0").lower() not in ("0", "false")
+PREWARM_CONCURRENCY = int(os.getenv("PREWARM_CONCURRENCY", "4"))
+PREWARM_RATE_PER_MINUTE = float(os.getenv("PREWARM_RATE_PER_MINUTE", "30"))
+
+# Client-side limits for LLM calls, kept just under the account's quota. Zero
+# disables a limit. Throttled (429) and 5xx answers are retried with backoff.
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "60"))
+# Time after the first attempt within which a call may still be retried. Keep
+# it well below EXTRACTION_LEASE_TTL: the last attempt must finish before the
+# lease runs out and another worker starts the same extraction.
+LLM_RETRY_BUDGET = float(os.getenv("LLM_RETRY_BUDGET", str(EXTRACTION_LEASE_TTL / 2)))
+
+# Any OpenAI-compatible chat-completions server can be used, e.g. the local stub
+# in benchmarks/llm_stub_server.py for offline load tests.
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://api.openai.com/v1")
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4.1-mini")
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+
+# Add a Server-Timing header with per-stage durations to API responses.
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0").lower() not in ("0", "false")
+
+# Background extraction jobs (POST /api/menu/jobs): worker threads per process,
+# how often status streams poll the job row, and how long a stream stays open.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "0.25"))
+JOB_STREAM_TIMEOUT = float(os.getenv("JOB_STREAM_TIMEOUT", "300"))
+
+# Per-host fetch protection: a circuit opens after FETCH_BREAKER_THRESHOLD
+# consecutive failures and stays open for FETCH_BREAKER_COOLDOWN seconds, failed
+# URLs are not retried for FETCH_NEGATIVE_TTL seconds, at most
+# FETCH_HOST_CONCURRENCY downloads run per host, and read timeouts adapt to the
+# host's latency between FETCH_MIN_TIMEOUT and FETCH_TIMEOUT.
+FETCH_BREAKER_THRESHOLD = int(os.getenv("FETCH_BREAKER_THRESHOLD", "3"))
+FETCH_BREAKER_COOLDOWN = float(os.getenv("FETCH_BREAKER_COOLDOWN", "60"))
+FETCH_NEGATIVE_TTL = float(os.getenv("FETCH_NEGATIVE_TTL", "60"))
+FETCH_HOST_CONCURRENCY = int(os.getenv("FETCH_HOST_CONCURRENCY", "2"))
+FETCH_MIN_TIMEOUT = float(os.getenv("FETCH_MIN_TIMEOUT", "2"))
+FETCH_CONNECT_TIMEOUT = float(os.getenv("FETCH_CONNECT_TIMEOUT", "5"))
+
+# Page sizes for GET /api/menus/search.
+SEARCH_DEFAULT_LIMIT = int(os.getenv("SEARCH_DEFAULT_LIMIT", "50"))
+SEARCH_MAX_LIMIT = int(os.getenv("SEARCH_MAX_LIMIT", "200"))
+
+# Learned per-page extraction templates: try them before calling the LLM, and
+# learn one only when at least this share of the LLM's dishes was located.
+TEMPLATE_EXTRACTION = os.getenv("TEMPLATE_EXTRACTION", "1").lower() not in (
+    "0",
+    "false",
+)
+TEMPLATE_MIN_COVERAGE = float(os.getenv("TEMPLATE_MIN_COVERAGE", "0.8"))
+
+# Offline bulk extraction (prewarm.py --bulk) through a batch-job API: "openai"
+# uses the Batch API of LLM_BASE_URL, "local" a file-based stand-in under
+# LLM_BATCH_DIR that answers each request from the chat-completions endpoint.
+LLM_BATCH_BACKEND = os.getenv("LLM_BATCH_BACKEND", "openai")
+LLM_BATCH_DIR = Path(os.getenv("LLM_BATCH_DIR", str(BASE_DIR / "batches")))
+LLM_BATCH_POLL_INTERVAL = float(os.getenv("LLM_BATCH_POLL_INTERVAL", "30"))
+LLM_BATCH_TIMEOUT = float(os.getenv("LLM_BATCH_TIMEOUT", str(24 * 3600)))
+
+# Menu store behind the in-process LRU: "sqlite" (DB_PATH, one per node),
+# "memory" (per process) or "redis" (any Redis-protocol server at
+# CACHE_REDIS_URL, shared by every node).
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "sqlite")
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_REDIS_TIMEOUT = float(os.getenv("CACHE_REDIS_TIMEOUT", "1"))
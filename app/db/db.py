@@ -1,77 +1,860 @@
 # app/db/db.py
+import os
+import re
 import sqlite3
 import json
+import threading
+import time
+import zlib
+from contextlib import contextmanager
 from datetime import datetime, timezone
+from typing import Iterator
 
-from app.config import DB_PATH
+from app.config import (
+    DB_PATH,
+    SQLITE_BUSY_TIMEOUT,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_MMAP_SIZE,
+    SQLITE_POOL_SIZE,
+)
+from app.domain.responses import EncodedMenu, encode_menu_response
+from app.metrics import timed
+
+_pool_lock = threading.Lock()
+_pool: dict[str, list[sqlite3.Connection]] = {}
+_pool_pid: int | None = None
+
+# Whether this SQLite build has FTS5; search falls back to LIKE without it.
+fts_available = True
+
+SELECT_MENU_SQL = """
+    SELECT menu_blob
+    FROM menus
+    WHERE url = ? AND date = ?
+"""
+
+SELECT_RESPONSE_SQL = """
+    SELECT etag, response_gzip, response_br
+    FROM menus
+    WHERE url = ? AND date = ?
+"""
+
+SAVE_MENU_SQL = """
+    INSERT INTO menus
+        (url, date, restaurant_name, day_of_week, daily_menu, item_count,
+         menu_blob, etag, response_gzip, response_br, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SAVE_ITEM_SQL = """
+    INSERT INTO menu_items (menu_id, position, category, name, price, weight)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+SAVE_ALLERGEN_SQL = """
+    INSERT OR IGNORE INTO menu_item_allergens (item_id, allergen) VALUES (?, ?)
+"""
+
+# Items and allergens go with their menu through ON DELETE CASCADE.
+DELETE_OLD_SQL = "DELETE FROM menus WHERE date < ?"
+
+DELETE_OLD_EXTRACTIONS_SQL = "DELETE FROM extraction_cache WHERE date < ?"
+
+DELETE_OLD_JOBS_SQL = "DELETE FROM menu_jobs WHERE date < ?"
+
+SELECT_EXTRACTION_SQL = """
+    SELECT menu_json
+    FROM extraction_cache
+    WHERE content_hash = ? AND date = ?
+"""
+
+SAVE_EXTRACTION_SQL = """
+    INSERT OR REPLACE INTO extraction_cache (content_hash, date, menu_json, created_at)
+    VALUES (?, ?, ?, ?)
+"""
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        path,
+        timeout=SQLITE_BUSY_TIMEOUT,
+        check_same_thread=False,
+        cached_statements=256,
+    )
+    # WAL lets readers proceed while a writer holds the lock; NORMAL sync is
+    # durable across application crashes, which is all a cache needs.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute(f"PRAGMA mmap_size={int(SQLITE_MMAP_SIZE)}")
+    conn.execute(f"PRAGMA cache_size=-{int(SQLITE_CACHE_SIZE_KB)}")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+@contextmanager
+def get_connection() -> Iterator[sqlite3.Connection]:
+    """Borrow a pooled connection to DB_PATH for the duration of the block."""
+    global _pool_pid
+
+    path = str(DB_PATH)
+    with _pool_lock:
+        if _pool_pid != os.getpid():
+            # Connections must not be shared with a forked child (gunicorn workers).
+            _pool.clear()
+            _pool_pid = os.getpid()
+        idle = _pool.setdefault(path, [])
+        conn = idle.pop() if idle else None
+
+    if conn is None:
+        conn = _connect(path)
+
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        with _pool_lock:
+            idle = _pool.setdefault(path, [])
+            if len(idle) < SQLITE_POOL_SIZE:
+                idle.append(conn)
+                conn = None
+        if conn is not None:
+            conn.close()
+
+
+def close_connections() -> None:
+    """Close every idle pooled connection."""
+    with _pool_lock:
+        for idle in _pool.values():
+            for conn in idle:
+                conn.close()
+        _pool.clear()
 
 
 def init_db() -> None:
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS menu_cache (
-            url TEXT NOT NULL,
-            date TEXT NOT NULL,
-            menu_json TEXT NOT NULL,
-            created_at TEXT NOT NULL,
-            PRIMARY KEY (url, date)
+    with get_connection() as conn, conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS menus (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL,
+                date TEXT NOT NULL,
+                restaurant_name TEXT,
+                day_of_week TEXT,
+                daily_menu INTEGER,
+                item_count INTEGER NOT NULL,
+                menu_blob BLOB NOT NULL,
+                etag TEXT,
+                response_gzip BLOB,
+                response_br BLOB,
+                created_at TEXT NOT NULL,
+                UNIQUE (url, date)
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_menus_date ON menus (date)")
+        _add_response_columns(conn)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS menu_items (
+                id INTEGER PRIMARY KEY,
+                menu_id INTEGER NOT NULL REFERENCES menus (id) ON DELETE CASCADE,
+                position INTEGER NOT NULL,
+                category TEXT,
+                name TEXT NOT NULL,
+                price REAL,
+                weight TEXT
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_menu_items_menu ON menu_items (menu_id)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_menu_items_category_price "
+            "ON menu_items (category, price)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_menu_items_price ON menu_items (price)"
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS menu_item_allergens (
+                item_id INTEGER NOT NULL REFERENCES menu_items (id) ON DELETE CASCADE,
+                allergen TEXT NOT NULL,
+                PRIMARY KEY (allergen, item_id)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_menu_item_allergens_item "
+            "ON menu_item_allergens (item_id)"
+        )
+        _create_item_search_index(conn)
+        _migrate_menu_cache(conn)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS extraction_cache (
+                content_hash TEXT NOT NULL,
+                date TEXT NOT NULL,
+                menu_json TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (content_hash, date)
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_extraction_cache_date "
+            "ON extraction_cache (date)"
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS page_store (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB NOT NULL,
+                fetched_at TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS menu_leases (
+                url TEXT NOT NULL,
+                date TEXT NOT NULL,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (url, date)
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS menu_jobs (
+                id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                date TEXT NOT NULL,
+                status TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                http_status INTEGER,
+                result_json TEXT,
+                owner TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_menu_jobs_status "
+            "ON menu_jobs (status, url, date)"
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS extraction_templates (
+                url TEXT PRIMARY KEY,
+                template_json TEXT NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                misses INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS subscriptions (
+                url TEXT PRIMARY KEY,
+                created_at TEXT NOT NULL
+            )
+            """
         )
-        """
-    )
-    conn.commit()
-    conn.close()
 
 
-def delete_old_cache(today_iso: str) -> None:
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
+@timed("db.delete_old_cache")
+def delete_old_cache(today_iso: str) -> int:
     try:
-        cur.execute("DELETE FROM menu_cache WHERE date < ?", (today_iso,))
-        conn.commit()
+        with get_connection() as conn, conn:
+            conn.execute(DELETE_OLD_EXTRACTIONS_SQL, (today_iso,))
+            conn.execute(DELETE_OLD_JOBS_SQL, (today_iso,))
+            return conn.execute(DELETE_OLD_SQL, (today_iso,)).rowcount
     except sqlite3.OperationalError as e:
-        conn.close()
         if "no such table" in str(e):
             init_db()
-            return
+            return 0
         raise
-    else:
-        conn.close()
 
 
-def get_cached_menu(url: str, date_iso: str) -> dict | None:
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT menu_json
-        FROM menu_cache
-        WHERE url = ? AND date = ?
-        """,
-        (url, date_iso),
+def encode_menu(menu: dict) -> bytes:
+    """Compact JSON, zlib-compressed: the whole-menu form kept in menus.menu_blob."""
+    return zlib.compress(
+        json.dumps(menu, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
     )
-    row = cur.fetchone()
-    conn.close()
-    if row:
-        return json.loads(row[0])
-    return None
 
 
-def save_menu(url: str, date_iso: str, menu: dict) -> None:
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT OR REPLACE INTO menu_cache (url, date, menu_json, created_at)
-        VALUES (?, ?, ?, ?)
-        """,
+def decode_menu(blob: bytes) -> dict:
+    return json.loads(zlib.decompress(blob))
+
+
+def _insert_menu(
+    conn: sqlite3.Connection,
+    url: str,
+    date_iso: str,
+    menu: dict,
+    encoded: EncodedMenu | None = None,
+):
+    encoded = encoded or encode_menu_response(menu)
+    conn.execute("DELETE FROM menus WHERE url = ? AND date = ?", (url, date_iso))
+    items = [i for i in menu.get("menu_items") or [] if isinstance(i, dict)]
+    daily_menu = menu.get("daily_menu")
+    menu_id = conn.execute(
+        SAVE_MENU_SQL,
         (
             url,
             date_iso,
-            json.dumps(menu, ensure_ascii=False),
+            menu.get("restaurant_name"),
+            menu.get("day_of_week"),
+            None if daily_menu is None else int(bool(daily_menu)),
+            len(items),
+            encode_menu(menu),
+            encoded.etag,
+            encoded.gzip,
+            encoded.br,
             datetime.now(timezone.utc).isoformat(),
         ),
+    ).lastrowid
+    for position, item in enumerate(items):
+        price = item.get("price")
+        item_id = conn.execute(
+            SAVE_ITEM_SQL,
+            (
+                menu_id,
+                position,
+                _category_key(item.get("category")),
+                item.get("name") or "",
+                price if isinstance(price, (int, float)) else None,
+                item.get("weight"),
+            ),
+        ).lastrowid
+        conn.executemany(
+            SAVE_ALLERGEN_SQL,
+            [(item_id, str(a)) for a in item.get("allergens") or [] if a is not None],
+        )
+
+
+def _category_key(category) -> str | None:
+    # Stored lower-cased so filters can use the (category, price) index.
+    return category.strip().lower() if isinstance(category, str) else None
+
+
+def _create_item_search_index(conn: sqlite3.Connection) -> None:
+    """FTS5 index over dish names, kept in sync with menu_items by triggers."""
+    global fts_available
+
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'menu_items_fts'"
+    ).fetchone()
+    try:
+        conn.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS menu_items_fts USING fts5 (
+                name,
+                content = 'menu_items',
+                content_rowid = 'id',
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+            """
+        )
+    except sqlite3.OperationalError as e:
+        if "fts5" not in str(e):
+            raise
+        fts_available = False
+        return
+    fts_available = True
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS menu_items_fts_insert
+        AFTER INSERT ON menu_items BEGIN
+            INSERT INTO menu_items_fts (rowid, name) VALUES (new.id, new.name);
+        END
+        """
     )
-    conn.commit()
-    conn.close()
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS menu_items_fts_delete
+        AFTER DELETE ON menu_items BEGIN
+            INSERT INTO menu_items_fts (menu_items_fts, rowid, name)
+            VALUES ('delete', old.id, old.name);
+        END
+        """
+    )
+    if not exists:
+        conn.execute("INSERT INTO menu_items_fts (menu_items_fts) VALUES ('rebuild')")
+
+
+def _add_response_columns(conn: sqlite3.Connection) -> None:
+    """Add the pre-serialized response columns to menus tables created earlier."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(menus)")}
+    for name, kind in (
+        ("etag", "TEXT"),
+        ("response_gzip", "BLOB"),
+        ("response_br", "BLOB"),
+    ):
+        if name not in columns:
+            conn.execute(f"ALTER TABLE menus ADD COLUMN {name} {kind}")
+
+
+def _migrate_menu_cache(conn: sqlite3.Connection) -> None:
+    """Move rows of the legacy JSON menu_cache table into the normalized tables."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'menu_cache'"
+    ).fetchone()
+    if not exists:
+        return
+    for url, date_iso, menu_json in conn.execute(
+        "SELECT url, date, menu_json FROM menu_cache"
+    ).fetchall():
+        try:
+            menu = json.loads(menu_json)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(menu, dict):
+            _insert_menu(conn, url, date_iso, menu)
+    conn.execute("DROP TABLE menu_cache")
+
+
+@timed("db.get_cached_menu")
+def get_cached_menu(url: str, date_iso: str) -> dict | None:
+    with get_connection() as conn:
+        row = conn.execute(SELECT_MENU_SQL, (url, date_iso)).fetchone()
+    if row:
+        return decode_menu(row[0])
+    return None
+
+
+@timed("db.get_cached_menus")
+def get_cached_menus(keys: list[tuple[str, str]]) -> dict[tuple[str, str], dict]:
+    if not keys:
+        return {}
+
+    found: dict[tuple[str, str], dict] = {}
+    unique_keys = list(dict.fromkeys(keys))
+    with get_connection() as conn:
+        # Keep well below SQLite's bound-parameter limit (two per key).
+        for start in range(0, len(unique_keys), 400):
+            chunk = unique_keys[start : start + 400]
+            placeholders = ", ".join("(?, ?)" for _ in chunk)
+            params = [value for key in chunk for value in key]
+            rows = conn.execute(
+                f"""
+                SELECT url, date, menu_blob
+                FROM menus
+                WHERE (url, date) IN (VALUES {placeholders})
+                """,
+                params,
+            )
+            for url, date_iso, menu_blob in rows:
+                found[(url, date_iso)] = decode_menu(menu_blob)
+    return found
+
+
+@timed("db.get_cached_response")
+def get_cached_response(url: str, date_iso: str) -> EncodedMenu | None:
+    """The stored cache-hit response for (url, date); None for older rows too."""
+    with get_connection() as conn:
+        row = conn.execute(SELECT_RESPONSE_SQL, (url, date_iso)).fetchone()
+    if row and row[0]:
+        return EncodedMenu(etag=row[0], gzip=row[1], br=row[2])
+    return None
+
+
+@timed("db.save_menu")
+def save_menu(
+    url: str, date_iso: str, menu: dict, encoded: EncodedMenu | None = None
+) -> None:
+    with get_connection() as conn, conn:
+        _insert_menu(conn, url, date_iso, menu, encoded)
+
+
+@timed("db.save_menus")
+def save_menus(
+    menus: dict[tuple[str, str], dict],
+    encoded: dict[tuple[str, str], EncodedMenu] | None = None,
+) -> None:
+    """Store many (url, date) menus in a single transaction."""
+    encoded = encoded or {}
+    with get_connection() as conn, conn:
+        for (url, date_iso), menu in menus.items():
+            _insert_menu(conn, url, date_iso, menu, encoded.get((url, date_iso)))
+
+
+@timed("db.get_extraction")
+def get_extraction(content_hash: str, date_iso: str) -> dict | None:
+    with get_connection() as conn:
+        row = conn.execute(SELECT_EXTRACTION_SQL, (content_hash, date_iso)).fetchone()
+    if row:
+        return json.loads(row[0])
+    return None
+
+
+@timed("db.save_extractions")
+def save_extractions(content_hash: str, menus_by_date: dict[str, dict]) -> None:
+    created_at = datetime.now(timezone.utc).isoformat()
+    with get_connection() as conn, conn:
+        conn.executemany(
+            SAVE_EXTRACTION_SQL,
+            [
+                (
+                    content_hash,
+                    date_iso,
+                    json.dumps(menu, ensure_ascii=False),
+                    created_at,
+                )
+                for date_iso, menu in menus_by_date.items()
+            ],
+        )
+
+
+@timed("db.get_stored_page")
+def get_stored_page(url: str) -> tuple[str | None, str | None, bytes] | None:
+    """Return (etag, last_modified, compressed body) of the last fetch of url."""
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT etag, last_modified, body FROM page_store WHERE url = ?",
+            (url,),
+        ).fetchone()
+    return tuple(row) if row else None
+
+
+@timed("db.save_stored_page")
+def save_stored_page(
+    url: str, etag: str | None, last_modified: str | None, body: bytes
+) -> None:
+    with get_connection() as conn, conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO page_store (url, etag, last_modified, body, fetched_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (url, etag, last_modified, body, datetime.now(timezone.utc).isoformat()),
+        )
+
+
+@timed("db.acquire_lease")
+def acquire_lease(
+    url: str, date_iso: str, owner: str, ttl: float, now: float | None = None
+) -> bool:
+    """Claim the (url, date) extraction lease unless another live owner holds it."""
+    now = time.time() if now is None else now
+    with get_connection() as conn, conn:
+        cur = conn.execute(
+            """
+            INSERT INTO menu_leases (url, date, owner, expires_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (url, date) DO UPDATE
+            SET owner = excluded.owner, expires_at = excluded.expires_at
+            WHERE menu_leases.expires_at <= ? OR menu_leases.owner = excluded.owner
+            """,
+            (url, date_iso, owner, now + ttl, now),
+        )
+        return cur.rowcount == 1
+
+
+@timed("db.release_lease")
+def release_lease(url: str, date_iso: str, owner: str) -> None:
+    with get_connection() as conn, conn:
+        conn.execute(
+            "DELETE FROM menu_leases WHERE url = ? AND date = ? AND owner = ?",
+            (url, date_iso, owner),
+        )
+
+
+@timed("db.get_template")
+def get_template(url: str) -> dict | None:
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT template_json FROM extraction_templates WHERE url = ?", (url,)
+        ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+@timed("db.save_template")
+def save_template(url: str, template: dict) -> None:
+    """Store the learned extraction template for `url`, keeping its hit counts."""
+    with get_connection() as conn, conn:
+        conn.execute(
+            """
+            INSERT INTO extraction_templates (url, template_json, updated_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT (url) DO UPDATE
+            SET template_json = excluded.template_json,
+                updated_at = excluded.updated_at
+            """,
+            (
+                url,
+                json.dumps(template, ensure_ascii=False),
+                datetime.now(timezone.utc).isoformat(),
+            ),
+        )
+
+
+@timed("db.record_template_use")
+def record_template_use(url: str, hit: bool) -> None:
+    column = "hits" if hit else "misses"
+    with get_connection() as conn, conn:
+        conn.execute(
+            f"UPDATE extraction_templates SET {column} = {column} + 1 WHERE url = ?",
+            (url,),
+        )
+
+
+@timed("db.template_stats")
+def template_stats() -> dict:
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(hits), 0), COALESCE(SUM(misses), 0) "
+            "FROM extraction_templates"
+        ).fetchone()
+    return {"templates": row[0], "hits": row[1], "misses": row[2]}
+
+
+@timed("db.add_subscription")
+def add_subscription(url: str) -> bool:
+    """Register `url` for pre-warming; returns False if it was already there."""
+    with get_connection() as conn, conn:
+        cur = conn.execute(
+            "INSERT OR IGNORE INTO subscriptions (url, created_at) VALUES (?, ?)",
+            (url, datetime.now(timezone.utc).isoformat()),
+        )
+        return cur.rowcount == 1
+
+
+@timed("db.remove_subscription")
+def remove_subscription(url: str) -> bool:
+    with get_connection() as conn, conn:
+        cur = conn.execute("DELETE FROM subscriptions WHERE url = ?", (url,))
+        return cur.rowcount == 1
+
+
+@timed("db.list_subscriptions")
+def list_subscriptions() -> list[str]:
+    with get_connection() as conn:
+        rows = conn.execute("SELECT url FROM subscriptions ORDER BY url").fetchall()
+    return [row[0] for row in rows]
+
+
+JOB_COLUMNS = (
+    "id",
+    "url",
+    "date",
+    "status",
+    "stage",
+    "http_status",
+    "result_json",
+    "created_at",
+    "updated_at",
+)
+
+
+def _job_from_row(row) -> dict | None:
+    if row is None:
+        return None
+    job = dict(zip(JOB_COLUMNS, row))
+    result_json = job.pop("result_json")
+    job["result"] = json.loads(result_json) if result_json else None
+    return job
+
+
+@timed("db.create_job")
+def create_job(job_id: str, url: str, date_iso: str) -> dict:
+    """Insert a queued job, or return the unfinished one for the same (url, date)."""
+    now = time.time()
+    with get_connection() as conn, conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            f"""
+            SELECT {", ".join(JOB_COLUMNS)} FROM menu_jobs
+            WHERE url = ? AND date = ? AND status IN ('queued', 'running')
+            ORDER BY created_at LIMIT 1
+            """,
+            (url, date_iso),
+        ).fetchone()
+        if row is not None:
+            return _job_from_row(row)
+        conn.execute(
+            """
+            INSERT INTO menu_jobs
+                (id, url, date, status, stage, created_at, updated_at)
+            VALUES (?, ?, ?, 'queued', 'queued', ?, ?)
+            """,
+            (job_id, url, date_iso, now, now),
+        )
+    return get_job(job_id)
+
+
+@timed("db.get_job")
+def get_job(job_id: str) -> dict | None:
+    with get_connection() as conn:
+        row = conn.execute(
+            f"SELECT {', '.join(JOB_COLUMNS)} FROM menu_jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+    return _job_from_row(row)
+
+
+@timed("db.claim_job")
+def claim_job(job_id: str, owner: str) -> bool:
+    """Move a queued job to running for `owner`; False if someone else has it."""
+    with get_connection() as conn, conn:
+        cur = conn.execute(
+            """
+            UPDATE menu_jobs SET status = 'running', owner = ?, updated_at = ?
+            WHERE id = ? AND status = 'queued'
+            """,
+            (owner, time.time(), job_id),
+        )
+        return cur.rowcount == 1
+
+
+@timed("db.update_job_stage")
+def update_job_stage(job_id: str, stage: str) -> None:
+    with get_connection() as conn, conn:
+        conn.execute(
+            "UPDATE menu_jobs SET stage = ?, updated_at = ? WHERE id = ?",
+            (stage, time.time(), job_id),
+        )
+
+
+@timed("db.finish_job")
+def finish_job(job_id: str, status: str, http_status: int, result: dict) -> None:
+    with get_connection() as conn, conn:
+        conn.execute(
+            """
+            UPDATE menu_jobs
+            SET status = ?, stage = ?, http_status = ?, result_json = ?, updated_at = ?
+            WHERE id = ?
+            """,
+            (
+                status,
+                status,
+                http_status,
+                json.dumps(result, ensure_ascii=False),
+                time.time(),
+                job_id,
+            ),
+        )
+
+
+@timed("db.requeue_stale_jobs")
+def requeue_stale_jobs(stale_after: float, now: float | None = None) -> list[str]:
+    """Requeue running jobs not updated for `stale_after` seconds; return all queued ids."""
+    now = time.time() if now is None else now
+    with get_connection() as conn, conn:
+        conn.execute(
+            """
+            UPDATE menu_jobs SET status = 'queued', owner = NULL, updated_at = ?
+            WHERE status = 'running' AND updated_at < ?
+            """,
+            (now, now - stale_after),
+        )
+        rows = conn.execute(
+            "SELECT id FROM menu_jobs WHERE status = 'queued' ORDER BY created_at"
+        ).fetchall()
+    return [row[0] for row in rows]
+
+
+def _fts_query(text: str) -> str | None:
+    """Every word of `text` as a quoted prefix term, all of them required."""
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{word}"*' for word in words) or None
+
+
+@timed("db.search_menu_items")
+def search_menu_items(
+    date_from: str,
+    date_to: str,
+    text: str | None = None,
+    category: str | None = None,
+    min_price: float | None = None,
+    max_price: float | None = None,
+    exclude_allergens: list[str] | None = None,
+    urls: list[str] | None = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> list[dict]:
+    """Dishes of cached menus in [date_from, date_to] matching every given filter.
+
+    Ordered by date, then price (unknown prices last); returns at most `limit`.
+    """
+    joins = ["JOIN menus m ON m.id = i.menu_id"]
+    where = ["m.date BETWEEN ? AND ?"]
+    params: list = [date_from, date_to]
+
+    if text:
+        if fts_available:
+            query = _fts_query(text)
+            if query is None:
+                return []
+            joins.append("JOIN menu_items_fts f ON f.rowid = i.id")
+            where.append("menu_items_fts MATCH ?")
+            params.append(query)
+        else:
+            where.append("i.name LIKE ?")
+            params.append(f"%{text}%")
+    if category:
+        where.append("i.category = ?")
+        params.append(_category_key(category))
+    if min_price is not None:
+        where.append("i.price >= ?")
+        params.append(min_price)
+    if max_price is not None:
+        where.append("i.price <= ?")
+        params.append(max_price)
+    if urls:
+        where.append(f"m.url IN ({', '.join('?' for _ in urls)})")
+        params.extend(urls)
+    if exclude_allergens:
+        where.append(
+            "NOT EXISTS (SELECT 1 FROM menu_item_allergens a WHERE a.item_id = i.id "
+            f"AND a.allergen IN ({', '.join('?' for _ in exclude_allergens)}))"
+        )
+        params.extend(exclude_allergens)
+
+    sql = f"""
+        SELECT m.url, m.date, m.restaurant_name, i.id, i.category, i.name,
+               i.price, i.weight,
+               (SELECT group_concat(a.allergen, ',') FROM menu_item_allergens a
+                WHERE a.item_id = i.id) AS allergens
+        FROM menu_items i
+        {" ".join(joins)}
+        WHERE {" AND ".join(where)}
+        ORDER BY m.date, i.price IS NULL, i.price, m.url, i.position
+        LIMIT ? OFFSET ?
+    """
+    params += [limit, offset]
+    with get_connection() as conn:
+        rows = conn.execute(sql, params).fetchall()
+    return [
+        {
+            "url": url,
+            "date": date_iso,
+            "restaurant_name": restaurant_name,
+            "item_id": item_id,
+            "category": item_category,
+            "name": name,
+            "price": price,
+            "weight": weight,
+            "allergens": sorted(allergens.split(",")) if allergens else [],
+        }
+        for (
+            url,
+            date_iso,
+            restaurant_name,
+            item_id,
+            item_category,
+            name,
+            price,
+            weight,
+            allergens,
+        ) in rows
+    ]
@@ -17,3 +17,14 @@ class MenuResponse(BaseModel):
     menu_items: List[MenuItem]
     daily_menu: bool = True
     source_url: str
+
+
+class DayMenu(BaseModel):
+    date: str
+    menu_items: List[MenuItem] = Field(default_factory=list)
+    daily_menu: bool = True
+
+
+class WeeklyMenuResponse(BaseModel):
+    restaurant_name: Optional[str] = None
+    days: List[DayMenu] = Field(default_factory=list)
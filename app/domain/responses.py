@@ -0,0 +1,71 @@
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+
+from werkzeug.http import parse_accept_header, parse_etags, quote_etag
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is always available
+    brotli = None
+
+
+@dataclass(frozen=True)
+class EncodedMenu:
+    """A cache-hit response body, serialized once and stored ready to send.
+
+    `etag` is the unquoted hash of the identity body; compressed variants are
+    tagged "<etag>-gzip" / "<etag>-br" so each representation has its own
+    strong validator.
+    """
+
+    etag: str
+    gzip: bytes
+    br: bytes | None = None
+
+    @property
+    def body(self) -> bytes:
+        return gzip.decompress(self.gzip)
+
+    def variant_etags(self) -> list[str]:
+        return [self.etag, f"{self.etag}-gzip", f"{self.etag}-br"]
+
+
+def encode_menu_response(menu: dict) -> EncodedMenu:
+    """Serialize `menu` as the body of a cache hit ({..., "cached": true})."""
+    body = json.dumps(
+        {**menu, "cached": True}, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+    return EncodedMenu(
+        etag=hashlib.blake2b(body, digest_size=16).hexdigest(),
+        # mtime=0 keeps the gzip bytes identical for identical menus.
+        gzip=gzip.compress(body, compresslevel=6, mtime=0),
+        br=brotli.compress(body) if brotli is not None else None,
+    )
+
+
+def negotiate(
+    encoded: EncodedMenu, accept_encoding: str | None, if_none_match: str | None
+) -> tuple[int, bytes, dict[str, str]]:
+    """Pick the representation for the request: (status, body, headers).
+
+    Returns 304 with an empty body when If-None-Match names any variant.
+    """
+    offered = ["br", "gzip"] if encoded.br is not None else ["gzip"]
+    coding = parse_accept_header(accept_encoding).best_match(offered)
+    headers = {"Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if coding is None:
+        headers["ETag"] = quote_etag(encoded.etag)
+    else:
+        headers["ETag"] = quote_etag(f"{encoded.etag}-{coding}")
+
+    etags = parse_etags(if_none_match)
+    if any(etags.contains_weak(tag) for tag in encoded.variant_etags()):
+        return 304, b"", headers
+
+    headers["Content-Type"] = "application/json"
+    if coding is None:
+        return 200, encoded.body, headers
+    headers["Content-Encoding"] = coding
+    return 200, encoded.br if coding == "br" else encoded.gzip, headers
@@ -0,0 +1,231 @@
+# app/metrics.py
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator
+
+# Seconds; spans range from sub-millisecond SQLite calls to 40 s LLM calls.
+DEFAULT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(labels.get(n, "") for n in self.labelnames), 0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # label values -> [per-bucket counts..., sum, count]
+        self._series: dict[tuple, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels) -> int:
+        series = self._series.get(tuple(labels.get(n, "") for n in self.labelnames))
+        return int(series[-1]) if series else 0
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    le = _labels(self.labelnames, key, f'le="{bound:g}"')
+                    lines.append(f"{self.name}_bucket{le} {count:g}")
+                inf = _labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{inf} {series[-1]:g}")
+                labels = _labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {series[-2]:.6f}")
+                lines.append(f"{self.name}_count{labels} {series[-1]:g}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list = []
+        self._gauges: list[tuple[str, str, Callable[[], dict[str, float]]]] = []
+
+    def counter(self, name: str, help_text: str, labelnames=()) -> Counter:
+        metric = Counter(name, help_text, tuple(labelnames))
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labelnames=()) -> Histogram:
+        metric = Histogram(name, help_text, tuple(labelnames))
+        self._metrics.append(metric)
+        return metric
+
+    def gauges(
+        self, name: str, help_text: str, collect: Callable[[], dict[str, float]]
+    ) -> None:
+        """Gauge family read at scrape time; `collect` maps a "kind" label to values."""
+        self._gauges.append((name, help_text, collect))
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for name, help_text, collect in self._gauges:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            for kind, value in sorted(collect().items()):
+                lines.append(f'{name}{{kind="{_escape(kind)}"}} {value:g}')
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram(
+    "menu_stage_duration_seconds",
+    "Time spent in each stage of serving a menu.",
+    ["stage"],
+)
+MENU_REQUESTS = registry.counter(
+    "menu_requests_total", "Menu lookups by cache outcome.", ["cache"]
+)
+LLM_TOKENS = registry.counter(
+    "llm_tokens_total", "Tokens reported in LLM response usage.", ["kind"]
+)
+LLM_RESPONSES = registry.counter(
+    "llm_responses_total", "LLM HTTP responses by status code.", ["status"]
+)
+MENU_EXTRACTIONS = registry.counter(
+    "menu_extractions_total", "Menus extracted on a cache miss, by source.", ["source"]
+)
+
+# Per-request list of (stage, seconds) for the Server-Timing header.
+_request_timings: ContextVar[list | None] = ContextVar("request_timings", default=None)
+# Called with each stage name as it starts, e.g. to report job progress.
+_stage_listener: ContextVar[Callable[[str], None] | None] = ContextVar(
+    "stage_listener", default=None
+)
+
+
+@contextmanager
+def on_stage(listener: Callable[[str], None]) -> Iterator[None]:
+    token = _stage_listener.set(listener)
+    try:
+        yield
+    finally:
+        _stage_listener.reset(token)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time the block as `stage` in the stage histogram and the request's timings."""
+    listener = _stage_listener.get()
+    if listener is not None:
+        listener(stage)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((stage, elapsed))
+
+
+def timed(stage: str):
+    """Decorator form of span()."""
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def record_llm_usage(usage: dict | None) -> None:
+    if not isinstance(usage, dict):
+        return
+    for kind in ("prompt_tokens", "completion_tokens"):
+        if isinstance(usage.get(kind), (int, float)):
+            LLM_TOKENS.inc(usage[kind], kind=kind.removesuffix("_tokens"))
+
+
+def start_request_timings() -> None:
+    _request_timings.set([])
+
+
+def server_timing_header() -> str | None:
+    """Server-Timing value for the current request, with repeated stages summed."""
+    timings = _request_timings.get()
+    if not timings:
+        return None
+    totals: dict[str, float] = {}
+    for stage, seconds in timings:
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    return ", ".join(
+        f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in totals.items()
+    )
@@ -0,0 +1,28 @@
+import time
+
+from flask import Flask, Response, g, request
+
+from app.metrics import STAGE_SECONDS, server_timing_header, start_request_timings
+
+
+def register_timing_middleware(app: Flask, server_timing: bool) -> None:
+    @app.before_request
+    def _start_timer():
+        g.request_started = time.perf_counter()
+        if server_timing:
+            start_request_timings()
+
+    @app.after_request
+    def _record_timing(response: Response) -> Response:
+        if not request.path.startswith("/api/") or request.path == "/api/metrics":
+            return response
+
+        elapsed = time.perf_counter() - g.get("request_started", time.perf_counter())
+        STAGE_SECONDS.observe(elapsed, stage="request")
+        if server_timing:
+            stages = server_timing_header()
+            total = f"total;dur={elapsed * 1000:.1f}"
+            response.headers["Server-Timing"] = (
+                f"{stages}, {total}" if stages else total
+            )
+        return response
@@ -1,16 +1,46 @@
 # app/route/routes.py
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 
-from app.services.menu_service import handle_menu_request
+from app.metrics import registry
+
+from app.db.db import template_stats
+from app.domain.responses import EncodedMenu, negotiate
+from app.services.cache import cache_stats
+from app.services.jobs import job_events, job_status, submit_menu_job
+from app.services.menu_service import (
+    cached_menu_response,
+    handle_batch_menu_request,
+    handle_menu_request,
+)
+from app.services.menu_stream import stream_menu_events
+from app.services.search import handle_menu_search
+
+
+def send_encoded(encoded: EncodedMenu) -> Response:
+    status, body, headers = negotiate(
+        encoded,
+        request.headers.get("Accept-Encoding"),
+        request.headers.get("If-None-Match"),
+    )
+    return Response(body, status=status, headers=headers)
 
 
 def register_routes(app: Flask) -> None:
-    @app.route("/api/menu", methods=["POST"])
+    @app.route("/api/menu", methods=["GET", "POST"])
     def api_menu():
-        payload = request.get_json(silent=True) or {}
+        # GET ?url=&date= lets dashboards poll with If-None-Match.
+        if request.method == "GET":
+            payload = request.args
+        else:
+            payload = request.get_json(silent=True) or {}
         url = payload.get("url")
         date_str = payload.get("date")
 
+        # Cache hits are sent as stored bytes, without decoding or re-encoding.
+        encoded = cached_menu_response(url, date_str)
+        if encoded is not None:
+            return send_encoded(encoded)
+
         body, status = handle_menu_request(
             url=url,
             date_str=date_str,
@@ -18,6 +48,57 @@ def register_routes(app: Flask) -> None:
         )
         return jsonify(body), status
 
+    @app.route("/api/menu/stream", methods=["GET"])
+    def api_menu_stream():
+        # EventSource only sends GET, so the request is in the query string.
+        return Response(
+            stream_with_context(
+                stream_menu_events(request.args.get("url"), request.args.get("date"))
+            ),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @app.route("/api/menu/jobs", methods=["POST"])
+    def api_menu_jobs():
+        payload = request.get_json(silent=True) or {}
+
+        body, status = submit_menu_job(
+            url=payload.get("url"), date_str=payload.get("date")
+        )
+        response = jsonify(body)
+        if status == 202:
+            response.headers["Location"] = body["status_url"]
+        return response, status
+
+    @app.route("/api/menu/jobs/<job_id>", methods=["GET"])
+    def api_menu_job(job_id: str):
+        body, status = job_status(job_id)
+        return jsonify(body), status
+
+    @app.route("/api/menu/jobs/<job_id>/events", methods=["GET"])
+    def api_menu_job_events(job_id: str):
+        return Response(
+            stream_with_context(job_events(job_id)),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @app.route("/api/menus", methods=["POST"])
+    def api_menus():
+        payload = request.get_json(silent=True) or {}
+
+        body, status = handle_batch_menu_request(
+            items=payload.get("items"),
+            is_testing=app.testing,
+        )
+        return jsonify(body), status
+
+    @app.route("/api/menus/search", methods=["GET"])
+    def api_menus_search():
+        body, status = handle_menu_search(request.args)
+        return jsonify(body), status
+
     @app.route("/api/health", methods=["GET"])
     def health():
         """Simple health-check endpoint used mainly for tooling (Insomnia, monitoring)."""
@@ -26,11 +107,20 @@ def register_routes(app: Flask) -> None:
                 {
                     "status": "ok",
                     "service": "restaurant-menu-summarizer",
+                    "cache": cache_stats(),
+                    "templates": template_stats(),
                 }
             ),
             200,
         )
 
+    @app.route("/api/metrics", methods=["GET"])
+    def metrics():
+        """Prometheus text exposition of stage timings, cache and LLM counters."""
+        return Response(
+            registry.render(), mimetype="text/plain; version=0.0.4; charset=utf-8"
+        )
+
     @app.route("/")
     def index():
         return app.send_static_file("index.html")
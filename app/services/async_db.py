@@ -0,0 +1,32 @@
+# app/services/async_db.py
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from app.config import SQLITE_POOL_SIZE
+
+R = TypeVar("R")
+
+# SQLite work of the async pipeline (lease polling, cache reads, saving menus
+# with their encoded responses) runs here, never on the event loop: a write
+# waiting out the busy timeout would otherwise stall every request. The pool
+# has its own threads, sized like the connection pool, so it cannot starve
+# the default executor either.
+_executor = ThreadPoolExecutor(
+    max_workers=max(1, SQLITE_POOL_SIZE), thread_name_prefix="async-db"
+)
+
+
+async def run_db(fn: Callable[..., R], *args, **kwargs) -> R:
+    """Await `fn(*args, **kwargs)` on the database executor.
+
+    Context variables (request timings, LLM priority) are carried over, as
+    with asyncio.to_thread.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        _executor, functools.partial(context.run, fn, *args, **kwargs)
+    )
@@ -0,0 +1,46 @@
+# app/services/async_http.py
+import asyncio
+import weakref
+
+import httpx
+from requests.utils import DEFAULT_ACCEPT_ENCODING
+
+from app.config import FETCH_POOL_SIZE, FETCH_TIMEOUT, FETCH_USER_AGENT
+
+# httpx clients are bound to the event loop that created them, so keep one
+# pair of pools per running loop (normally exactly one per process).
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _new_client(name: str) -> httpx.AsyncClient:
+    if name == "scraper":
+        return httpx.AsyncClient(
+            headers={
+                "User-Agent": FETCH_USER_AGENT,
+                "Accept-Encoding": DEFAULT_ACCEPT_ENCODING,
+            },
+            timeout=FETCH_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=None, max_keepalive_connections=FETCH_POOL_SIZE * 8
+            ),
+        )
+    return httpx.AsyncClient(timeout=60, limits=httpx.Limits(max_connections=None))
+
+
+def get_async_client(name: str) -> httpx.AsyncClient:
+    """Shared connection pool for `name` ("scraper" or "llm") on the running loop."""
+    loop = asyncio.get_running_loop()
+    clients = _clients.setdefault(loop, {})
+    client = clients.get(name)
+    if client is None or client.is_closed:
+        client = clients[name] = _new_client(name)
+    return client
+
+
+async def close_async_clients() -> None:
+    clients = _clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
@@ -0,0 +1,67 @@
+# app/services/async_llm_client.py
+from datetime import date
+
+import httpx
+
+from app.metrics import span
+from app.services.async_http import get_async_client
+from app.services.llm_scheduler import estimate_tokens, scheduler
+from app.services.llm_client import (
+    append_tool_results,
+    build_messages,
+    final_payload,
+    get_backend,
+    initial_payload,
+    menu_from_content,
+    request_headers,
+    week_menu_from_content,
+)
+
+
+async def _post_chat_async(payload: dict):
+    client = get_async_client("llm")
+    backend = get_backend()
+    return await scheduler.run_async(
+        lambda: client.post(
+            backend.chat_url,
+            headers=request_headers(),
+            json=payload,
+            timeout=httpx.Timeout(backend.timeout, connect=backend.connect_timeout),
+        ),
+        tokens=estimate_tokens(payload),
+    )
+
+
+async def _chat_completion_content_async(messages: list[dict]) -> str | None:
+    with span("llm.request"):
+        resp = await _post_chat_async(initial_payload(messages))
+    resp.raise_for_status()
+    first_message = resp.json()["choices"][0]["message"]
+
+    if not first_message.get("tool_calls"):
+        return first_message["content"]
+
+    append_tool_results(messages, first_message)
+
+    with span("llm.tool_round_trip"):
+        resp2 = await _post_chat_async(final_payload(messages))
+    resp2.raise_for_status()
+    return resp2.json()["choices"][0]["message"]["content"]
+
+
+async def call_openai_menu_async(
+    url: str, page_text: str, target_date: date, mode: str = "strict"
+) -> dict:
+    messages = build_messages(url, page_text, target_date, mode)
+    content = await _chat_completion_content_async(messages)
+    with span("llm.validate"):
+        return menu_from_content(content, url, target_date)
+
+
+async def call_openai_week_menu_async(
+    url: str, page_text: str, target_date: date
+) -> dict:
+    messages = build_messages(url, page_text, target_date, "week")
+    content = await _chat_completion_content_async(messages)
+    with span("llm.validate"):
+        return week_menu_from_content(content, url)
@@ -0,0 +1,140 @@
+# app/services/async_menu_service.py
+import asyncio
+import weakref
+from datetime import date
+
+from app.config import (
+    EXTRACTION_LEASE_POLL,
+    EXTRACTION_LEASE_TTL,
+    WEEKLY_EXTRACTION,
+)
+from app.metrics import MENU_REQUESTS, span
+from app.services.async_db import run_db
+from app.services.async_llm_client import (
+    call_openai_menu_async,
+    call_openai_week_menu_async,
+)
+from app.services.async_scraper import fetch_page_text_async
+from app.services.llm_client import extraction_key
+from app.services.menu_service import (
+    has_menu_items,
+    cached_response,
+    extract_with_template,
+    finish_extraction,
+    refresh_template,
+    reuse_extraction,
+    week_day_menu,
+    validate_menu_request,
+)
+from app.services.singleflight import run_with_lease_async
+
+_inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def _extract_with_llm_async(
+    url: str, page_text: str, target_date: date, content_key: str
+) -> dict:
+    if WEEKLY_EXTRACTION:
+        week = await call_openai_week_menu_async(url, page_text, target_date)
+        menu = await run_db(
+            week_day_menu, content_key, week, url, page_text, target_date
+        )
+        if menu is not None:
+            return menu
+
+    menu = await call_openai_menu_async(url, page_text, target_date, mode="strict")
+
+    if "error" not in menu and not has_menu_items(menu):
+        try:
+            fallback = await call_openai_menu_async(
+                url, page_text, target_date, mode="loose"
+            )
+        except Exception:
+            fallback = None
+
+        if has_menu_items(fallback):
+            menu = fallback
+
+    return menu
+
+
+async def _extract_menu_async(url: str, target_date: date) -> tuple[dict, int]:
+    try:
+        page_text = await fetch_page_text_async(url)
+    except Exception as e:
+        return {"error": f"Failed to download page: {e}"}, 502
+
+    content_key = extraction_key(page_text)
+    menu = await run_db(reuse_extraction, content_key, url, target_date)
+    reused = menu is not None
+
+    if not reused:
+        menu = await run_db(extract_with_template, url, page_text, target_date)
+
+    if menu is None:
+        try:
+            with span("llm.extract"):
+                menu = await _extract_with_llm_async(
+                    url, page_text, target_date, content_key
+                )
+        except Exception as e:
+            return {"error": f"OpenAI API call failed: {e}"}, 500
+        await run_db(refresh_template, url, page_text, target_date, menu)
+
+    return await run_db(finish_extraction, url, target_date, content_key, menu, reused)
+
+
+async def _extract_menu_coalesced_async(
+    url: str, target_date: date
+) -> tuple[dict, int]:
+    target_iso = target_date.isoformat()
+    key = (url, target_iso)
+    loop = asyncio.get_running_loop()
+    inflight = _inflight.setdefault(loop, {})
+
+    pending = inflight.get(key)
+    if pending is not None:
+        body, status = await asyncio.shield(pending)
+        return dict(body), status
+
+    future = inflight[key] = loop.create_future()
+    # Nobody may be waiting; don't let an unobserved failure warn at shutdown.
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    try:
+        result = await run_with_lease_async(
+            url,
+            target_iso,
+            work=lambda: _extract_menu_async(url, target_date),
+            check_done=lambda: cached_response(url, target_iso),
+            ttl=EXTRACTION_LEASE_TTL,
+            poll_interval=EXTRACTION_LEASE_POLL,
+        )
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        del inflight[key]
+
+
+async def handle_menu_request_async(
+    url: str | None,
+    date_str: str | None,
+) -> tuple[dict, int]:
+    target_date, error = validate_menu_request(url, date_str, date.today())
+    if error:
+        return error
+
+    with span("cache.lookup"):
+        cached = await run_db(cached_response, url, target_date.isoformat())
+    if cached is not None:
+        MENU_REQUESTS.inc(cache="hit")
+        return cached
+
+    MENU_REQUESTS.inc(cache="miss")
+    with span("menu.extract"):
+        return await _extract_menu_coalesced_async(url, target_date)
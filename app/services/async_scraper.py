@@ -0,0 +1,56 @@
+# app/services/async_scraper.py
+import asyncio
+
+import httpx
+
+from app.services.async_db import run_db
+from app.services.async_http import get_async_client
+from app.config import FETCH_MAX_BYTES
+from app.db.db import get_stored_page
+from app.metrics import span
+from app.services.host_health import host_health
+from app.services.fetcher import (
+    FetchedPage,
+    conditional_headers,
+    decode_body,
+    page_from_response,
+)
+from app.services.scraper import ScrapedPage, html_to_text
+
+
+async def fetch_html_async(url: str) -> FetchedPage:
+    stored = await run_db(get_stored_page, url)
+    client = get_async_client("scraper")
+    async with (
+        host_health.guard_async(url) as (connect, read),
+        client.stream(
+            "GET",
+            url,
+            headers=conditional_headers(stored),
+            timeout=httpx.Timeout(read, connect=connect),
+        ) as resp,
+    ):
+        if not (resp.status_code == 304 and stored):
+            resp.raise_for_status()
+        body = bytearray()
+        async for chunk in resp.aiter_bytes():
+            body += chunk
+            if len(body) >= FETCH_MAX_BYTES:
+                break
+    text = decode_body(bytes(body[:FETCH_MAX_BYTES]), resp.headers.get("Content-Type"))
+    return await run_db(
+        page_from_response, url, stored, resp.status_code, resp.headers, text
+    )
+
+
+async def fetch_page_async(url: str) -> ScrapedPage:
+    with span("fetch.download"):
+        page = await fetch_html_async(url)
+    # HTML parsing is CPU-bound; keep it off the event loop.
+    with span("fetch.parse"):
+        text = await asyncio.to_thread(html_to_text, page.html)
+    return ScrapedPage(text=text, not_modified=page.not_modified)
+
+
+async def fetch_page_text_async(url: str) -> str:
+    return (await fetch_page_async(url)).text
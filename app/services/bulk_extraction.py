@@ -0,0 +1,216 @@
+# app/services/bulk_extraction.py
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from time import perf_counter
+
+from app.config import (
+    BATCH_MAX_WORKERS,
+    LLM_BATCH_POLL_INTERVAL,
+    LLM_BATCH_TIMEOUT,
+)
+from app.services.cache import get_cached_menus, save_extractions, save_menus
+from app.services.llm_batch import CHAT_ENDPOINT, TERMINAL_STATUSES, get_batch_client
+from app.services.llm_client import (
+    build_messages,
+    extraction_key,
+    get_backend,
+    menu_from_content,
+)
+from app.services.menu_service import (
+    extract_with_template,
+    has_menu_items,
+    refresh_template,
+)
+from app.services.scraper import fetch_page_text
+
+logger = logging.getLogger(__name__)
+
+
+class BatchTimeoutError(TimeoutError):
+    pass
+
+
+def custom_id(url: str, target_date: date) -> str:
+    return f"{target_date.isoformat()}|{url}"
+
+
+def parse_custom_id(value: str) -> tuple[str, date]:
+    date_iso, url = value.split("|", 1)
+    return url, date.fromisoformat(date_iso)
+
+
+def batch_request_line(url: str, page_text: str, target_date: date) -> dict:
+    """One JSONL line of a batch: a strict single-day chat-completions request.
+
+    Prices are always copied raw and normalized locally, since a batch line
+    cannot answer a normalize_prices tool call.
+    """
+    return {
+        "custom_id": custom_id(url, target_date),
+        "method": "POST",
+        "url": CHAT_ENDPOINT,
+        "body": {
+            "model": get_backend().model,
+            "messages": build_messages(
+                url, page_text, target_date, "strict", price_mode="local"
+            ),
+        },
+    }
+
+
+def menus_from_results(lines: list[dict]) -> tuple[dict, dict]:
+    """Validate batch output lines into menus; returns (menus, errors) by key."""
+    menus: dict[tuple[str, str], dict] = {}
+    errors: dict[tuple[str, str], str] = {}
+    for line in lines:
+        url, target_date = parse_custom_id(line["custom_id"])
+        key = (url, target_date.isoformat())
+        response = line.get("response") or {}
+        if line.get("error") or response.get("status_code") != 200:
+            errors[key] = str(
+                (line.get("error") or {}).get("message")
+                or f"HTTP {response.get('status_code')}"
+            )
+            continue
+        try:
+            content = response["body"]["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            errors[key] = "Malformed batch response."
+            continue
+        menu = menu_from_content(content, url, target_date)
+        if "error" in menu:
+            errors[key] = menu["error"]
+        elif not has_menu_items(menu):
+            errors[key] = "No menu items found."
+        else:
+            menus[key] = menu
+    return menus, errors
+
+
+def wait_for_batch(
+    client,
+    batch_id: str,
+    poll_interval: float = LLM_BATCH_POLL_INTERVAL,
+    timeout: float = LLM_BATCH_TIMEOUT,
+    sleep=time.sleep,
+) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        batch = client.status(batch_id)
+        if batch["status"] in TERMINAL_STATUSES:
+            return batch
+        if time.monotonic() >= deadline:
+            raise BatchTimeoutError(f"Batch {batch_id} still {batch['status']}.")
+        sleep(poll_interval)
+
+
+def _fetch_pages(urls: list[str]) -> tuple[dict[str, str], dict[str, str]]:
+    pages: dict[str, str] = {}
+    failures: dict[str, str] = {}
+    if not urls:
+        return pages, failures
+
+    def fetch(url: str):
+        try:
+            return url, fetch_page_text(url), None
+        except Exception as e:
+            return url, None, str(e)
+
+    workers = max(1, min(BATCH_MAX_WORKERS, len(urls)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for url, text, error in pool.map(fetch, urls):
+            if error is None:
+                pages[url] = text
+            else:
+                failures[url] = error
+    return pages, failures
+
+
+def run_bulk_extraction(
+    items: list[tuple[str, date]],
+    client=None,
+    poll_interval: float = LLM_BATCH_POLL_INTERVAL,
+    timeout: float = LLM_BATCH_TIMEOUT,
+    sleep=time.sleep,
+) -> dict:
+    """Fill the cache for many (url, date) pairs with a single LLM batch job.
+
+    Cached pairs are skipped, each page is downloaded once, pages with a
+    trustworthy learned template skip the LLM, and everything else goes into
+    one batch. All menus are written to the cache in one transaction; batch
+    results also refresh the page templates.
+    """
+    started = perf_counter()
+    client = client or get_batch_client()
+    keys = list(dict.fromkeys((url, day.isoformat()) for url, day in items))
+    cached = get_cached_menus(keys)
+    missing = [key for key in keys if key not in cached]
+
+    pages, fetch_failures = _fetch_pages(list(dict.fromkeys(u for u, _ in missing)))
+    errors = {
+        key: f"Failed to download page: {fetch_failures[key[0]]}"
+        for key in missing
+        if key[0] in fetch_failures
+    }
+
+    menus: dict[tuple[str, str], dict] = {}
+    lines: list[dict] = []
+    submitted: list[tuple[str, str]] = []
+    for url, date_iso in missing:
+        if url not in pages:
+            continue
+        target_date = date.fromisoformat(date_iso)
+        menu = extract_with_template(url, pages[url], target_date)
+        if menu is not None:
+            menus[(url, date_iso)] = menu
+        else:
+            lines.append(batch_request_line(url, pages[url], target_date))
+            submitted.append((url, date_iso))
+
+    batch_id = None
+    if lines:
+        batch_id = client.submit(lines)
+        logger.info("Submitted batch %s with %d requests", batch_id, len(lines))
+        batch = wait_for_batch(client, batch_id, poll_interval, timeout, sleep)
+        if batch["status"] != "completed":
+            logger.warning("Batch %s ended %s", batch_id, batch["status"])
+        batch_menus, batch_errors = menus_from_results(client.results(batch))
+        for (url, date_iso), menu in batch_menus.items():
+            target_date = date.fromisoformat(date_iso)
+            refresh_template(url, pages[url], target_date, menu, source="batch")
+        menus.update(batch_menus)
+        errors.update(batch_errors)
+        for key in submitted:
+            if key not in menus and key not in errors:
+                errors[key] = f"No result (batch {batch['status']})."
+
+    if menus:
+        save_menus(menus)
+        # Like /api/menu, keep the extractions by page text so that a later
+        # request for an unchanged page skips the LLM.
+        extractions: dict[str, dict[str, dict]] = {}
+        for (url, date_iso), menu in menus.items():
+            extractions.setdefault(extraction_key(pages[url]), {})[date_iso] = menu
+        for content_key, menus_by_date in extractions.items():
+            save_extractions(content_key, menus_by_date)
+
+    summary = {
+        "batch_id": batch_id,
+        "requested": len(keys),
+        "cached": len(cached),
+        "submitted": len(lines),
+        "saved": len(menus),
+        "failed": [
+            {"url": url, "date": date_iso, "error": error}
+            for (url, date_iso), error in errors.items()
+        ],
+        "elapsed_ms": round((perf_counter() - started) * 1000, 2),
+    }
+    logger.info(
+        "Bulk extraction finished: %d saved, %d failed",
+        summary["saved"],
+        len(summary["failed"]),
+    )
+    return summary
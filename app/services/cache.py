@@ -1,3 +1,202 @@
-from app.db.db import init_db, delete_old_cache, get_cached_menu, save_menu
+import threading
+from collections import OrderedDict
+from datetime import datetime
 
-__all__ = ["init_db", "delete_old_cache", "get_cached_menu", "save_menu"]
+from app.config import (
+    CACHE_BACKEND,
+    CACHE_REDIS_TIMEOUT,
+    CACHE_REDIS_URL,
+    MEMORY_CACHE_MAX_ENTRIES,
+)
+from app.db import db
+from app.db.db import init_db, get_extraction, save_extractions
+from app.domain.responses import EncodedMenu, encode_menu_response
+from app.metrics import registry
+from app.services.cache_backends import expires_at as _end_of_day, make_backend
+
+
+class MemoryMenuCache:
+    """Bounded LRU of menus keyed by (url, date), valid until that day ends.
+
+    An entry holds the decoded menu, its pre-serialized hit response, or both.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[
+            tuple[str, str], tuple[dict | None, EncodedMenu | None, float]
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, url: str, date_iso: str, part: int, now: float | None):
+        key = (url, date_iso)
+        now = datetime.now().timestamp() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is None or entry[part] is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[part]
+
+    def get(self, url: str, date_iso: str, now: float | None = None) -> dict | None:
+        menu = self._lookup(url, date_iso, 0, now)
+        # Callers add per-response fields such as "cached"; keep ours pristine.
+        return dict(menu) if menu is not None else None
+
+    def get_response(
+        self, url: str, date_iso: str, now: float | None = None
+    ) -> EncodedMenu | None:
+        return self._lookup(url, date_iso, 1, now)
+
+    def _store(self, key, menu, encoded) -> None:
+        self._entries[key] = (menu, encoded, _end_of_day(key[1]))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def put(
+        self,
+        url: str,
+        date_iso: str,
+        menu: dict,
+        encoded: EncodedMenu | None = None,
+    ) -> None:
+        """Cache `menu`; without `encoded`, a response already cached is kept."""
+        if self.max_entries <= 0:
+            return
+        key = (url, date_iso)
+        with self._lock:
+            if encoded is None and key in self._entries:
+                encoded = self._entries[key][1]
+            self._store(key, dict(menu), encoded)
+
+    def put_response(self, url: str, date_iso: str, encoded: EncodedMenu) -> None:
+        """Add the serialized response, keeping a menu already cached for the key."""
+        if self.max_entries <= 0:
+            return
+        key = (url, date_iso)
+        with self._lock:
+            entry = self._entries.get(key)
+            self._store(key, entry[0] if entry else None, encoded)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+memory_cache = MemoryMenuCache(MEMORY_CACHE_MAX_ENTRIES)
+registry.gauges(
+    "menu_memory_cache", "In-process menu cache size and hits.", memory_cache.stats
+)
+
+
+# Where menus live behind the in-process tier: "sqlite" (this node's DB_PATH),
+# "memory" (this process only) or "redis" (shared by every node).
+backend = make_backend(CACHE_BACKEND, CACHE_REDIS_URL, CACHE_REDIS_TIMEOUT)
+
+
+def get_backend():
+    return backend
+
+
+def set_backend(new_backend):
+    """Switch the menu store; returns the previous one."""
+    global backend
+    previous, backend = backend, new_backend
+    memory_cache.clear()
+    return previous
+
+
+def get_cached_menu(url: str, date_iso: str) -> dict | None:
+    menu = memory_cache.get(url, date_iso)
+    if menu is not None:
+        return menu
+
+    menu = backend.get_many([(url, date_iso)]).get((url, date_iso))
+    if menu is not None:
+        memory_cache.put(url, date_iso, menu)
+    return menu
+
+
+def get_cached_menus(keys: list[tuple[str, str]]) -> dict[tuple[str, str], dict]:
+    found: dict[tuple[str, str], dict] = {}
+    missing: list[tuple[str, str]] = []
+    for url, date_iso in dict.fromkeys(keys):
+        menu = memory_cache.get(url, date_iso)
+        if menu is not None:
+            found[(url, date_iso)] = menu
+        else:
+            missing.append((url, date_iso))
+
+    for (url, date_iso), menu in backend.get_many(missing).items():
+        memory_cache.put(url, date_iso, menu)
+        found[(url, date_iso)] = menu
+    return found
+
+
+def get_cached_response(url: str, date_iso: str) -> EncodedMenu | None:
+    """The serialized cache-hit response for (url, date), ready to send."""
+    encoded = memory_cache.get_response(url, date_iso)
+    if encoded is not None:
+        return encoded
+
+    encoded = backend.get_response(url, date_iso)
+    if encoded is not None:
+        memory_cache.put_response(url, date_iso, encoded)
+    return encoded
+
+
+def save_menu(url: str, date_iso: str, menu: dict) -> None:
+    save_menus({(url, date_iso): menu})
+
+
+def save_menus(menus: dict[tuple[str, str], dict]) -> None:
+    """Store menus with their encoded responses in one backend batch."""
+    entries = {key: (menu, encode_menu_response(menu)) for key, menu in menus.items()}
+    backend.set_many(entries)
+    for (url, date_iso), (menu, encoded) in entries.items():
+        memory_cache.put(url, date_iso, menu, encoded)
+
+
+def delete_old_cache(today_iso: str) -> int:
+    return db.delete_old_cache(today_iso) + backend.purge(today_iso)
+
+
+def cache_stats() -> dict:
+    return {"backend": backend.name, "memory": memory_cache.stats()}
+
+
+__all__ = [
+    "init_db",
+    "delete_old_cache",
+    "get_cached_menu",
+    "get_cached_menus",
+    "get_cached_response",
+    "save_menu",
+    "save_menus",
+    "get_backend",
+    "set_backend",
+    "cache_stats",
+    "get_extraction",
+    "save_extractions",
+    "memory_cache",
+    "MemoryMenuCache",
+]
@@ -0,0 +1,313 @@
+# app/services/cache_backends.py
+import json
+import logging
+import socket
+import threading
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+from urllib.parse import unquote, urlsplit
+
+from app.db import db
+from app.domain.responses import EncodedMenu, encode_menu_response
+
+logger = logging.getLogger(__name__)
+
+Key = tuple[str, str]
+
+
+def expires_at(date_iso: str) -> float:
+    """Timestamp of the local midnight after `date_iso`, when its menu expires."""
+    day = date.fromisoformat(date_iso)
+    return datetime.combine(day + timedelta(days=1), dt_time.min).timestamp()
+
+
+class SQLiteBackend:
+    """The local menus tables (DB_PATH); one file per node.
+
+    Every backend offers get_many(keys) -> {key: menu}, get_response(url, date)
+    -> EncodedMenu | None, set_many({key: (menu, encoded)}) and purge(today).
+    """
+
+    name = "sqlite"
+
+    def get_many(self, keys: list[Key]) -> dict[Key, dict]:
+        return db.get_cached_menus(keys)
+
+    def get_response(self, url: str, date_iso: str) -> EncodedMenu | None:
+        encoded = db.get_cached_response(url, date_iso)
+        if encoded is None:
+            # Rows written before responses were stored are encoded on demand.
+            menu = db.get_cached_menu(url, date_iso)
+            if menu is not None:
+                encoded = encode_menu_response(menu)
+        return encoded
+
+    def set_many(self, entries: dict[Key, tuple[dict, EncodedMenu]]) -> None:
+        if len(entries) == 1:
+            ((url, date_iso), (menu, encoded)) = next(iter(entries.items()))
+            db.save_menu(url, date_iso, menu, encoded)
+            return
+        db.save_menus(
+            {key: menu for key, (menu, _) in entries.items()},
+            {key: encoded for key, (_, encoded) in entries.items()},
+        )
+
+    def purge(self, today_iso: str) -> int:
+        # Expired rows are deleted together with the other tables by
+        # db.delete_old_cache.
+        return 0
+
+
+class MemoryBackend:
+    """Process-local store for tests and single-process development."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._entries: dict[Key, tuple[dict, EncodedMenu]] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: list[Key]) -> dict[Key, dict]:
+        with self._lock:
+            return {
+                key: dict(self._entries[key][0]) for key in keys if key in self._entries
+            }
+
+    def get_response(self, url: str, date_iso: str) -> EncodedMenu | None:
+        with self._lock:
+            entry = self._entries.get((url, date_iso))
+        return entry[1] if entry else None
+
+    def set_many(self, entries: dict[Key, tuple[dict, EncodedMenu]]) -> None:
+        with self._lock:
+            for key, (menu, encoded) in entries.items():
+                self._entries[key] = (dict(menu), encoded)
+
+    def purge(self, today_iso: str) -> int:
+        with self._lock:
+            expired = [key for key in self._entries if key[1] < today_iso]
+            for key in expired:
+                del self._entries[key]
+        return len(expired)
+
+
+class RespError(Exception):
+    """An error reply from a Redis-protocol server."""
+
+
+class RespClient:
+    """Minimal Redis (RESP2) client with a small connection pool.
+
+    Supports redis://[:password@]host[:port][/db] URLs. Commands in one
+    pipeline() call are written together and cost a single round trip.
+    """
+
+    def __init__(self, url: str, timeout: float = 1.0, pool_size: int = 8):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.password = unquote(parts.password) if parts.password else None
+        self.db = int(parts.path.strip("/") or 0)
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._pool: list[tuple[socket.socket, object]] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> tuple[socket.socket, object]:
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = (sock, sock.makefile("rb"))
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            self._roundtrip(conn, setup)
+        return conn
+
+    @staticmethod
+    def _encode(args: tuple) -> bytes:
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            out.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(out)
+
+    @classmethod
+    def _read(cls, reader):
+        line = reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by server.")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode("utf-8")
+        if kind == b"-":
+            return RespError(rest.decode("utf-8"))
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            if len(data) != length + 2:
+                raise ConnectionError("Connection closed by server.")
+            return data[:-2]
+        if kind == b"*":
+            length = int(rest)
+            return None if length < 0 else [cls._read(reader) for _ in range(length)]
+        raise ConnectionError(f"Unexpected reply: {line!r}")
+
+    def _roundtrip(self, conn, commands: list[tuple]) -> list:
+        sock, reader = conn
+        sock.sendall(b"".join(self._encode(command) for command in commands))
+        replies = [self._read(reader) for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    def pipeline(self, commands: list[tuple]) -> list:
+        if not commands:
+            return []
+        with self._lock:
+            conn = self._pool.pop() if self._pool else None
+        if conn is None:
+            conn = self._connect()
+        try:
+            replies = self._roundtrip(conn, commands)
+        except Exception:
+            conn[0].close()
+            raise
+        with self._lock:
+            if len(self._pool) < self.pool_size:
+                self._pool.append(conn)
+                conn = None
+        if conn is not None:
+            conn[0].close()
+        return replies
+
+    def execute(self, *args):
+        return self.pipeline([args])[0]
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, []
+        for sock, _ in pool:
+            sock.close()
+
+
+_VALUE_VERSION = b"1"
+
+
+def pack_value(encoded: EncodedMenu) -> bytes:
+    """Stored value: version byte, 32-char ETag, gzip of the hit response."""
+    return _VALUE_VERSION + encoded.etag.encode("ascii") + encoded.gzip
+
+
+def unpack_value(value: bytes) -> EncodedMenu | None:
+    if not value or value[:1] != _VALUE_VERSION:
+        return None
+    return EncodedMenu(etag=value[1:33].decode("ascii"), gzip=value[33:])
+
+
+def menu_from_encoded(encoded: EncodedMenu) -> dict:
+    menu = json.loads(encoded.body)
+    menu.pop("cached", None)
+    return menu
+
+
+class RedisBackend:
+    """Menus shared by every node through a Redis-protocol server.
+
+    Values are the pre-serialized hit responses and expire at the end of their
+    day. Writes also go to the node's SQLite tables (kept for search, the
+    sweeper and as a fallback), and reads fall back to them when the server
+    is unreachable, so an outage only costs shared hits.
+    """
+
+    name = "redis"
+
+    def __init__(
+        self,
+        client: RespClient,
+        prefix: str = "menu:",
+        local: SQLiteBackend | None = None,
+        batch_size: int = 500,
+    ):
+        self.client = client
+        self.prefix = prefix
+        self.local = local
+        self.batch_size = batch_size
+
+    def key(self, url: str, date_iso: str) -> str:
+        return f"{self.prefix}{date_iso}:{url}"
+
+    def _fallback(self, action: str, error: Exception) -> None:
+        logger.warning("Shared cache %s failed: %s", action, error)
+
+    def get_many(self, keys: list[Key]) -> dict[Key, dict]:
+        keys = list(dict.fromkeys(keys))
+        found: dict[Key, dict] = {}
+        try:
+            for start in range(0, len(keys), self.batch_size):
+                chunk = keys[start : start + self.batch_size]
+                values = self.client.execute(
+                    "MGET", *(self.key(url, date_iso) for url, date_iso in chunk)
+                )
+                for key, value in zip(chunk, values):
+                    encoded = unpack_value(value) if value else None
+                    if encoded is not None:
+                        found[key] = menu_from_encoded(encoded)
+        except (OSError, RespError) as e:
+            self._fallback("read", e)
+            if self.local is not None:
+                missing = [key for key in keys if key not in found]
+                found.update(self.local.get_many(missing))
+        return found
+
+    def get_response(self, url: str, date_iso: str) -> EncodedMenu | None:
+        try:
+            value = self.client.execute("GET", self.key(url, date_iso))
+        except (OSError, RespError) as e:
+            self._fallback("read", e)
+            return self.local.get_response(url, date_iso) if self.local else None
+        return unpack_value(value) if value else None
+
+    def set_many(self, entries: dict[Key, tuple[dict, EncodedMenu]]) -> None:
+        if self.local is not None:
+            self.local.set_many(entries)
+        now = time.time()
+        commands = [
+            (
+                "SET",
+                self.key(url, date_iso),
+                pack_value(encoded),
+                "EX",
+                max(1, int(expires_at(date_iso) - now)),
+            )
+            for (url, date_iso), (_, encoded) in entries.items()
+        ]
+        try:
+            for start in range(0, len(commands), self.batch_size):
+                self.client.pipeline(commands[start : start + self.batch_size])
+        except (OSError, RespError) as e:
+            self._fallback("write", e)
+
+    def purge(self, today_iso: str) -> int:
+        # Keys expire on their own at the end of their day.
+        return 0
+
+
+def make_backend(name: str, redis_url: str = "", redis_timeout: float = 1.0):
+    if name == "sqlite":
+        return SQLiteBackend()
+    if name == "memory":
+        return MemoryBackend()
+    if name == "redis":
+        return RedisBackend(
+            RespClient(redis_url, timeout=redis_timeout), local=SQLiteBackend()
+        )
+    raise ValueError(f"Unknown CACHE_BACKEND {name!r}.")
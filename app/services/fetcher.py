@@ -0,0 +1,144 @@
+# app/services/fetcher.py
+import re
+import threading
+import zlib
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import DEFAULT_ACCEPT_ENCODING
+
+from app.config import FETCH_MAX_BYTES, FETCH_POOL_SIZE, FETCH_USER_AGENT
+from app.db.db import get_stored_page, save_stored_page
+from app.services.host_health import host_health
+
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.I)
+
+_sessions: dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+@dataclass
+class FetchedPage:
+    url: str
+    html: str
+    not_modified: bool
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+def get_session(url: str) -> requests.Session:
+    """Return the pooled keep-alive session for the host of `url`."""
+    host = urlsplit(url).netloc.lower()
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=FETCH_POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(
+                {
+                    "User-Agent": FETCH_USER_AGENT,
+                    "Accept-Encoding": DEFAULT_ACCEPT_ENCODING,
+                }
+            )
+            _sessions[host] = session
+    return session
+
+
+def close_sessions() -> None:
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def decode_body(body: bytes, content_type: str | None) -> str:
+    """Decode HTML using the header charset, then <meta charset>, then UTF-8."""
+    m = re.search(r"charset=([\w-]+)", content_type or "", re.I)
+    if not m:
+        m = _META_CHARSET_RE.search(body[:4096])
+    encoding = m.group(1) if m else "utf-8"
+    if isinstance(encoding, bytes):
+        encoding = encoding.decode("ascii")
+    try:
+        return body.decode(encoding, errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
+def read_capped(chunks, limit: int | None = None) -> bytes:
+    """Join streamed chunks, stopping once `limit` bytes have been read."""
+    limit = FETCH_MAX_BYTES if limit is None else limit
+    buf = bytearray()
+    for chunk in chunks:
+        buf += chunk
+        if len(buf) >= limit:
+            break
+    return bytes(buf[:limit])
+
+
+def conditional_headers(stored: tuple | None) -> dict:
+    headers = {}
+    if stored:
+        etag, last_modified, _ = stored
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def page_from_response(
+    url: str, stored: tuple | None, status_code: int, headers, text: str
+) -> FetchedPage:
+    """Turn a (possibly 304) response into a FetchedPage, updating page_store.
+
+    Callers must already have raised for HTTP errors other than 304.
+    """
+    if status_code == 304 and stored:
+        etag, last_modified, body = stored
+        return FetchedPage(
+            url=url,
+            html=zlib.decompress(body).decode("utf-8"),
+            not_modified=True,
+            etag=headers.get("ETag", etag),
+            last_modified=headers.get("Last-Modified", last_modified),
+        )
+
+    etag = headers.get("ETag")
+    last_modified = headers.get("Last-Modified")
+    if etag or last_modified:
+        save_stored_page(url, etag, last_modified, zlib.compress(text.encode("utf-8")))
+
+    return FetchedPage(
+        url=url,
+        html=text,
+        not_modified=False,
+        etag=etag,
+        last_modified=last_modified,
+    )
+
+
+def fetch_html(url: str) -> FetchedPage:
+    """Download `url`, revalidating against the stored copy when we have one.
+
+    The body is streamed and cut off at FETCH_MAX_BYTES. A 304 answer is served
+    from the compressed body in page_store and flagged with not_modified=True.
+    Hosts that keep failing are short-circuited by host_health with
+    HostUnavailableError instead of waiting for another timeout.
+    """
+    stored = get_stored_page(url)
+    with (
+        host_health.guard(url) as timeout,
+        get_session(url).get(
+            url, headers=conditional_headers(stored), timeout=timeout, stream=True
+        ) as resp,
+    ):
+        if not (resp.status_code == 304 and stored):
+            resp.raise_for_status()
+        body = read_capped(resp.iter_content(chunk_size=64 * 1024))
+    text = decode_body(body, resp.headers.get("Content-Type"))
+    return page_from_response(url, stored, resp.status_code, resp.headers, text)
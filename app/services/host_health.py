@@ -0,0 +1,255 @@
+# app/services/host_health.py
+import asyncio
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Iterator
+from urllib.parse import urlsplit
+
+from app.config import (
+    FETCH_BREAKER_COOLDOWN,
+    FETCH_BREAKER_THRESHOLD,
+    FETCH_CONNECT_TIMEOUT,
+    FETCH_HOST_CONCURRENCY,
+    FETCH_MIN_TIMEOUT,
+    FETCH_NEGATIVE_TTL,
+    FETCH_TIMEOUT,
+)
+from app.metrics import registry
+
+
+class HostUnavailableError(Exception):
+    """Raised without touching the network when a site is known to be failing."""
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+def is_host_failure(error: BaseException) -> bool:
+    """Timeouts, connection errors and 5xx count against the host; 4xx do not."""
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    return status is None or status >= 500
+
+
+def is_lasting_failure(error: BaseException) -> bool:
+    """Host failures and pages that are gone (404/410) are worth remembering.
+
+    Other 4xx (403, 429, ...) may clear up on the next try and are not cached.
+    """
+    response = getattr(error, "response", None)
+    return is_host_failure(error) or response.status_code in (404, 410)
+
+
+@dataclass
+class HostState:
+    failures: int = 0
+    opened_at: float | None = None
+    probing: bool = False
+    samples: int = 0
+    latency: float = 0.0
+    deviation: float = 0.0
+    semaphore: threading.BoundedSemaphore = field(
+        default_factory=lambda: threading.BoundedSemaphore(FETCH_HOST_CONCURRENCY)
+    )
+
+    def state(self, now: float, cooldown: float) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "open" if now - self.opened_at < cooldown else "half_open"
+
+
+class HostHealth:
+    """Per-host circuit breaker, negative cache and latency-based timeouts.
+
+    After `threshold` consecutive host failures the circuit opens and fetches
+    fail immediately for `cooldown` seconds. Then one probe is let through
+    (half-open): success closes the circuit, failure opens it again. URLs
+    that failed for good (see is_lasting_failure) are also remembered for
+    `negative_ttl` seconds. Read timeouts
+    follow the host's observed latency (mean + 4 deviations), clamped
+    between `min_timeout` and `max_timeout`.
+    """
+
+    def __init__(
+        self,
+        threshold: int = FETCH_BREAKER_THRESHOLD,
+        cooldown: float = FETCH_BREAKER_COOLDOWN,
+        negative_ttl: float = FETCH_NEGATIVE_TTL,
+        min_timeout: float = FETCH_MIN_TIMEOUT,
+        max_timeout: float = FETCH_TIMEOUT,
+        connect_timeout: float = FETCH_CONNECT_TIMEOUT,
+    ):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.negative_ttl = negative_ttl
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.connect_timeout = connect_timeout
+        self._hosts: dict[str, HostState] = {}
+        self._negative: dict[str, tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host: str) -> HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState()
+        return state
+
+    def timeouts(self, url: str) -> tuple[float, float]:
+        """(connect, read) timeouts for the next request to url's host."""
+        with self._lock:
+            state = self._host(host_of(url))
+            read = self.max_timeout
+            if state.samples >= 3:
+                read = state.latency + 4 * state.deviation
+                read = min(self.max_timeout, max(self.min_timeout, read))
+        return min(self.connect_timeout, read), read
+
+    def before_request(self, url: str, now: float | None = None) -> bool:
+        """Raise HostUnavailableError to fail fast; True if this call is the probe."""
+        now = time.monotonic() if now is None else now
+        host = host_of(url)
+        with self._lock:
+            negative = self._negative.get(url)
+            if negative is not None:
+                message, expires_at = negative
+                if expires_at > now:
+                    raise HostUnavailableError(
+                        f"{message} (cached for {expires_at - now:.0f}s)"
+                    )
+                del self._negative[url]
+
+            state = self._host(host)
+            current = state.state(now, self.cooldown)
+            if current == "open":
+                retry_in = self.cooldown - (now - state.opened_at)
+                raise HostUnavailableError(
+                    f"{host} is unavailable after {state.failures} failures, "
+                    f"retrying in {retry_in:.0f}s"
+                )
+            if current == "half_open":
+                if state.probing:
+                    raise HostUnavailableError(f"{host} is being probed")
+                state.probing = True
+                return True
+        return False
+
+    def record_success(self, url: str, elapsed: float) -> None:
+        with self._lock:
+            state = self._host(host_of(url))
+            state.failures = 0
+            state.opened_at = None
+            state.probing = False
+            if state.samples == 0:
+                state.latency = elapsed
+            else:
+                # Exponentially weighted mean and mean deviation, as in TCP RTO.
+                state.deviation += 0.25 * (
+                    abs(elapsed - state.latency) - state.deviation
+                )
+                state.latency += 0.125 * (elapsed - state.latency)
+            state.samples += 1
+
+    def record_failure(
+        self, url: str, error: BaseException, now: float | None = None
+    ) -> None:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if is_lasting_failure(error):
+                self._negative[url] = (
+                    f"Fetching {url} failed recently: {error}",
+                    now + self.negative_ttl,
+                )
+            state = self._host(host_of(url))
+            state.probing = False
+            if not is_host_failure(error):
+                # The host answered (e.g. 404), so it is up.
+                state.failures = 0
+                state.opened_at = None
+                return
+            state.failures += 1
+            if state.failures >= self.threshold or state.opened_at is not None:
+                state.opened_at = now
+
+    def forget(self, url: str) -> None:
+        with self._lock:
+            self._negative.pop(url, None)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hosts.clear()
+            self._negative.clear()
+
+    def stats(self, now: float | None = None) -> dict:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            states = [s.state(now, self.cooldown) for s in self._hosts.values()]
+            return {
+                "hosts": len(states),
+                "open": states.count("open"),
+                "half_open": states.count("half_open"),
+                "negative_cached": sum(
+                    1 for _, expires in self._negative.values() if expires > now
+                ),
+            }
+
+    @contextmanager
+    def guard(self, url: str) -> Iterator[tuple[float, float]]:
+        """Wrap one fetch of url: fail fast, limit concurrency, record the outcome."""
+        self.before_request(url)
+        # Waiting for a slot says nothing about the host, so there is no
+        # timeout here: every fetch holding one is bounded by its own timeouts.
+        semaphore = self._semaphore(url)
+        semaphore.acquire()
+        try:
+            started = time.monotonic()
+            try:
+                yield self.timeouts(url)
+            except Exception as e:
+                self.record_failure(url, e)
+                raise
+            self.record_success(url, time.monotonic() - started)
+        finally:
+            semaphore.release()
+
+    @asynccontextmanager
+    async def guard_async(self, url: str) -> AsyncIterator[tuple[float, float]]:
+        self.before_request(url)
+        semaphore = self._async_semaphore(url)
+        await semaphore.acquire()
+        try:
+            started = time.monotonic()
+            try:
+                yield self.timeouts(url)
+            except Exception as e:
+                self.record_failure(url, e)
+                raise
+            self.record_success(url, time.monotonic() - started)
+        finally:
+            semaphore.release()
+
+    def _semaphore(self, url: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            return self._host(host_of(url)).semaphore
+
+    def _async_semaphore(self, url: str) -> asyncio.Semaphore:
+        # asyncio primitives are bound to one loop, so keep them per loop.
+        semaphores = _async_semaphores.setdefault(asyncio.get_running_loop(), {})
+        host = host_of(url)
+        if host not in semaphores:
+            semaphores[host] = asyncio.Semaphore(FETCH_HOST_CONCURRENCY)
+        return semaphores[host]
+
+
+_async_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = (
+    weakref.WeakKeyDictionary()
+)
+
+host_health = HostHealth()
+registry.gauges(
+    "fetch_hosts", "Tracked restaurant hosts by circuit state.", host_health.stats
+)
@@ -0,0 +1,171 @@
+# app/services/jobs.py
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Iterator
+
+from app.config import (
+    EXTRACTION_LEASE_TTL,
+    JOB_POLL_INTERVAL,
+    JOB_STREAM_TIMEOUT,
+    JOB_WORKERS,
+)
+from app.db.db import (
+    claim_job,
+    create_job,
+    finish_job,
+    get_job,
+    requeue_stale_jobs,
+    update_job_stage,
+)
+from app.metrics import MENU_REQUESTS, on_stage
+from app.services.menu_service import (
+    cached_response,
+    handle_menu_request,
+    validate_menu_request,
+)
+from app.services.singleflight import lease_owner
+from app.services.utils import sse_event
+
+logger = logging.getLogger(__name__)
+
+# Stages worth reporting to clients; db.* and cache spans are too chatty.
+PROGRESS_STAGES = {
+    "fetch.download": "downloading",
+    "fetch.parse": "parsing",
+    "llm.extract": "extracting",
+    "llm.request": "extracting",
+    "llm.tool_round_trip": "normalizing_prices",
+    "llm.validate": "validating",
+}
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, JOB_WORKERS), thread_name_prefix="menu-job"
+            )
+    return _executor
+
+
+def shutdown_job_workers(wait: bool = True) -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+def job_view(job: dict) -> dict:
+    view = {
+        "job_id": job["id"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "url": job["url"],
+        "date": job["date"],
+        "status_url": f"/api/menu/jobs/{job['id']}",
+        "events_url": f"/api/menu/jobs/{job['id']}/events",
+    }
+    if job["status"] in ("done", "failed"):
+        view["http_status"] = job["http_status"]
+        view["result"] = job["result"]
+    return view
+
+
+def run_job(job_id: str) -> None:
+    """Execute a queued job in this thread unless another worker claimed it."""
+    if not claim_job(job_id, lease_owner()):
+        return
+    job = get_job(job_id)
+    last_stage = None
+
+    def report(stage: str) -> None:
+        nonlocal last_stage
+        progress = PROGRESS_STAGES.get(stage)
+        if progress and progress != last_stage:
+            last_stage = progress
+            update_job_stage(job_id, progress)
+
+    try:
+        with on_stage(report):
+            body, status = handle_menu_request(job["url"], job["date"])
+    except Exception as e:
+        logger.exception("Menu job %s failed", job_id)
+        body, status = {"error": f"Menu extraction failed: {e}"}, 500
+    finish_job(job_id, "done" if status == 200 else "failed", status, body)
+
+
+def submit_job(job_id: str) -> None:
+    _get_executor().submit(run_job, job_id)
+
+
+def submit_menu_job(url: str | None, date_str: str | None) -> tuple[dict, int]:
+    """Answer from cache, or queue an extraction job and return its handle (202)."""
+    target_date, error = validate_menu_request(url, date_str, date.today())
+    if error:
+        return error
+
+    cached = cached_response(url, target_date.isoformat())
+    if cached is not None:
+        MENU_REQUESTS.inc(cache="hit")
+        return cached
+
+    job = create_job(uuid.uuid4().hex, url, target_date.isoformat())
+    if job["status"] == "queued":
+        submit_job(job["id"])
+    return job_view(job), 202
+
+
+def job_status(job_id: str) -> tuple[dict, int]:
+    job = get_job(job_id)
+    if job is None:
+        return {"error": "Unknown job id."}, 404
+    return job_view(job), 200
+
+
+def resume_pending_jobs() -> int:
+    """Re-submit jobs left queued, or stuck running, by a previous process."""
+    job_ids = requeue_stale_jobs(stale_after=EXTRACTION_LEASE_TTL)
+    for job_id in job_ids:
+        submit_job(job_id)
+    return len(job_ids)
+
+
+def job_events(
+    job_id: str,
+    poll_interval: float = JOB_POLL_INTERVAL,
+    timeout: float = JOB_STREAM_TIMEOUT,
+) -> Iterator[str]:
+    """Server-Sent Events: a "stage" event per progress change, then "done"."""
+    deadline = time.monotonic() + timeout
+    last = None
+    keepalive_at = time.monotonic() + 15
+    while True:
+        job = get_job(job_id)
+        if job is None:
+            yield sse_event("error", {"error": "Unknown job id."})
+            return
+        view = job_view(job)
+        if job["status"] in ("done", "failed"):
+            yield sse_event("done", view)
+            return
+        if (job["status"], job["stage"]) != last:
+            last = (job["status"], job["stage"])
+            yield sse_event("stage", {"status": job["status"], "stage": job["stage"]})
+            keepalive_at = time.monotonic() + 15
+        elif time.monotonic() >= keepalive_at:
+            # Comment lines keep proxies from closing an idle stream.
+            yield ": keepalive\n\n"
+            keepalive_at = time.monotonic() + 15
+        if time.monotonic() >= deadline:
+            yield sse_event("timeout", view)
+            return
+        time.sleep(poll_interval)
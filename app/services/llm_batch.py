@@ -0,0 +1,199 @@
+# app/services/llm_batch.py
+import json
+import time
+import uuid
+from pathlib import Path
+from typing import Callable
+
+import requests
+
+from app.config import LLM_BATCH_BACKEND, LLM_BATCH_DIR
+from app.services.llm_client import LLMBackend, get_backend, request_headers
+
+CHAT_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def to_jsonl(lines: list[dict]) -> bytes:
+    return "".join(
+        json.dumps(line, ensure_ascii=False) + "\n" for line in lines
+    ).encode("utf-8")
+
+
+def from_jsonl(data: bytes | str) -> list[dict]:
+    if isinstance(data, bytes):
+        data = data.decode("utf-8")
+    return [json.loads(line) for line in data.splitlines() if line.strip()]
+
+
+class OpenAIBatchClient:
+    """Batch API of an OpenAI-compatible server: upload, create, poll, download.
+
+    Every client has the same three methods: submit(lines) -> batch id,
+    status(batch id) -> batch object, and results(batch object) -> output lines.
+    """
+
+    def __init__(self, backend: LLMBackend | None = None):
+        self.backend = backend or get_backend()
+
+    def _url(self, path: str) -> str:
+        return self.backend.base_url.rstrip("/") + path
+
+    def _headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.backend.api_key}"}
+
+    def _timeout(self) -> tuple[float, float]:
+        return self.backend.connect_timeout, self.backend.timeout
+
+    def submit(self, lines: list[dict]) -> str:
+        upload = requests.post(
+            self._url("/files"),
+            headers=self._headers(),
+            data={"purpose": "batch"},
+            files={"file": ("menus.jsonl", to_jsonl(lines), "application/jsonl")},
+            timeout=self._timeout(),
+        )
+        upload.raise_for_status()
+        batch = requests.post(
+            self._url("/batches"),
+            headers=self._headers(),
+            json={
+                "input_file_id": upload.json()["id"],
+                "endpoint": CHAT_ENDPOINT,
+                "completion_window": "24h",
+            },
+            timeout=self._timeout(),
+        )
+        batch.raise_for_status()
+        return batch.json()["id"]
+
+    def status(self, batch_id: str) -> dict:
+        resp = requests.get(
+            self._url(f"/batches/{batch_id}"),
+            headers=self._headers(),
+            timeout=self._timeout(),
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+    def results(self, batch: dict) -> list[dict]:
+        lines: list[dict] = []
+        for file_id in (batch.get("output_file_id"), batch.get("error_file_id")):
+            if not file_id:
+                continue
+            resp = requests.get(
+                self._url(f"/files/{file_id}/content"),
+                headers=self._headers(),
+                timeout=self._timeout(),
+            )
+            resp.raise_for_status()
+            lines += from_jsonl(resp.content)
+        return lines
+
+
+def chat_handler(body: dict) -> dict:
+    """Answer one batch line synchronously from the chat-completions endpoint."""
+    backend = get_backend()
+    resp = requests.post(
+        backend.chat_url,
+        headers=request_headers(),
+        json=body,
+        timeout=(backend.connect_timeout, backend.timeout),
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+
+class LocalBatchClient:
+    """File-based stand-in for the Batch API, for tests and offline runs.
+
+    Each batch is a directory under `root` holding input.jsonl, batch.json and,
+    once done, output.jsonl. The batch completes on the `polls_to_complete`-th
+    status call, when every line is answered by `handler` (by default the
+    configured chat-completions endpoint, e.g. the LLM stub server).
+    """
+
+    def __init__(
+        self,
+        root: Path | str = LLM_BATCH_DIR,
+        handler: Callable[[dict], dict] = chat_handler,
+        polls_to_complete: int = 1,
+    ):
+        self.root = Path(root)
+        self.handler = handler
+        self.polls_to_complete = polls_to_complete
+
+    def _dir(self, batch_id: str) -> Path:
+        return self.root / batch_id
+
+    def _save(self, batch: dict) -> None:
+        (self._dir(batch["id"]) / "batch.json").write_text(json.dumps(batch))
+
+    def submit(self, lines: list[dict]) -> str:
+        batch_id = f"batch_{uuid.uuid4().hex}"
+        self._dir(batch_id).mkdir(parents=True)
+        (self._dir(batch_id) / "input.jsonl").write_bytes(to_jsonl(lines))
+        self._save(
+            {
+                "id": batch_id,
+                "status": "validating",
+                "polls": 0,
+                "created_at": int(time.time()),
+                "request_counts": {"total": len(lines), "completed": 0, "failed": 0},
+            }
+        )
+        return batch_id
+
+    def status(self, batch_id: str) -> dict:
+        batch = json.loads((self._dir(batch_id) / "batch.json").read_text())
+        if batch["status"] in TERMINAL_STATUSES:
+            return batch
+
+        batch["polls"] += 1
+        if batch["polls"] < self.polls_to_complete:
+            batch["status"] = "in_progress"
+        else:
+            self._process(batch)
+        self._save(batch)
+        return batch
+
+    def _process(self, batch: dict) -> None:
+        output = []
+        counts = batch["request_counts"]
+        for line in from_jsonl((self._dir(batch["id"]) / "input.jsonl").read_bytes()):
+            try:
+                body = self.handler(line["body"])
+            except Exception as e:
+                counts["failed"] += 1
+                output.append(
+                    {
+                        "custom_id": line["custom_id"],
+                        "response": None,
+                        "error": {"message": str(e)},
+                    }
+                )
+                continue
+            counts["completed"] += 1
+            output.append(
+                {
+                    "custom_id": line["custom_id"],
+                    "response": {"status_code": 200, "body": body},
+                    "error": None,
+                }
+            )
+        (self._dir(batch["id"]) / "output.jsonl").write_bytes(to_jsonl(output))
+        batch["status"] = "completed"
+        batch["output_file_id"] = "output.jsonl"
+
+    def results(self, batch: dict) -> list[dict]:
+        if not batch.get("output_file_id"):
+            return []
+        return from_jsonl(
+            (self._dir(batch["id"]) / batch["output_file_id"]).read_bytes()
+        )
+
+
+def get_batch_client():
+    if LLM_BATCH_BACKEND == "local":
+        return LocalBatchClient()
+    return OpenAIBatchClient()
@@ -1,139 +1,234 @@
+import hashlib
 import json
+import re
+from dataclasses import dataclass
 from datetime import date
 from typing import List, Optional
 
 import requests
 from pydantic import ValidationError
 
-from app.config import OPENAI_API_KEY
-from app.domain.models import MenuResponse
-from app.services.prompts import build_system_message, build_user_message_strict
+from app.config import (
+    LLM_BASE_URL,
+    LLM_CONNECT_TIMEOUT,
+    LLM_MODEL,
+    LLM_PRICE_MODE,
+    LLM_TIMEOUT,
+    OPENAI_API_KEY,
+)
+from app.domain.models import MenuResponse, WeeklyMenuResponse
+from app.metrics import span
+from app.services.prompts import (
+    PROMPT_VERSION,
+    build_system_message,
+    build_user_message_loose,
+    build_user_message_strict,
+    build_user_message_week,
+)
+from app.services.llm_scheduler import estimate_tokens, scheduler
+from app.services.text_reduction import reduce_page_text
 
 
-def normalize_prices_tool(prices: List[Optional[str]]) -> dict:
-    import re
+@dataclass(frozen=True)
+class LLMBackend:
+    """An OpenAI-compatible chat-completions endpoint."""
 
-    normalized: List[Optional[float]] = []
-    for raw in prices:
-        if raw is None:
-            normalized.append(None)
-            continue
+    base_url: str
+    model: str
+    api_key: str
+    timeout: float = 60.0
+    connect_timeout: float = 10.0
 
-        s = str(raw)
-        m = re.search(r"\d+([.,]\d+)?", s)
-        if not m:
-            normalized.append(None)
-            continue
+    @property
+    def chat_url(self) -> str:
+        return self.base_url.rstrip("/") + "/chat/completions"
+
+
+backend = LLMBackend(
+    base_url=LLM_BASE_URL,
+    model=LLM_MODEL,
+    api_key=OPENAI_API_KEY,
+    timeout=LLM_TIMEOUT,
+    connect_timeout=LLM_CONNECT_TIMEOUT,
+)
+
+
+def get_backend() -> LLMBackend:
+    return backend
+
+
+def set_backend(new_backend: LLMBackend) -> LLMBackend:
+    """Switch the backend used by later calls; returns the previous one."""
+    global backend
+    previous, backend = backend, new_backend
+    return previous
+
+
+# "local": one model call returning raw price strings that are normalized here.
+# "tool": the model calls normalize_prices, costing a second round trip.
+PRICE_MODE = LLM_PRICE_MODE
+
+_PRICE_RE = re.compile(r"\d+([.,]\d+)?")
+
+USER_MESSAGE_BUILDERS = {
+    "strict": build_user_message_strict,
+    "loose": build_user_message_loose,
+    "week": build_user_message_week,
+}
+
+TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "normalize_prices",
+            "description": "Convert an array of raw price strings to numeric values in CZK.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "prices": {
+                        "type": "array",
+                        "items": {"type": ["string", "null"]},
+                    }
+                },
+                "required": ["prices"],
+            },
+        },
+    }
+]
+
+
+def normalize_price(raw) -> Optional[float]:
+    if raw is None:
+        return None
+
+    m = _PRICE_RE.search(str(raw))
+    if not m:
+        return None
+
+    num_str = m.group(0).replace(",", ".")
+    try:
+        return float(num_str)
+    except ValueError:
+        return None
 
-        num_str = m.group(0).replace(",", ".")
-        try:
-            val = float(num_str)
-        except ValueError:
-            normalized.append(None)
-        else:
-            normalized.append(val)
 
+def normalize_prices_tool(prices: List[Optional[str]]) -> dict:
+    normalized: List[Optional[float]] = [normalize_price(raw) for raw in prices]
     return {"normalized": normalized}
 
 
-def call_openai_menu(
-    url: str, page_text: str, target_date: date, mode: str = "strict"
-) -> dict:
-    target_iso = target_date.isoformat()
-    weekday = target_date.strftime("%A")
+def _normalize_item_prices(items) -> None:
+    if not isinstance(items, list):
+        return
+    for item in items:
+        if isinstance(item, dict) and not isinstance(
+            item.get("price"), (int, float, type(None))
+        ):
+            item["price"] = normalize_price(item["price"])
 
-    system_msg = build_system_message()
 
-    if mode == "strict":
-        user_msg = build_user_message_strict(url=url, target_date=target_date)
+def extraction_key(page_text: str) -> str:
+    """Hash identifying an extraction of `page_text` with the current prompt/model."""
+    digest = hashlib.sha256()
+    for part in (PROMPT_VERSION, PRICE_MODE, backend.model, page_text):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
 
-    api_url = "https://api.openai.com/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {OPENAI_API_KEY}",
+
+def request_headers() -> dict:
+    return {
+        "Authorization": f"Bearer {backend.api_key}",
         "Content-Type": "application/json",
     }
 
-    tools = [
-        {
-            "type": "function",
-            "function": {
-                "name": "normalize_prices",
-                "description": "Convert an array of raw price strings to numeric values in CZK.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "prices": {
-                            "type": "array",
-                            "items": {"type": ["string", "null"]},
-                        }
-                    },
-                    "required": ["prices"],
-                },
-            },
+
+def initial_payload(messages: list[dict]) -> dict:
+    if PRICE_MODE == "local":
+        return {
+            "model": backend.model,
+            "messages": messages,
         }
-    ]
+    return {
+        "model": backend.model,
+        "messages": messages,
+        "tools": TOOLS,
+        "tool_choice": "auto",
+    }
 
-    messages = [
-        {"role": "system", "content": system_msg},
-        {"role": "user", "content": user_msg},
-    ]
 
-    payload = {
-        "model": "gpt-4.1-mini",
+def final_payload(messages: list[dict]) -> dict:
+    return {
+        "model": backend.model,
         "messages": messages,
-        "tools": tools,
-        "tool_choice": "auto",
     }
 
-    resp = requests.post(api_url, headers=headers, json=payload, timeout=60)
-    resp.raise_for_status()
-    resp_json = resp.json()
 
-    first_message = resp_json["choices"][0]["message"]
-    tool_calls = first_message.get("tool_calls")
+def append_tool_results(messages: list[dict], first_message: dict) -> None:
+    tool_calls = first_message["tool_calls"]
+    messages.append(
+        {
+            "role": "assistant",
+            "content": first_message.get("content") or "",
+            "tool_calls": tool_calls,
+        }
+    )
+
+    for tool_call in tool_calls:
+        func_name = tool_call["function"]["name"]
+        args_str = tool_call["function"]["arguments"] or "{}"
+        try:
+            args = json.loads(args_str)
+        except json.JSONDecodeError:
+            args = {}
+
+        if func_name == "normalize_prices":
+            tool_result = normalize_prices_tool(args.get("prices", []))
+        else:
+            tool_result = {"error": f"Unknown tool {func_name}"}
 
-    if tool_calls:
         messages.append(
             {
-                "role": "assistant",
-                "content": first_message.get("content") or "",
-                "tool_calls": tool_calls,
+                "role": "tool",
+                "tool_call_id": tool_call["id"],
+                "name": func_name,
+                "content": json.dumps(tool_result, ensure_ascii=False),
             }
         )
 
-        for tool_call in tool_calls:
-            func_name = tool_call["function"]["name"]
-            args_str = tool_call["function"]["arguments"] or "{}"
-            try:
-                args = json.loads(args_str)
-            except json.JSONDecodeError:
-                args = {}
-
-            if func_name == "normalize_prices":
-                tool_result = normalize_prices_tool(args.get("prices", []))
-            else:
-                tool_result = {"error": f"Unknown tool {func_name}"}
-
-            messages.append(
-                {
-                    "role": "tool",
-                    "tool_call_id": tool_call["id"],
-                    "name": func_name,
-                    "content": json.dumps(tool_result, ensure_ascii=False),
-                }
-            )
-
-        payload_final = {
-            "model": "gpt-4.1-mini",
-            "messages": messages,
-        }
-        resp2 = requests.post(api_url, headers=headers, json=payload_final, timeout=60)
-        resp2.raise_for_status()
-        final_message = resp2.json()["choices"][0]["message"]
-        content = final_message["content"]
-    else:
-        content = first_message["content"]
 
+def _post_chat(payload: dict) -> requests.Response:
+    return scheduler.run(
+        lambda: requests.post(
+            backend.chat_url,
+            headers=request_headers(),
+            json=payload,
+            timeout=(backend.connect_timeout, backend.timeout),
+        ),
+        tokens=estimate_tokens(payload),
+    )
+
+
+def _chat_completion_content(messages: list[dict]) -> str | None:
+    """Run the chat, answering any normalize_prices tool calls, and return the text."""
+    with span("llm.request"):
+        resp = _post_chat(initial_payload(messages))
+    resp.raise_for_status()
+    first_message = resp.json()["choices"][0]["message"]
+
+    if not first_message.get("tool_calls"):
+        return first_message["content"]
+
+    append_tool_results(messages, first_message)
+
+    with span("llm.tool_round_trip"):
+        resp2 = _post_chat(final_payload(messages))
+    resp2.raise_for_status()
+    final_message = resp2.json()["choices"][0]["message"]
+    return final_message["content"]
+
+
+def parse_json_content(content: str | None) -> tuple[dict | None, dict | None]:
     cleaned = (content or "").strip()
     if cleaned.startswith("```"):
         start = cleaned.find("{")
@@ -142,13 +237,49 @@ def call_openai_menu(
             cleaned = cleaned[start : end + 1]
 
     try:
-        raw_data = json.loads(cleaned)
+        return json.loads(cleaned), None
     except json.JSONDecodeError:
-        return {
+        return None, {
             "error": "Model did not return valid JSON.",
             "raw_response": cleaned,
         }
 
+
+def build_messages(
+    url: str,
+    page_text: str,
+    target_date: date,
+    mode: str,
+    price_mode: str | None = None,
+) -> list[dict]:
+    build_user_message = USER_MESSAGE_BUILDERS[mode]
+    price_mode = price_mode or PRICE_MODE
+    # Weekly extraction needs every day; single-day modes only get their section.
+    page_text = reduce_page_text(
+        page_text, target_date=None if mode == "week" else target_date
+    )
+    return [
+        {"role": "system", "content": build_system_message(price_mode=price_mode)},
+        {
+            "role": "user",
+            "content": build_user_message(
+                url=url,
+                target_date=target_date,
+                page_text=page_text,
+                price_mode=price_mode,
+            ),
+        },
+    ]
+
+
+def menu_from_content(content: str | None, url: str, target_date: date) -> dict:
+    raw_data, error = parse_json_content(content)
+    if error:
+        return error
+
+    if isinstance(raw_data, dict):
+        _normalize_item_prices(raw_data.get("menu_items"))
+
     try:
         menu_obj = MenuResponse(**raw_data)
     except ValidationError as e:
@@ -158,8 +289,67 @@ def call_openai_menu(
             "raw_response": raw_data,
         }
 
-    menu_obj.date = target_iso
-    menu_obj.day_of_week = weekday
+    menu_obj.date = target_date.isoformat()
+    menu_obj.day_of_week = target_date.strftime("%A")
     menu_obj.source_url = url
 
-    return json.loads(menu_obj.model_dump_json())
+    return menu_obj.model_dump(mode="json")
+
+
+def week_menu_from_content(content: str | None, url: str) -> dict:
+    raw_data, error = parse_json_content(content)
+    if error:
+        return error
+
+    if isinstance(raw_data, dict):
+        for day in raw_data.get("days") or []:
+            if isinstance(day, dict):
+                _normalize_item_prices(day.get("menu_items"))
+
+    try:
+        week_obj = WeeklyMenuResponse(**raw_data)
+    except ValidationError as e:
+        return {
+            "error": "Model JSON does not match expected schema.",
+            "validation_errors": e.errors(),
+            "raw_response": raw_data,
+        }
+
+    days: dict[str, dict] = {}
+    for day in week_obj.days:
+        try:
+            day_date = date.fromisoformat(day.date)
+        except ValueError:
+            continue
+        menu_obj = MenuResponse(
+            restaurant_name=week_obj.restaurant_name,
+            date=day_date.isoformat(),
+            day_of_week=day_date.strftime("%A"),
+            menu_items=day.menu_items,
+            daily_menu=day.daily_menu,
+            source_url=url,
+        )
+        days[day_date.isoformat()] = menu_obj.model_dump(mode="json")
+
+    return {"days": days}
+
+
+def call_openai_menu(
+    url: str, page_text: str, target_date: date, mode: str = "strict"
+) -> dict:
+    messages = build_messages(url, page_text, target_date, mode)
+    content = _chat_completion_content(messages)
+    with span("llm.validate"):
+        return menu_from_content(content, url, target_date)
+
+
+def call_openai_week_menu(url: str, page_text: str, target_date: date) -> dict:
+    """Extract every day of target_date's week in one call.
+
+    Returns {"days": {date_iso: menu}} with each menu shaped like the result of
+    call_openai_menu, or an error dict.
+    """
+    messages = build_messages(url, page_text, target_date, "week")
+    content = _chat_completion_content(messages)
+    with span("llm.validate"):
+        return week_menu_from_content(content, url)
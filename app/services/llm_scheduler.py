@@ -0,0 +1,317 @@
+# app/services/llm_scheduler.py
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Iterator, TypeVar
+
+import requests
+
+from app.config import (
+    LLM_BACKOFF_BASE,
+    LLM_BACKOFF_MAX,
+    LLM_MAX_RETRIES,
+    LLM_REQUESTS_PER_MINUTE,
+    LLM_RETRY_BUDGET,
+    LLM_TOKENS_PER_MINUTE,
+)
+from app.metrics import LLM_RESPONSES, record_llm_usage, registry
+
+try:
+    import httpx
+except ImportError:  # only needed by the async pipeline
+    httpx = None
+
+R = TypeVar("R")
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Only failures to connect are retried: the chat POST is not idempotent, and
+# after a read timeout the server may still be generating (and billing) it.
+TRANSIENT_ERRORS = (requests.ConnectionError,)
+if httpx is not None:
+    TRANSIENT_ERRORS += (httpx.ConnectError, httpx.ConnectTimeout)
+
+_priority: ContextVar[int] = ContextVar("llm_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def llm_priority(priority: int) -> Iterator[None]:
+    """Run LLM calls made inside the block with `priority` (lower goes first)."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def estimate_tokens(payload: dict, completion_tokens: int = 1000) -> int:
+    """Rough prompt size (~4 characters per token) plus room for the answer."""
+    chars = sum(len(str(m.get("content") or "")) for m in payload.get("messages", []))
+    return chars // 4 + completion_tokens
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute, holding at most one minute's worth."""
+
+    def __init__(self, per_minute: float, now: float | None = None):
+        self.per_minute = per_minute
+        self.capacity = per_minute
+        self.level = per_minute
+        self.updated = time.monotonic() if now is None else now
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self.updated)
+        self.level = min(self.capacity, self.level + elapsed * self.per_minute / 60)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        if self.per_minute <= 0:
+            return 0.0
+        self._refill(now)
+        # A request bigger than the whole bucket only has to wait for a full one.
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing * 60 / self.per_minute)
+
+    def take(self, amount: float, now: float) -> None:
+        if self.per_minute > 0:
+            self._refill(now)
+            self.level -= amount
+
+
+def retry_after_seconds(headers) -> float | None:
+    """Delay requested by a Retry-After (seconds or HTTP date) or retry-after-ms."""
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class LLMScheduler:
+    """Admit LLM calls in priority order within request and token budgets.
+
+    Calls queue on a heap ordered by (priority, arrival); only the head of the
+    queue may take budget, so pre-warm and batch work never delays an
+    interactive request that is already waiting. Throttled and failed calls
+    are retried with exponential backoff, honouring Retry-After, for at most
+    `retry_budget` seconds, and a 429 pauses the whole queue rather than
+    letting every caller hammer the API.
+    """
+
+    # How often an async call re-checks its place while others are ahead.
+    ASYNC_POLL = 0.02
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        max_retries: int = 4,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        retry_budget: float = 120.0,
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_budget = retry_budget
+        self.paused_until = 0.0
+        self.retries = 0
+        self._cond = threading.Condition()
+        self._queue: list[tuple[int, int]] = []
+        self._seq = itertools.count()
+
+    def _admit(self, ticket: tuple[int, int], tokens: int) -> float | None:
+        """Take the budget if `ticket` is first in line (caller holds _cond).
+
+        Returns 0 once admitted, the seconds until the budget allows it, or
+        None while other calls are ahead.
+        """
+        if self._queue[0] != ticket:
+            return None
+        now = time.monotonic()
+        wait = max(
+            self.paused_until - now,
+            self.requests.wait_time(1, now),
+            self.tokens.wait_time(tokens, now),
+        )
+        if wait > 0:
+            return wait
+        self.requests.take(1, now)
+        self.tokens.take(tokens, now)
+        return 0.0
+
+    def _leave(self, ticket: tuple[int, int]) -> None:
+        self._queue.remove(ticket)
+        heapq.heapify(self._queue)
+        self._cond.notify_all()
+
+    def acquire(self, tokens: int, priority: int | None = None) -> None:
+        """Block until this call is first in line and the budgets allow it."""
+        priority = _priority.get() if priority is None else priority
+        ticket = (priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            try:
+                while (wait := self._admit(ticket, tokens)) != 0:
+                    self._cond.wait(wait)
+            finally:
+                self._leave(ticket)
+
+    async def acquire_async(self, tokens: int, priority: int | None = None) -> None:
+        """Event-loop twin of acquire, sharing its queue.
+
+        Waits with asyncio.sleep instead of parking an executor thread per
+        throttled call, re-checking every ASYNC_POLL seconds while others are
+        ahead.
+        """
+        priority = _priority.get() if priority is None else priority
+        ticket = (priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._admit(ticket, tokens)
+                if wait == 0:
+                    return
+                await asyncio.sleep(self.ASYNC_POLL if wait is None else wait)
+        finally:
+            with self._cond:
+                self._leave(ticket)
+
+    def record_usage(self, estimated: int, response) -> None:
+        """Charge the token bucket with the real usage reported by the API."""
+        if response.headers.get("Content-Type", "").startswith("text/event-stream"):
+            # Reading a streamed body here would consume it; its last chunk
+            # carries the usage, which the reader passes to charge_usage.
+            return
+        try:
+            usage = response.json()["usage"]
+        except (ValueError, KeyError, TypeError):
+            return
+        self.charge_usage(estimated, usage)
+
+    def charge_usage(self, estimated: int, usage: dict) -> None:
+        try:
+            used = usage["total_tokens"]
+        except (KeyError, TypeError):
+            return
+        record_llm_usage(usage)
+        with self._cond:
+            self.tokens.take(used - estimated, time.monotonic())
+
+    def retry_delay(
+        self, attempt: int, response, deadline: float = float("inf")
+    ) -> float | None:
+        """Seconds to wait before retrying, or None if `response` is final.
+
+        No retry is offered that would start after `deadline` (monotonic).
+        """
+        LLM_RESPONSES.inc(
+            status=str(response.status_code) if response is not None else "error"
+        )
+        if response is not None and response.status_code not in RETRY_STATUSES:
+            return None
+        if attempt >= self.max_retries:
+            return None
+        delay = retry_after_seconds(response.headers) if response is not None else None
+        if delay is None:
+            delay = self.backoff_base * 2**attempt * random.uniform(0.5, 1.0)
+        delay = min(delay, self.backoff_max)
+        if response is not None and response.status_code == 429:
+            with self._cond:
+                self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        if time.monotonic() + delay > deadline:
+            return None
+        self.retries += 1
+        return delay
+
+    def run(self, send: Callable[[], R], tokens: int, priority: int | None = None) -> R:
+        """Call `send` (an HTTP POST) under the limits, retrying transient errors."""
+        priority = _priority.get() if priority is None else priority
+        deadline = time.monotonic() + self.retry_budget
+        for attempt in itertools.count():
+            self.acquire(tokens, priority)
+            try:
+                response = send()
+            except TRANSIENT_ERRORS:
+                delay = self.retry_delay(attempt, None, deadline)
+                if delay is None:
+                    raise
+            else:
+                delay = self.retry_delay(attempt, response, deadline)
+                if delay is None:
+                    self.record_usage(tokens, response)
+                    return response
+                # Release the connection; streamed bodies stay open otherwise.
+                close = getattr(response, "close", None)
+                if close is not None:
+                    close()
+            time.sleep(delay)
+
+    async def run_async(
+        self,
+        send: Callable[[], Awaitable[R]],
+        tokens: int,
+        priority: int | None = None,
+    ) -> R:
+        priority = _priority.get() if priority is None else priority
+        deadline = time.monotonic() + self.retry_budget
+        for attempt in itertools.count():
+            await self.acquire_async(tokens, priority)
+            try:
+                response = await send()
+            except TRANSIENT_ERRORS:
+                delay = self.retry_delay(attempt, None, deadline)
+                if delay is None:
+                    raise
+            else:
+                delay = self.retry_delay(attempt, response, deadline)
+                if delay is None:
+                    self.record_usage(tokens, response)
+                    return response
+                aclose = getattr(response, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"queued": len(self._queue), "retries": self.retries}
+
+
+scheduler = LLMScheduler(
+    requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute=LLM_TOKENS_PER_MINUTE,
+    max_retries=LLM_MAX_RETRIES,
+    backoff_base=LLM_BACKOFF_BASE,
+    backoff_max=LLM_BACKOFF_MAX,
+    retry_budget=LLM_RETRY_BUDGET,
+)
+registry.gauges(
+    "llm_scheduler", "Queued LLM calls and retries so far.", scheduler.stats
+)
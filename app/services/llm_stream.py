@@ -0,0 +1,183 @@
+# app/services/llm_stream.py
+import json
+from datetime import date
+from typing import Iterator
+
+import requests
+from pydantic import ValidationError
+
+from app.domain.models import MenuItem
+from app.metrics import span
+from app.services import llm_client
+from app.services.llm_scheduler import estimate_tokens, scheduler
+
+
+class MenuItemParser:
+    """Incremental scanner for a streamed MenuResponse JSON document.
+
+    feed() takes raw text as it arrives and returns the entries of the
+    top-level "menu_items" array whose objects have closed since the last
+    call. Top-level string fields (e.g. restaurant_name) are kept in `fields`
+    once complete. Text around the root object, such as code fences, is
+    ignored.
+    """
+
+    def __init__(self):
+        self.fields: dict[str, str] = {}
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._text: list[str] = []
+        self._key: str | None = None
+        self._expect_key = False
+        self._in_items = False
+        self._item: list[str] | None = None
+
+    def _end_top_level_string(self) -> None:
+        try:
+            value = json.loads('"' + "".join(self._text) + '"')
+        except ValueError:
+            return
+        if self._expect_key:
+            self._key = value
+        elif self._key is not None:
+            self.fields[self._key] = value
+
+    def feed(self, chunk: str) -> list[dict]:
+        completed: list[dict] = []
+        for ch in chunk:
+            if self._item is not None:
+                self._item.append(ch)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._end_top_level_string()
+                    continue
+                if self._depth == 1:
+                    self._text.append(ch)
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._text = []
+            elif ch in "{[":
+                if self._depth == 2 and self._in_items and self._item is None:
+                    if ch == "{":
+                        self._item = [ch]
+                elif self._depth == 1 and ch == "[" and self._key == "menu_items":
+                    self._in_items = not self._expect_key
+                self._depth += 1
+                if self._depth == 1:
+                    self._expect_key = True
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 2 and self._item is not None:
+                    raw, self._item = "".join(self._item), None
+                    try:
+                        item = json.loads(raw)
+                    except ValueError:
+                        continue
+                    if isinstance(item, dict):
+                        completed.append(item)
+                elif self._depth == 1:
+                    self._in_items = False
+            elif self._depth == 1:
+                if ch == ",":
+                    self._expect_key = True
+                elif ch == ":":
+                    self._expect_key = False
+        return completed
+
+
+def validate_item(raw: dict) -> dict | None:
+    """The item as it will appear in the final menu, or None if it is invalid."""
+    raw = dict(raw)
+    if not isinstance(raw.get("price"), (int, float, type(None))):
+        raw["price"] = llm_client.normalize_price(raw["price"])
+    try:
+        return MenuItem(**raw).model_dump(mode="json")
+    except ValidationError:
+        return None
+
+
+def stream_payload(messages: list[dict]) -> dict:
+    return {
+        "model": llm_client.get_backend().model,
+        "messages": messages,
+        "stream": True,
+        "stream_options": {"include_usage": True},
+    }
+
+
+def stream_chat_content(messages: list[dict]) -> Iterator[str]:
+    """Yield the assistant's text as it is generated (chat-completions SSE)."""
+    backend = llm_client.get_backend()
+    payload = stream_payload(messages)
+    tokens = estimate_tokens(payload)
+    with span("llm.request"):
+        resp = scheduler.run(
+            lambda: requests.post(
+                backend.chat_url,
+                headers=llm_client.request_headers(),
+                json=payload,
+                timeout=(backend.connect_timeout, backend.timeout),
+                stream=True,
+            ),
+            tokens=tokens,
+        )
+    with resp:
+        resp.raise_for_status()
+        # chunk_size=None hands over each network chunk as soon as it arrives.
+        for line in resp.iter_lines(chunk_size=None):
+            if not line.startswith(b"data:"):
+                continue
+            data = line[5:].strip()
+            if data == b"[DONE]":
+                break
+            try:
+                chunk = json.loads(data)
+            except ValueError:
+                continue
+            if chunk.get("usage"):
+                scheduler.charge_usage(tokens, chunk["usage"])
+            for choice in chunk.get("choices") or []:
+                content = (choice.get("delta") or {}).get("content")
+                if content:
+                    yield content
+
+
+def stream_openai_menu(
+    url: str, page_text: str, target_date: date, mode: str = "strict"
+) -> Iterator[tuple[str, dict]]:
+    """Extract a menu with a streamed completion.
+
+    Yields ("item", item) for each menu item as soon as the model has finished
+    writing it, ("restaurant", {"restaurant_name": ...}) once that field is
+    complete, then ("menu", menu) with the result call_openai_menu would have
+    returned for the whole text. Prices are always normalized locally:
+    the normalize_prices tool would need a second, non-streamed round trip.
+    """
+    messages = llm_client.build_messages(
+        url, page_text, target_date, mode, price_mode="local"
+    )
+    parser = MenuItemParser()
+    content: list[str] = []
+    named = False
+    for text in stream_chat_content(messages):
+        content.append(text)
+        for raw in parser.feed(text):
+            item = validate_item(raw)
+            if item is not None:
+                yield "item", item
+        if not named and parser.fields.get("restaurant_name"):
+            named = True
+            yield "restaurant", {"restaurant_name": parser.fields["restaurant_name"]}
+
+    with span("llm.validate"):
+        yield "menu", llm_client.menu_from_content("".join(content), url, target_date)
@@ -1,68 +1,403 @@
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date
+from time import perf_counter
 
+from app.config import (
+    BATCH_MAX_ITEMS,
+    BATCH_MAX_WORKERS,
+    EXTRACTION_LEASE_POLL,
+    EXTRACTION_LEASE_TTL,
+    TEMPLATE_EXTRACTION,
+    WEEKLY_EXTRACTION,
+)
+from app.metrics import MENU_EXTRACTIONS, MENU_REQUESTS, span
 from app.services.utils import parse_input_date
-from app.services.cache import delete_old_cache, get_cached_menu, save_menu
+from app.domain.models import MenuResponse
+from app.domain.responses import EncodedMenu
+from app.services.cache import (
+    get_cached_menu,
+    get_cached_menus,
+    get_cached_response,
+    get_extraction,
+    save_extractions,
+    save_menu,
+)
 from app.services.scraper import fetch_page_text
-from app.services.llm_client import call_openai_menu
+from app.services.llm_client import (
+    call_openai_menu,
+    call_openai_week_menu,
+    extraction_key,
+)
+from app.services.llm_scheduler import PRIORITY_BATCH, llm_priority
+from app.services.singleflight import SingleFlight, run_with_lease
+from app.services.templates import learn_from_extraction, template_menu
+from app.services.text_reduction import fits_prompt
 
+logger = logging.getLogger(__name__)
 
-def handle_menu_request(
-    url: str | None,
-    date_str: str | None,
-    is_testing: bool = False,
-) -> tuple[dict, int]:
+_extractions = SingleFlight()
 
-    if not url:
-        return {"error": "Missing 'url' in JSON payload."}, 400
 
-    today = date.today()
-    today_iso = today.isoformat()
+def validate_menu_request(
+    url: str | None, date_str: str | None, today: date
+) -> tuple[date | None, tuple[dict, int] | None]:
+    if not url:
+        return None, ({"error": "Missing 'url' in JSON payload."}, 400)
 
     try:
         target_date = parse_input_date(date_str)
     except ValueError:
-        return {
-            "error": "Invalid 'date' format. Use YYYY-MM-DD, DD.MM.YYYY or DD.MM."
-        }, 400
+        return None, (
+            {"error": "Invalid 'date' format. Use YYYY-MM-DD, DD.MM.YYYY or DD.MM."},
+            400,
+        )
 
     if target_date < today:
-        return {"error": "Date cannot be in the past."}, 400
+        return None, ({"error": "Date cannot be in the past."}, 400)
 
-    target_iso = target_date.isoformat()
+    return target_date, None
 
-    delete_old_cache(today_iso)
 
+def cached_response(url: str, target_iso: str) -> tuple[dict, int] | None:
     cached_menu = get_cached_menu(url, target_iso)
-    if cached_menu is not None:
-        cached_menu["cached"] = True
-        return cached_menu, 200
+    if cached_menu is None:
+        return None
+    cached_menu["cached"] = True
+    return cached_menu, 200
+
 
+def cached_menu_response(url: str | None, date_str: str | None) -> EncodedMenu | None:
+    """The pre-serialized cache hit for a request, or None to take the full path.
+
+    Invalid requests also return None so handle_menu_request reports the error.
+    """
+    if not url:
+        return None
     try:
-        page_text = fetch_page_text(url)
-    except Exception as e:
-        return {"error": f"Failed to download page: {e}"}, 502
+        target_date = parse_input_date(date_str)
+    except ValueError:
+        return None
+    if target_date < date.today():
+        return None
+
+    with span("cache.lookup"):
+        encoded = get_cached_response(url, target_date.isoformat())
+    if encoded is not None:
+        MENU_REQUESTS.inc(cache="hit")
+    return encoded
+
 
+def reuse_extraction(content_key: str, url: str, target_date: date) -> dict | None:
+    """Return the stored extraction of identical page text for target_date."""
+    menu = get_extraction(content_key, target_date.isoformat())
+    if menu is not None:
+        menu.update(
+            date=target_date.isoformat(),
+            day_of_week=target_date.strftime("%A"),
+            source_url=url,
+        )
+    return menu
+
+
+def store_week_days(content_key: str, week: dict) -> dict[str, dict]:
+    days = {
+        date_iso: menu
+        for date_iso, menu in (week.get("days") or {}).items()
+        if menu.get("menu_items")
+    }
+    if days:
+        save_extractions(content_key, days)
+    return days
+
+
+def week_day_menu(
+    content_key: str, week: dict, url: str, page_text: str, target_date: date
+) -> dict | None:
+    """target_date's menu from a week extraction, or None to ask day by day.
+
+    A weekend the week does not list yields an empty menu, stored for the page
+    text like the listed days, so later misses for it skip the LLM. That is
+    only trusted when the whole page fit in the week prompt; other missing
+    days may have been cut off or overlooked and go to single-day extraction.
+    """
+    days = store_week_days(content_key, week)
+    target_iso = target_date.isoformat()
+    if target_iso in days or not days:
+        return days.get(target_iso)
+    if target_date.weekday() < 5 or not fits_prompt(page_text):
+        return None
+
+    menu = MenuResponse(
+        restaurant_name=next(iter(days.values())).get("restaurant_name"),
+        date=target_iso,
+        day_of_week=target_date.strftime("%A"),
+        menu_items=[],
+        source_url=url,
+    ).model_dump(mode="json")
+    save_extractions(content_key, {target_iso: menu})
+    return menu
+
+
+def has_menu_items(menu: dict | None) -> bool:
+    return bool(menu) and "error" not in menu and bool(menu.get("menu_items"))
+
+
+def extract_with_template(url: str, page_text: str, target_date: date) -> dict | None:
+    """Try the page's learned template; None means the LLM has to do it."""
+    if not TEMPLATE_EXTRACTION:
+        return None
     try:
-        menu = call_openai_menu(url, page_text, target_date, mode="strict")
-    except Exception as e:
-        return {"error": f"OpenAI API call failed: {e}"}, 500
+        with span("template.extract"):
+            menu = template_menu(url, page_text, target_date)
+    except Exception:
+        return None
+    if menu is not None:
+        MENU_EXTRACTIONS.inc(source="template")
+    return menu
+
+
+def refresh_template(
+    url: str, page_text: str, target_date: date, menu: dict, source: str = "llm"
+) -> None:
+    """Refresh the page's template from an LLM extraction; never fails the request."""
+    MENU_EXTRACTIONS.inc(source=source)
+    if not TEMPLATE_EXTRACTION or not has_menu_items(menu):
+        return
+    try:
+        learn_from_extraction(url, page_text, target_date, menu)
+    except (KeyError, ValueError, re.error):
+        # A menu the template learner cannot make sense of (ValueError also
+        # covers pydantic's ValidationError); the next extraction may fit.
+        pass
+    except Exception:
+        logger.warning("Could not refresh the template of %s", url, exc_info=True)
+
+
+def finish_extraction(
+    url: str, target_date: date, content_key: str, menu: dict, reused: bool
+) -> tuple[dict, int]:
+    if "error" in menu:
+        return menu, 500
+
+    if has_menu_items(menu):
+        if not reused:
+            save_extractions(content_key, {target_date.isoformat(): menu})
+        save_menu(url, target_date.isoformat(), menu)
+
+    menu["cached"] = False
+    return menu, 200
 
-    if "error" not in menu and not (menu.get("menu_items") or []):
+
+def _extract_with_llm(
+    url: str, page_text: str, target_date: date, content_key: str
+) -> dict:
+    if WEEKLY_EXTRACTION:
+        week = call_openai_week_menu(url, page_text, target_date)
+        menu = week_day_menu(content_key, week, url, page_text, target_date)
+        if menu is not None:
+            return menu
+
+    menu = call_openai_menu(url, page_text, target_date, mode="strict")
+
+    if "error" not in menu and not has_menu_items(menu):
         try:
             fallback = call_openai_menu(url, page_text, target_date, mode="loose")
         except Exception:
             fallback = None
 
-        if fallback and "error" not in fallback and (fallback.get("menu_items") or []):
+        if has_menu_items(fallback):
             menu = fallback
 
-    if "error" in menu:
-        return menu, 500
+    return menu
 
-    items = menu.get("menu_items") or []
 
-    if items:
-        save_menu(url, target_iso, menu)
+def _extract_menu(url: str, target_date: date) -> tuple[dict, int]:
+    try:
+        page_text = fetch_page_text(url)
+    except Exception as e:
+        return {"error": f"Failed to download page: {e}"}, 502
 
-    menu["cached"] = False
-    return menu, 200
+    # Unchanged page text (e.g. a weekly menu asked for another day) reuses the
+    # stored extraction instead of going back to the LLM.
+    content_key = extraction_key(page_text)
+    menu = reuse_extraction(content_key, url, target_date)
+    reused = menu is not None
+
+    if not reused:
+        menu = extract_with_template(url, page_text, target_date)
+
+    if menu is None:
+        try:
+            with span("llm.extract"):
+                menu = _extract_with_llm(url, page_text, target_date, content_key)
+        except Exception as e:
+            return {"error": f"OpenAI API call failed: {e}"}, 500
+        refresh_template(url, page_text, target_date, menu)
+
+    return finish_extraction(url, target_date, content_key, menu, reused)
+
+
+def _extract_menu_coalesced(url: str, target_date: date) -> tuple[dict, int]:
+    """Extract (url, date) once even when many threads or workers miss at once."""
+    target_iso = target_date.isoformat()
+
+    def lead() -> tuple[dict, int]:
+        return run_with_lease(
+            url,
+            target_iso,
+            work=lambda: _extract_menu(url, target_date),
+            check_done=lambda: cached_response(url, target_iso),
+            ttl=EXTRACTION_LEASE_TTL,
+            poll_interval=EXTRACTION_LEASE_POLL,
+        )
+
+    (body, status), shared = _extractions.do((url, target_iso), lead)
+    return (dict(body) if shared else body), status
+
+
+def _extract_batch_item(url: str, target_date: date) -> tuple[dict, int]:
+    # Batch sweeps yield to interactive requests when the LLM budget is tight.
+    with llm_priority(PRIORITY_BATCH):
+        return _extract_menu_coalesced(url, target_date)
+
+
+def handle_menu_request(
+    url: str | None,
+    date_str: str | None,
+    is_testing: bool = False,
+) -> tuple[dict, int]:
+
+    today = date.today()
+
+    target_date, error = validate_menu_request(url, date_str, today)
+    if error:
+        return error
+
+    target_iso = target_date.isoformat()
+
+    # Expired rows are purged by app.services.sweeper, never on the request path.
+    with span("cache.lookup"):
+        cached = cached_response(url, target_iso)
+    if cached is not None:
+        MENU_REQUESTS.inc(cache="hit")
+        return cached
+
+    MENU_REQUESTS.inc(cache="miss")
+    with span("menu.extract"):
+        return _extract_menu_coalesced(url, target_date)
+
+
+def _batch_item_result(url, date_str, body: dict, status: int, started: float) -> dict:
+    return {
+        "url": url,
+        "date": date_str,
+        "status": status,
+        "elapsed_ms": round((perf_counter() - started) * 1000, 2),
+        "result": body,
+    }
+
+
+def handle_batch_menu_request(
+    items: list | None,
+    is_testing: bool = False,
+) -> tuple[dict, int]:
+    """Resolve many (url, date) pairs: one cache lookup, then concurrent extraction."""
+    if not isinstance(items, list) or not items:
+        return {"error": "Missing 'items' list in JSON payload."}, 400
+
+    if len(items) > BATCH_MAX_ITEMS:
+        return {"error": f"Too many items, maximum is {BATCH_MAX_ITEMS}."}, 400
+
+    batch_started = perf_counter()
+    today = date.today()
+
+    results: list[dict | None] = [None] * len(items)
+    requested: dict[int, tuple[str, date]] = {}
+    started_at: dict[int, float] = {}
+
+    for index, item in enumerate(items):
+        started_at[index] = perf_counter()
+        if not isinstance(item, dict):
+            results[index] = _batch_item_result(
+                None,
+                None,
+                {"error": "Each item must be an object with 'url' and 'date'."},
+                400,
+                started_at[index],
+            )
+            continue
+
+        url = item.get("url")
+        date_str = item.get("date")
+        if not isinstance(url, (str, type(None))) or not isinstance(
+            date_str, (str, type(None))
+        ):
+            results[index] = _batch_item_result(
+                url,
+                date_str,
+                {"error": "'url' and 'date' must be strings."},
+                400,
+                started_at[index],
+            )
+            continue
+
+        target_date, error = validate_menu_request(url, date_str, today)
+        if error:
+            body, status = error
+            results[index] = _batch_item_result(
+                url, date_str, body, status, started_at[index]
+            )
+            continue
+
+        requested[index] = (url, target_date)
+
+    with span("cache.lookup"):
+        cached = get_cached_menus(
+            [(url, target_date.isoformat()) for url, target_date in requested.values()]
+        )
+
+    # The same (url, date) may appear several times; extract it only once.
+    misses: dict[tuple[str, str], list[int]] = {}
+    for index, (url, target_date) in requested.items():
+        key = (url, target_date.isoformat())
+        cached_menu = cached.get(key)
+        MENU_REQUESTS.inc(cache="hit" if cached_menu is not None else "miss")
+        if cached_menu is not None:
+            body = dict(cached_menu)
+            body["cached"] = True
+            results[index] = _batch_item_result(
+                url, key[1], body, 200, started_at[index]
+            )
+        else:
+            misses.setdefault(key, []).append(index)
+
+    if misses:
+        workers = max(1, min(BATCH_MAX_WORKERS, len(misses)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_extract_batch_item, key[0], requested[indexes[0]][1]): key
+                for key, indexes in misses.items()
+            }
+            # Collect in completion order so elapsed_ms is taken when each
+            # item finished, not when the slowest earlier item did.
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    body, status = future.result()
+                except Exception as e:
+                    body, status = {"error": f"Menu extraction failed: {e}"}, 500
+                for index in misses[key]:
+                    results[index] = _batch_item_result(
+                        key[0], key[1], dict(body), status, started_at[index]
+                    )
+
+    return {
+        "results": results,
+        "count": len(results),
+        "cached_count": sum(
+            1 for r in results if r["status"] == 200 and r["result"].get("cached")
+        ),
+        "elapsed_ms": round((perf_counter() - batch_started) * 1000, 2),
+    }, 200
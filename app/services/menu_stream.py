@@ -0,0 +1,140 @@
+# app/services/menu_stream.py
+import time
+from datetime import date
+from typing import Iterator
+
+from app.config import EXTRACTION_LEASE_POLL, EXTRACTION_LEASE_TTL
+from app.db.db import acquire_lease, release_lease
+from app.metrics import MENU_REQUESTS, span
+from app.services.llm_client import call_openai_menu, extraction_key
+from app.services.llm_stream import stream_openai_menu
+from app.services.menu_service import (
+    cached_response,
+    extract_with_template,
+    finish_extraction,
+    has_menu_items,
+    refresh_template,
+    reuse_extraction,
+    validate_menu_request,
+)
+from app.services.scraper import fetch_page_text
+from app.services.singleflight import lease_owner
+from app.services.utils import sse_event
+
+KEEPALIVE_INTERVAL = 15
+
+
+def _error(body: dict, status: int) -> str:
+    return sse_event("error", dict(body, status=status))
+
+
+def _done(body: dict, status: int) -> str:
+    if status != 200:
+        return _error(body, status)
+    return sse_event("done", body)
+
+
+def _stream_llm(url: str, page_text: str, target_date: date) -> Iterator[str | dict]:
+    """Yield SSE messages while the model writes, then the finished menu dict."""
+    menu = None
+    with span("llm.extract"):
+        for kind, value in stream_openai_menu(url, page_text, target_date):
+            if kind == "menu":
+                menu = value
+            else:
+                yield sse_event(kind, value)
+
+        if "error" not in menu and not has_menu_items(menu):
+            try:
+                fallback = call_openai_menu(url, page_text, target_date, mode="loose")
+            except Exception:
+                fallback = None
+            if has_menu_items(fallback):
+                menu = fallback
+    yield menu
+
+
+def _extract_events(url: str, target_date: date) -> Iterator[str]:
+    try:
+        page_text = fetch_page_text(url)
+    except Exception as e:
+        yield _error({"error": f"Failed to download page: {e}"}, 502)
+        return
+
+    content_key = extraction_key(page_text)
+    menu = reuse_extraction(content_key, url, target_date)
+    reused = menu is not None
+
+    if not reused:
+        menu = extract_with_template(url, page_text, target_date)
+
+    if menu is None:
+        try:
+            for event in _stream_llm(url, page_text, target_date):
+                if isinstance(event, str):
+                    yield event
+                else:
+                    menu = event
+        except Exception as e:
+            yield _error({"error": f"OpenAI API call failed: {e}"}, 500)
+            return
+        refresh_template(url, page_text, target_date, menu)
+
+    yield _done(*finish_extraction(url, target_date, content_key, menu, reused))
+
+
+def stream_menu_events(url: str | None, date_str: str | None) -> Iterator[str]:
+    """Server-Sent Events for one menu request.
+
+    A "start" event, then an "item" event for each dish as soon as the LLM has
+    written it (and "restaurant" once its name is known), then "done" with the
+    same body /api/menu returns. Cache hits, stored extractions and template
+    matches go straight to "done". Failures end the stream with an "error"
+    event carrying the HTTP status.
+    """
+    target_date, error = validate_menu_request(url, date_str, date.today())
+    if error:
+        yield _error(*error)
+        return
+
+    target_iso = target_date.isoformat()
+    with span("cache.lookup"):
+        cached = cached_response(url, target_iso)
+    if cached is not None:
+        MENU_REQUESTS.inc(cache="hit")
+        yield _done(*cached)
+        return
+
+    MENU_REQUESTS.inc(cache="miss")
+    yield sse_event(
+        "start",
+        {
+            "date": target_iso,
+            "day_of_week": target_date.strftime("%A"),
+            "source_url": url,
+        },
+    )
+
+    # Same lease as /api/menu: while another worker extracts this menu, wait
+    # for its result instead of paying for a second LLM call.
+    owner = lease_owner()
+    keepalive_at = time.monotonic() + KEEPALIVE_INTERVAL
+    while not acquire_lease(url, target_iso, owner, EXTRACTION_LEASE_TTL):
+        time.sleep(EXTRACTION_LEASE_POLL)
+        cached = cached_response(url, target_iso)
+        if cached is not None:
+            yield _done(*cached)
+            return
+        if time.monotonic() >= keepalive_at:
+            yield ": keepalive\n\n"
+            keepalive_at = time.monotonic() + KEEPALIVE_INTERVAL
+
+    try:
+        cached = cached_response(url, target_iso)
+        if cached is not None:
+            yield _done(*cached)
+            return
+        with span("menu.extract"):
+            yield from _extract_events(url, target_date)
+    finally:
+        release_lease(url, target_iso, owner)
@@ -0,0 +1,155 @@
+# app/services/prewarm.py
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from time import perf_counter
+
+from app.config import (
+    PREWARM_CONCURRENCY,
+    PREWARM_RATE_PER_MINUTE,
+    PREWARM_WEEK,
+)
+from app.db.db import list_subscriptions
+from app.services.bulk_extraction import run_bulk_extraction
+from app.services.llm_scheduler import PRIORITY_BATCH, llm_priority
+from app.services.menu_service import handle_menu_request
+
+logger = logging.getLogger(__name__)
+
+_thread: threading.Thread | None = None
+_stop = threading.Event()
+
+
+class StartThrottle:
+    """Space out job starts so at most `per_minute` begin in any minute."""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def prewarm_dates(today: date, include_week: bool) -> list[date]:
+    """Today, plus the remaining working days of its week when asked."""
+    dates = [today]
+    if include_week:
+        dates += [today + timedelta(days=n) for n in range(1, 5 - today.weekday())]
+    return dates
+
+
+def _prewarm_url(url: str, dates: list[date], throttle: StartThrottle) -> list[int]:
+    throttle.wait()
+    with llm_priority(PRIORITY_BATCH):
+        return _warm_days(url, dates)
+
+
+def _warm_days(url: str, dates: list[date]) -> list[int]:
+    statuses = []
+    # Days run in order so weekly extraction of the first one serves the rest.
+    for day in dates:
+        try:
+            _, status = handle_menu_request(url, day.isoformat())
+        except Exception:
+            logger.exception("Pre-warming %s for %s failed", url, day)
+            statuses.append(500)
+            continue
+        statuses.append(status)
+        if status != 200:
+            logger.warning("Pre-warming %s for %s returned %d", url, day, status)
+    return statuses
+
+
+def prewarm(
+    today: date | None = None,
+    include_week: bool = PREWARM_WEEK,
+    concurrency: int = PREWARM_CONCURRENCY,
+    rate_per_minute: float = PREWARM_RATE_PER_MINUTE,
+) -> dict:
+    """Extract menus of every subscribed restaurant so requests hit the cache."""
+    started = perf_counter()
+    today = today or date.today()
+    urls = list_subscriptions()
+    dates = prewarm_dates(today, include_week)
+    throttle = StartThrottle(rate_per_minute)
+
+    statuses: list[int] = []
+    if urls:
+        workers = max(1, min(concurrency, len(urls)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(lambda u: _prewarm_url(u, dates, throttle), urls):
+                statuses.extend(result)
+
+    summary = {
+        "subscriptions": len(urls),
+        "dates": [d.isoformat() for d in dates],
+        "warmed": sum(1 for s in statuses if s == 200),
+        "failed": sum(1 for s in statuses if s != 200),
+        "elapsed_ms": round((perf_counter() - started) * 1000, 2),
+    }
+    logger.info("Pre-warm finished: %s", summary)
+    return summary
+
+
+def prewarm_bulk(
+    today: date | None = None, include_week: bool = PREWARM_WEEK, client=None
+) -> dict:
+    """Like prewarm(), but extract every missing menu in one offline LLM batch job."""
+    today = today or date.today()
+    urls = list_subscriptions()
+    dates = prewarm_dates(today, include_week)
+    summary = run_bulk_extraction(
+        [(url, day) for url in urls for day in dates], client=client
+    )
+    summary.update(subscriptions=len(urls), dates=[d.isoformat() for d in dates])
+    return summary
+
+
+def seconds_until(at: str, now: datetime | None = None) -> float:
+    """Seconds from `now` to the next local occurrence of "HH:MM"."""
+    now = now or datetime.now()
+    hour, minute = (int(part) for part in at.split(":"))
+    run_at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    return (run_at - now).total_seconds()
+
+
+def _run(at: str) -> None:
+    while not _stop.wait(seconds_until(at)):
+        try:
+            prewarm()
+        except Exception:
+            logger.exception("Scheduled pre-warm failed")
+
+
+def start_prewarm_scheduler(at: str) -> threading.Thread | None:
+    global _thread
+
+    if not at:
+        return None
+    if _thread is not None and _thread.is_alive():
+        return _thread
+
+    seconds_until(at)  # fail fast on a malformed PREWARM_AT
+    _stop.clear()
+    _thread = threading.Thread(
+        target=_run, args=(at,), name="menu-prewarm", daemon=True
+    )
+    _thread.start()
+    return _thread
+
+
+def stop_prewarm_scheduler() -> None:
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=5)
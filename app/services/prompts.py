@@ -1,7 +1,18 @@
-from datetime import date
+from datetime import date, timedelta
 
+# Bump whenever the prompts change so stored extractions keyed by page content
+# are not reused across incompatible prompt versions.
+PROMPT_VERSION = "3"
 
-def build_system_message() -> str:
+
+def build_system_message(price_mode: str = "tool") -> str:
+    if price_mode == "local":
+        return (
+            "You are an assistant that EXTRACTS a restaurant LUNCH MENU "
+            "from raw webpage text. "
+            "You must respond ONLY with final JSON that matches the requested schema. "
+            "Copy every price exactly as it is written on the page, e.g. '145,- Kc'."
+        )
     return (
         "You are an assistant that EXTRACTS a restaurant LUNCH MENU "
         "from raw webpage text. "
@@ -11,9 +22,37 @@ def build_system_message() -> str:
     )
 
 
+def _price_rule(price_mode: str) -> str:
+    if price_mode == "local":
+        return """When extracting dishes, copy each price exactly as written on the page
+   (for example "145,-", "145 Kč", "145 CZK") into the 'price' field as a string,
+   or null if unknown. Prices are converted to numbers after extraction."""
+    return """When extracting dishes, if prices appear in formats like "145,-", "145 Kč", "145 CZK",
+   collect these raw price strings and call the 'normalize_prices' tool with an array
+   of them to get numeric values in CZK. Then fill the numeric 'price' field
+   in the final JSON (or null if unknown)."""
+
+
+def _price_example(price_mode: str) -> str:
+    return '"145,-"' if price_mode == "local" else "145"
+
+
+def _page_text_block(page_text: str | None) -> str:
+    if not page_text:
+        return ""
+    return f"""
+Webpage text:
+-----
+{page_text}
+-----
+"""
+
+
 def build_user_message_strict(
     url: str,
     target_date: date,
+    page_text: str | None = None,
+    price_mode: str = "tool",
 ) -> str:
     target_iso = target_date.isoformat()
     weekday = target_date.strftime("%A")
@@ -43,10 +82,7 @@ VERY IMPORTANT RULES (STRICT MODE):
    - any visible dessert or speciality with a price.
    Even if the menu looks long, list all items.
 
-4. When extracting dishes, if prices appear in formats like "145,-", "145 Kč", "145 CZK",
-   collect these raw price strings and call the 'normalize_prices' tool with an array
-   of them to get numeric values in CZK. Then fill the numeric 'price' field
-   in the final JSON (or null if unknown).
+4. {_price_rule(price_mode)}
 
 5. Guess the category based on the words:
    - if the name contains "polévka", "krém" → category = "soup"
@@ -66,7 +102,7 @@ Return ONLY JSON in this exact structure:
     {{
       "category": "soup / main / dessert / drink / other",
       "name": "dish name",
-      "price": 145,
+      "price": {_price_example(price_mode)},
       "allergens": ["1", "3", "7"],
       "weight": "150g"
     }}
@@ -74,4 +110,117 @@ Return ONLY JSON in this exact structure:
   "daily_menu": true,
   "source_url": "{url}"
 }}
-"""
+""" + _page_text_block(
+        page_text
+    )
+
+
+def build_user_message_loose(
+    url: str,
+    target_date: date,
+    page_text: str | None = None,
+    price_mode: str = "tool",
+) -> str:
+    target_iso = target_date.isoformat()
+    weekday = target_date.strftime("%A")
+
+    return f"""
+Requested date (ISO): {target_iso}
+Requested weekday (English): {weekday}
+Page URL: {url}
+
+You receive raw text of a restaurant webpage. A previous attempt found no dishes
+under a heading for the requested date.
+
+Extract the lunch menu that APPLIES to the requested date (LOOSE MODE):
+
+1. If there is a section for the requested date or weekday, use it.
+2. Otherwise use a menu without a specific date (a "daily offer", a weekly menu
+   valid all week, or a permanent lunch offer) if one is present.
+3. List every dish as a separate item with category, price, allergens and weight
+   when shown.
+   {_price_rule(price_mode)}
+4. Return an EMPTY menu_items array if the page says the restaurant is closed on
+   that day or contains no lunch menu at all.
+
+Return ONLY JSON in the same structure as in strict mode:
+
+{{
+  "restaurant_name": "restaurant name or null",
+  "date": "{target_iso}",
+  "day_of_week": "{weekday}",
+  "menu_items": [
+    {{
+      "category": "soup / main / dessert / drink / other",
+      "name": "dish name",
+      "price": {_price_example(price_mode)},
+      "allergens": ["1", "3", "7"],
+      "weight": "150g"
+    }}
+  ],
+  "daily_menu": true,
+  "source_url": "{url}"
+}}
+""" + _page_text_block(
+        page_text
+    )
+
+
+def build_user_message_week(
+    url: str,
+    target_date: date,
+    page_text: str | None = None,
+    price_mode: str = "tool",
+) -> str:
+    monday = target_date - timedelta(days=target_date.weekday())
+    week = "\n".join(
+        f"   - {day.isoformat()} ({day.strftime('%A')})"
+        for day in (monday + timedelta(days=i) for i in range(7))
+    )
+
+    return f"""
+Page URL: {url}
+
+You receive raw text of a restaurant webpage. It may contain the lunch menu for a
+single day or for several days of the week.
+
+Your task is to EXTRACT THE FULL LUNCH MENU FOR EVERY DAY OF THIS WEEK that the
+page lists:
+{week}
+
+RULES:
+
+1. Each date heading (for example "STŘEDA 19.11.2025" or just "Středa") starts
+   the menu for that day, until the next date/heading. Map every heading to one
+   of the ISO dates above.
+2. Dishes listed without any day heading that are valid all week belong to
+   EVERY day of the week that the restaurant serves lunch.
+3. List every dish as a separate item with category, price, allergens and weight
+   when shown.
+   {_price_rule(price_mode)}
+   Do NOT summarise multiple dishes into one item.
+4. Leave out days that have no menu on the page.
+
+Return ONLY JSON in this exact structure:
+
+{{
+  "restaurant_name": "restaurant name or null",
+  "days": [
+    {{
+      "date": "YYYY-MM-DD",
+      "menu_items": [
+        {{
+          "category": "soup / main / dessert / drink / other",
+          "name": "dish name",
+          "price": {_price_example(price_mode)},
+          "allergens": ["1", "3", "7"],
+          "weight": "150g"
+        }}
+      ],
+      "daily_menu": true
+    }}
+  ]
+}}
+""" + _page_text_block(
+        page_text
+    )
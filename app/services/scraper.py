@@ -1,14 +1,124 @@
-import requests
+import re
+from dataclasses import dataclass
+from typing import Callable
+
 from bs4 import BeautifulSoup
 
+from app.config import HTML_PARSER, SCRAPED_TEXT_LIMIT
+from app.metrics import span
+from app.services.fetcher import fetch_html
 
-def fetch_page_text(url: str) -> str:
-    headers = {"User-Agent": "Mozilla/5.0 (compatible; MenuScraper/1.0)"}
-    resp = requests.get(url, headers=headers, timeout=15)
-    resp.raise_for_status()
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # optional C-accelerated backend
+    LexborHTMLParser = None
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # optional C-accelerated backend
+    lxml = None
+
+_BOILERPLATE_TAGS = ["nav", "footer", "script", "style", "noscript", "iframe", "svg"]
+# Matched against whole id/class tokens: "cookie-banner" is a banner, while a
+# wrapper such as "gdpr-compliant-content" holds the page itself.
+_BOILERPLATE_TOKEN_RE = re.compile(
+    r"(?:cookies?|consent|gdpr|cmp)(?:[-_]?(?:banner|bar|notice|notification|popup"
+    r"|modal|dialog|overlay|box|wrapper|container|consent|message|law))*"
+    r"|navbar|menu-toggle|cybotcookiebotdialog|onetrust-banner-sdk",
+    re.I,
+)
+# Removing these would remove the whole page, whatever their classes say.
+_NEVER_DROP_TAGS = {"html", "head", "body"}
+
+
+@dataclass
+class ScrapedPage:
+    text: str
+    not_modified: bool
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+
+def _is_boilerplate(tag: str, id_: str | None, classes: str | None) -> bool:
+    if tag.lower() in _NEVER_DROP_TAGS:
+        return False
+    tokens = f"{id_ or ''} {classes or ''}".split()
+    return any(_BOILERPLATE_TOKEN_RE.fullmatch(token) for token in tokens)
+
+
+def _text_html_parser(html: str) -> str:
+    soup = BeautifulSoup(html, "html.parser")
     body = soup.body or soup
-    text = body.get_text(separator="\n")
+    for tag in body.find_all(_BOILERPLATE_TAGS):
+        tag.decompose()
+    for tag in body.find_all(True):
+        if not tag.decomposed and _is_boilerplate(
+            tag.name, tag.get("id"), " ".join(tag.get("class") or [])
+        ):
+            tag.decompose()
+    return body.get_text(separator="\n")
+
+
+def _text_lxml(html: str) -> str:
+    if not html.strip():
+        return ""
+    # Parse bytes so pages with an XML encoding declaration are accepted too.
+    doc = lxml.html.document_fromstring(
+        html.encode("utf-8"), parser=lxml.html.HTMLParser(encoding="utf-8")
+    )
+    etree.strip_elements(doc, *_BOILERPLATE_TAGS, with_tail=False)
+    for el in doc.xpath("//*[@id or @class]"):
+        if el.getparent() is not None and _is_boilerplate(
+            el.tag, el.get("id"), el.get("class")
+        ):
+            el.drop_tree()
+    body = doc.find("body")
+    root = body if body is not None else doc
+    return "\n".join(root.itertext())
+
 
-    return text[:15000]
+def _text_selectolax(html: str) -> str:
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(_BOILERPLATE_TAGS)
+    for node in tree.css("[id], [class]"):
+        if _is_boilerplate(
+            node.tag, node.attributes.get("id"), node.attributes.get("class")
+        ):
+            node.decompose()
+    root = tree.body or tree.root
+    return root.text(separator="\n") if root is not None else ""
+
+
+PARSERS: dict[str, Callable[[str], str]] = {"html.parser": _text_html_parser}
+if lxml is not None:
+    PARSERS["lxml"] = _text_lxml
+if LexborHTMLParser is not None:
+    PARSERS["selectolax"] = _text_selectolax
+
+
+def default_parser() -> str:
+    if HTML_PARSER != "auto":
+        return HTML_PARSER
+    for name in ("selectolax", "lxml", "html.parser"):
+        if name in PARSERS:
+            return name
+    return "html.parser"
+
+
+def html_to_text(html: str, parser: str | None = None) -> str:
+    text = PARSERS[parser or default_parser()](html)
+
+    # The prompt budget is applied later by text_reduction, after the page has
+    # been cut down to the requested day; this only bounds pathological pages.
+    return text[:SCRAPED_TEXT_LIMIT]
+
+
+def fetch_page(url: str) -> ScrapedPage:
+    with span("fetch.download"):
+        page = fetch_html(url)
+    with span("fetch.parse"):
+        text = html_to_text(page.html)
+    return ScrapedPage(text=text, not_modified=page.not_modified)
+
+
+def fetch_page_text(url: str) -> str:
+    return fetch_page(url).text
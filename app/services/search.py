@@ -0,0 +1,83 @@
+# app/services/search.py
+from datetime import date, timedelta
+
+from app.config import SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT
+from app.db.db import search_menu_items
+from app.services.utils import parse_input_date
+
+
+def _date_range(args) -> tuple[date, date]:
+    if args.get("date"):
+        day = parse_input_date(args["date"])
+        return day, day
+    if args.get("week"):
+        anchor = parse_input_date(args["week"]) if args["week"] != "1" else date.today()
+        monday = anchor - timedelta(days=anchor.weekday())
+        return monday, monday + timedelta(days=6)
+    date_from = parse_input_date(args.get("date_from"))
+    date_to = parse_input_date(args["date_to"]) if args.get("date_to") else date_from
+    return date_from, date_to
+
+
+def _price(args, name: str) -> float | None:
+    value = args.get(name)
+    return float(value.replace(",", ".")) if value else None
+
+
+def _split(values: list[str]) -> list[str]:
+    return [
+        part.strip() for value in values for part in value.split(",") if part.strip()
+    ]
+
+
+def handle_menu_search(args) -> tuple[dict, int]:
+    """Search dishes across all cached menus.
+
+    `args` is the query string (a werkzeug MultiDict). Filters: date, week
+    (1 or a date), date_from/date_to (default today), q (full text over dish
+    names), category, min_price, max_price, exclude_allergens (comma separated
+    or repeated) and url (repeated, to restrict to chosen restaurants). Paging
+    uses limit/offset; `next_offset` is null on the last page.
+    """
+    try:
+        date_from, date_to = _date_range(args)
+    except ValueError:
+        return {"error": "Invalid date. Use YYYY-MM-DD, DD.MM.YYYY or DD.MM."}, 400
+    if date_to < date_from:
+        return {"error": "'date_to' must not be before 'date_from'."}, 400
+
+    try:
+        min_price = _price(args, "min_price")
+        max_price = _price(args, "max_price")
+        limit = int(args.get("limit", SEARCH_DEFAULT_LIMIT))
+        offset = int(args.get("offset", 0))
+    except ValueError:
+        return {"error": "Prices, 'limit' and 'offset' must be numbers."}, 400
+    if not 1 <= limit <= SEARCH_MAX_LIMIT or offset < 0:
+        return {
+            "error": f"'limit' must be 1-{SEARCH_MAX_LIMIT} and 'offset' >= 0."
+        }, 400
+
+    # One extra row tells us whether another page exists without a COUNT(*).
+    items = search_menu_items(
+        date_from=date_from.isoformat(),
+        date_to=date_to.isoformat(),
+        text=(args.get("q") or "").strip() or None,
+        category=args.get("category") or None,
+        min_price=min_price,
+        max_price=max_price,
+        exclude_allergens=_split(args.getlist("exclude_allergens")),
+        urls=args.getlist("url"),
+        limit=limit + 1,
+        offset=offset,
+    )
+    has_more = len(items) > limit
+    items = items[:limit]
+    return {
+        "date_from": date_from.isoformat(),
+        "date_to": date_to.isoformat(),
+        "items": items,
+        "count": len(items),
+        "offset": offset,
+        "next_offset": offset + limit if has_more else None,
+    }, 200
@@ -0,0 +1,115 @@
+# app/services/singleflight.py
+import asyncio
+import os
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from app.db.db import acquire_lease, release_lease
+from app.services.async_db import run_db
+
+T = TypeVar("T")
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Run at most one `fn` per key at a time; concurrent callers share its outcome."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> tuple[T, bool]:
+        """Return (result, shared) where `shared` is True for callers that waited."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+def lease_owner() -> str:
+    return f"{os.getpid()}:{threading.get_ident()}:{uuid.uuid4().hex[:8]}"
+
+
+def run_with_lease(
+    url: str,
+    date_iso: str,
+    work: Callable[[], T],
+    check_done: Callable[[], T | None],
+    ttl: float,
+    poll_interval: float,
+) -> T:
+    """Run `work` while holding the SQLite lease for (url, date).
+
+    While another process holds the lease, poll `check_done` until it returns
+    a value (that process finished) or the lease is released or expires.
+    """
+    owner = lease_owner()
+    while not acquire_lease(url, date_iso, owner, ttl):
+        time.sleep(poll_interval)
+        done = check_done()
+        if done is not None:
+            return done
+
+    try:
+        # The previous holder may have finished between our polls.
+        done = check_done()
+        if done is not None:
+            return done
+        return work()
+    finally:
+        release_lease(url, date_iso, owner)
+
+
+async def run_with_lease_async(
+    url: str,
+    date_iso: str,
+    work: Callable[[], Awaitable[T]],
+    check_done: Callable[[], T | None],
+    ttl: float,
+    poll_interval: float,
+) -> T:
+    """Async twin of run_with_lease.
+
+    The SQLite calls and `check_done` run on the database executor, so a
+    contended lease never blocks the event loop.
+    """
+    owner = lease_owner()
+    while not await run_db(acquire_lease, url, date_iso, owner, ttl):
+        await asyncio.sleep(poll_interval)
+        done = await run_db(check_done)
+        if done is not None:
+            return done
+
+    try:
+        done = await run_db(check_done)
+        if done is not None:
+            return done
+        return await work()
+    finally:
+        await run_db(release_lease, url, date_iso, owner)
@@ -0,0 +1,66 @@
+# app/services/sweeper.py
+import logging
+import threading
+from datetime import date
+
+from app.services.cache import delete_old_cache
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_last_swept_day: date | None = None
+_thread: threading.Thread | None = None
+_stop = threading.Event()
+
+
+def purge_expired_cache(today: date | None = None) -> int:
+    """Delete every cached menu dated before today and return how many went."""
+    global _last_swept_day
+
+    today = today or date.today()
+    with _lock:
+        deleted = delete_old_cache(today.isoformat())
+        _last_swept_day = today
+    logger.info("Purged %d expired menu(s) from cache", deleted)
+    return deleted
+
+
+def purge_if_due(today: date | None = None) -> bool:
+    """Purge at most once per calendar day."""
+    today = today or date.today()
+    if _last_swept_day == today:
+        return False
+    purge_expired_cache(today)
+    return True
+
+
+def _run(interval: int) -> None:
+    while True:
+        try:
+            purge_if_due()
+        except Exception:
+            logger.exception("Cache sweep failed")
+        if _stop.wait(interval):
+            return
+
+
+def start_cache_sweeper(interval: int) -> threading.Thread | None:
+    global _thread
+
+    if interval <= 0:
+        return None
+    if _thread is not None and _thread.is_alive():
+        return _thread
+
+    _stop.clear()
+    _thread = threading.Thread(
+        target=_run, args=(interval,), name="menu-cache-sweeper", daemon=True
+    )
+    _thread.start()
+    return _thread
+
+
+def stop_cache_sweeper() -> None:
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=5)
@@ -0,0 +1,279 @@
+# app/services/templates.py
+import math
+import re
+from datetime import date
+from functools import lru_cache
+
+from pydantic import ValidationError
+
+from app.config import TEMPLATE_MIN_COVERAGE
+from app.db.db import get_template, record_template_use, save_template
+from app.domain.models import MenuResponse
+from app.services.llm_client import normalize_price
+from app.services.text_reduction import clean_page_text, find_day_section
+
+# Bump when the learned format changes; older templates are then ignored.
+TEMPLATE_VERSION = 1
+
+_NAME = r"(?P<name>.+?)"
+_PRICE = r"(?P<price>\d+(?:[.,]\d+)?)"
+_ALLERGENS = r"(?P<allergens>\d{1,2}(?:\s*[,.]\s*\d{1,2})*)"
+_WEIGHT = r"(?P<weight>\d+(?:[.,]\d+)?\s*[^\W\d_]{1,3}\.?)"
+
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)?")
+_ALLERGENS_RE = re.compile(_ALLERGENS)
+_WEIGHT_RE = re.compile(_WEIGHT)
+_LITERAL_SPLIT_RE = re.compile(r"(\d+|\s+)")
+_NAME_STRIP = " -–—:•*|"
+
+
+def day_lines(page_text: str, target_date: date) -> tuple[list[str], bool]:
+    """Lines of target_date's section (without its heading), or of the whole page.
+
+    The flag tells whether the page had a section for the date at all.
+    """
+    cleaned = clean_page_text(page_text)
+    found = find_day_section(cleaned, target_date)
+    if found is None:
+        return cleaned.split("\n"), False
+    start, end = found
+    return cleaned[start:end].strip().split("\n")[1:], True
+
+
+def _literal_regex(text: str) -> str:
+    """Regex for page text around a dish: digits and spacing may vary, words not."""
+    parts = []
+    for part in _LITERAL_SPLIT_RE.split(text):
+        if not part:
+            continue
+        if part.isdigit():
+            parts.append(r"\d+")
+        elif part.isspace():
+            parts.append(r"\n" if "\n" in part else r"\s*")
+        else:
+            parts.append(re.escape(part))
+    return "".join(parts)
+
+
+def _free(spans: list[tuple[int, int, str]], start: int, end: int) -> bool:
+    return all(end <= s or start >= e for s, e, _ in spans)
+
+
+def _item_pattern(text: str, name_at: int, item: dict) -> str | None:
+    """Turn the line(s) holding `item` into a regex with named field groups."""
+    spans = [(name_at, name_at + len(item["name"]), _NAME)]
+
+    weight = (item.get("weight") or "").strip().lower()
+    at = text.lower().find(weight) if weight else -1
+    if at != -1 and _free(spans, at, at + len(weight)):
+        if _WEIGHT_RE.fullmatch(text[at : at + len(weight)]):
+            spans.append((at, at + len(weight), _WEIGHT))
+
+    price = item.get("price")
+    if price is not None:
+        found = [
+            m
+            for m in _NUMBER_RE.finditer(text)
+            if normalize_price(m.group()) == price and _free(spans, *m.span())
+        ]
+        if not found:
+            return None
+        spans.append((*found[-1].span(), _PRICE))
+
+    allergens = [str(a).strip() for a in item.get("allergens") or []]
+    if allergens:
+        for m in _ALLERGENS_RE.finditer(text):
+            if re.findall(r"\d+", m.group()) == allergens and _free(spans, *m.span()):
+                spans.append((*m.span(), _ALLERGENS))
+                break
+
+    pattern, pos = [], 0
+    for start, end, group in sorted(spans):
+        pattern.append(_literal_regex(text[pos:start]))
+        pattern.append(group)
+        pos = end
+    pattern.append(_literal_regex(text[pos:]))
+    return "".join(pattern)
+
+
+def learn_template(page_text: str, target_date: date, menu: dict) -> dict | None:
+    """Derive line patterns for this page from a successful LLM extraction.
+
+    Each dish is located in the day's text and its line is generalised into a
+    regex with name/price/allergen/weight groups. Category headings seen above
+    the dishes are remembered too. Returns None when too few dishes could be
+    located or the page layout is too irregular to reuse.
+    """
+    items = [item for item in menu.get("menu_items") or [] if item.get("name")]
+    if len(items) < 2:
+        return None
+
+    lines, day_section = day_lines(page_text, target_date)
+    lowered = [line.lower() for line in lines]
+    used: set[int] = set()
+    located: list[tuple[int, dict]] = []
+    patterns: dict[str, dict] = {}
+
+    for item in items:
+        name = " ".join(item["name"].split()).lower()
+        index = next(
+            (i for i, line in enumerate(lowered) if i not in used and name in line),
+            None,
+        )
+        if index is None:
+            continue
+        name_at = lowered[index].find(name)
+        span_lines = 1
+        regex = _item_pattern(lines[index], name_at, {**item, "name": name})
+        if regex is None and index + 1 < len(lines):
+            span_lines = 2
+            regex = _item_pattern(
+                lines[index] + "\n" + lines[index + 1], name_at, {**item, "name": name}
+            )
+        if regex is None:
+            continue
+        used.update(range(index, index + span_lines))
+        located.append((index, item))
+        entry = patterns.setdefault(
+            regex, {"regex": regex, "lines": span_lines, "categories": set()}
+        )
+        entry["categories"].add(item.get("category"))
+
+    if len(located) < math.ceil(len(items) * TEMPLATE_MIN_COVERAGE):
+        return None
+    if len(patterns) > max(2, len(items) // 2):
+        return None
+
+    headings: dict[str, str] = {}
+    for index, item in located:
+        category = item.get("category")
+        # The line right above the first dish of a group is its category heading.
+        if category and index > 0 and index - 1 not in used:
+            headings.setdefault(lowered[index - 1], category)
+
+    # Most specific patterns first, so a bare "name price" line pattern cannot
+    # swallow a line that also carries a weight or allergens.
+    ordered = sorted(
+        patterns.values(),
+        key=lambda p: (p["regex"].count("(?P<"), len(p["regex"])),
+        reverse=True,
+    )
+    return {
+        "version": TEMPLATE_VERSION,
+        "restaurant_name": menu.get("restaurant_name"),
+        "daily_menu": menu.get("daily_menu", True),
+        "day_section": day_section,
+        "item_count": len(items),
+        "priced": sum(item.get("price") is not None for item in items) / len(items),
+        "headings": headings,
+        "patterns": [
+            {
+                "regex": p["regex"],
+                "lines": p["lines"],
+                "category": (
+                    next(iter(p["categories"])) if len(p["categories"]) == 1 else None
+                ),
+            }
+            for p in ordered
+        ],
+    }
+
+
+@lru_cache(maxsize=512)
+def _compiled(regex: str) -> re.Pattern:
+    return re.compile(regex)
+
+
+def _item_from_match(m: re.Match, category: str | None) -> dict:
+    groups = m.groupdict()
+    return {
+        "category": category,
+        "name": " ".join(groups["name"].split()).strip(_NAME_STRIP),
+        "price": normalize_price(groups.get("price")),
+        "allergens": re.findall(r"\d+", groups.get("allergens") or ""),
+        "weight": groups.get("weight"),
+    }
+
+
+def apply_template(
+    template: dict, page_text: str, url: str, target_date: date
+) -> dict | None:
+    """Run a learned template on a page; None unless the result looks complete."""
+    if template.get("version") != TEMPLATE_VERSION:
+        return None
+
+    lines, day_section = day_lines(page_text, target_date)
+    if template["day_section"] and not day_section:
+        return None
+
+    headings = template["headings"]
+    items: list[dict] = []
+    heading_category = None
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        if line.lower() in headings:
+            heading_category = headings[line.lower()]
+            index += 1
+            continue
+        for pattern in template["patterns"]:
+            if index + pattern["lines"] > len(lines):
+                continue
+            text = "\n".join(lines[index : index + pattern["lines"]])
+            m = _compiled(pattern["regex"]).fullmatch(text)
+            if m:
+                items.append(
+                    _item_from_match(m, heading_category or pattern["category"])
+                )
+                index += pattern["lines"]
+                break
+        else:
+            index += 1
+
+    # Confidence checks: about as many dishes as when learned, real names and
+    # prices where the restaurant normally lists them.
+    expected = template["item_count"]
+    if not math.ceil(expected / 2) <= len(items) <= expected * 2 + 2:
+        return None
+    if any(
+        len(item["name"]) < 3 or not re.search(r"[^\W\d_]", item["name"])
+        for item in items
+    ):
+        return None
+    priced = sum(item["price"] is not None for item in items) / len(items)
+    if priced < template["priced"] - 0.25:
+        return None
+
+    try:
+        menu_obj = MenuResponse(
+            restaurant_name=template["restaurant_name"],
+            date=target_date.isoformat(),
+            day_of_week=target_date.strftime("%A"),
+            menu_items=items,
+            daily_menu=template["daily_menu"],
+            source_url=url,
+        )
+    except ValidationError:
+        return None
+    return menu_obj.model_dump(mode="json")
+
+
+def template_menu(url: str, page_text: str, target_date: date) -> dict | None:
+    """Extract the menu with the template learned for `url`, if it is trustworthy."""
+    template = get_template(url)
+    if template is None:
+        return None
+    menu = apply_template(template, page_text, url, target_date)
+    record_template_use(url, menu is not None)
+    return menu
+
+
+def learn_from_extraction(
+    url: str, page_text: str, target_date: date, menu: dict
+) -> bool:
+    """Store (or refresh) the template for `url` from an LLM-extracted menu."""
+    template = learn_template(page_text, target_date, menu)
+    if template is None:
+        return False
+    save_template(url, template)
+    return True
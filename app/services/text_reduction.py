@@ -0,0 +1,174 @@
+# app/services/text_reduction.py
+import re
+from dataclasses import dataclass
+from datetime import date
+
+from app.config import PROMPT_CONTEXT_CHARS, PROMPT_TEXT_LIMIT
+
+# Czech weekday names with and without diacritics, Monday first.
+_WEEKDAYS = [
+    ("pondělí", "pondeli"),
+    ("úterý", "utery"),
+    ("středa", "streda"),
+    ("čtvrtek", "ctvrtek"),
+    ("pátek", "patek"),
+    ("sobota",),
+    ("neděle", "nedele"),
+]
+_WEEKDAY_INDEX = {
+    name: index for index, names in enumerate(_WEEKDAYS) for name in names
+}
+
+# A heading line starts with a weekday name and/or a "19.11." / "19. 11. 2025" date.
+_HEADING_RE = re.compile(
+    r"^(?:(?P<weekday>"
+    + "|".join(sorted(_WEEKDAY_INDEX, key=len, reverse=True))
+    + r")\b[\s,:–-]*)?"
+    r"(?:(?P<day>\d{1,2})\.\s*(?P<month>\d{1,2})\.(?:\s*(?P<year>\d{4}))?)?",
+    re.IGNORECASE,
+)
+_MAX_HEADING_LEN = 60
+
+# Whole boilerplate phrases; a line is dropped only when they make up most of
+# it, so dishes such as "Domácí cookie s čokoládou 45 Kč" survive.
+_BOILERPLATE_RE = re.compile(
+    r"(?:tento|náš) web(?:ová stránka)? (?:používá|využívá) (?:soubory )?cookies?"
+    r"|(?:this|our) (?:web)?site uses cookies|we use cookies"
+    r"|používáme (?:soubory )?cookies?|cookies? (?:policy|settings)"
+    r"|(?:nastavení|zásady|správa) (?:souborů )?cookies?"
+    r"|(?:přijmout|odmítnout|povolit) (?:vše|všechny|cookies?)"
+    r"|accept (?:all )?cookies?|souhlasím|souhlas.{0,20}(?:zpracov|použ)\w*|gdpr"
+    r"|všechna práva vyhrazena|all rights reserved"
+    r"|(?:copyright ?)?(?:©|copyright) ?(?:\d{4}(?: ?[–-] ?\d{4})?)?[^|\n]{0,40}"
+    r"|powered by \S+|made in webflow|přeskočit na obsah|skip to (?:main )?content",
+    re.IGNORECASE,
+)
+_MAX_BOILERPLATE_LINE = 120
+_SPACES_RE = re.compile(r"[ \t\u00a0\u200b]+")
+
+
+@dataclass
+class DateHeading:
+    start: int
+    weekday: int | None
+    day: int | None
+    month: int | None
+    year: int | None
+
+    def matches(self, target: date) -> bool:
+        if self.day is not None and self.month is not None:
+            return (
+                self.day == target.day
+                and self.month == target.month
+                and self.year in (None, target.year)
+            )
+        return self.weekday == target.weekday()
+
+
+def is_boilerplate_line(line: str) -> bool:
+    """A short line made up mostly of cookie, consent or copyright phrases."""
+    if len(line) > _MAX_BOILERPLATE_LINE:
+        return False
+    matched = sum(len(m.group(0)) for m in _BOILERPLATE_RE.finditer(line))
+    return matched * 2 >= len(line)
+
+
+def clean_page_text(text: str) -> str:
+    """Collapse whitespace and drop blank, duplicate and boilerplate lines."""
+    lines: list[str] = []
+    for raw_line in text.splitlines():
+        line = _SPACES_RE.sub(" ", raw_line).strip()
+        if not line or is_boilerplate_line(line):
+            continue
+        if lines and lines[-1] == line:
+            continue
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def find_date_headings(text: str) -> list[DateHeading]:
+    headings: list[DateHeading] = []
+    previous_line = -2
+    offset = 0
+    for line_no, line in enumerate(text.split("\n")):
+        m = _HEADING_RE.match(line) if len(line) <= _MAX_HEADING_LEN else None
+        if m and (m.group("weekday") or m.group("day")):
+            heading = DateHeading(
+                start=offset,
+                weekday=(
+                    _WEEKDAY_INDEX[m.group("weekday").lower()]
+                    if m.group("weekday")
+                    else None
+                ),
+                day=int(m.group("day")) if m.group("day") else None,
+                month=int(m.group("month")) if m.group("month") else None,
+                year=int(m.group("year")) if m.group("year") else None,
+            )
+            last = headings[-1] if headings else None
+            if (
+                previous_line == line_no - 1
+                and (last.day is None) != (heading.day is None)
+                and None in (last.weekday, heading.weekday)
+            ):
+                # "STŘEDA" followed by "19.11.2025" on the next line is one heading.
+                last.weekday = (
+                    last.weekday if last.weekday is not None else heading.weekday
+                )
+                if last.day is None:
+                    last.day, last.month, last.year = (
+                        heading.day,
+                        heading.month,
+                        heading.year,
+                    )
+            else:
+                headings.append(heading)
+            previous_line = line_no
+        offset += len(line) + 1
+    return headings
+
+
+def find_day_section(
+    cleaned: str, target_date: date, headings: list[DateHeading] | None = None
+) -> tuple[int, int] | None:
+    """Return the (start, end) offsets of target_date's section in cleaned text."""
+    headings = find_date_headings(cleaned) if headings is None else headings
+    for index, heading in enumerate(headings):
+        if heading.matches(target_date):
+            end = (
+                headings[index + 1].start if index + 1 < len(headings) else len(cleaned)
+            )
+            return heading.start, end
+    return None
+
+
+def fits_prompt(text: str, limit: int = PROMPT_TEXT_LIMIT) -> bool:
+    """Whether the whole cleaned page reaches the LLM uncut in weekly mode."""
+    return len(clean_page_text(text)) <= limit
+
+
+def reduce_page_text(
+    text: str,
+    target_date: date | None = None,
+    context_chars: int = PROMPT_CONTEXT_CHARS,
+    limit: int = PROMPT_TEXT_LIMIT,
+) -> str:
+    """Shrink scraped page text to what the LLM needs for `target_date`.
+
+    Without a target date (weekly extraction) only boilerplate is removed.
+    Otherwise, if the page has a heading for the date, only the page header
+    (up to `context_chars`) and that day's section are kept.
+    """
+    cleaned = clean_page_text(text)
+    if target_date is None:
+        return cleaned[:limit]
+
+    headings = find_date_headings(cleaned)
+    found = find_day_section(cleaned, target_date, headings)
+    if found is None:
+        return cleaned[:limit]
+
+    start, end = found
+    section = cleaned[start:end].strip()
+    header = cleaned[: min(context_chars, headings[0].start)].strip()
+    reduced = f"{header}\n…\n{section}" if header else section
+    return reduced[:limit]
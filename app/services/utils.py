@@ -1,4 +1,5 @@
 # app/services/utils.py
+import json
 from datetime import date, datetime
 
 
@@ -35,3 +36,8 @@ def parse_input_date(date_str: str | None) -> date:
         pass
 
     raise ValueError("unrecognized")
+
+
+def sse_event(event: str, data: dict) -> str:
+    """One Server-Sent Events message with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
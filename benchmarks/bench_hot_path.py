@@ -0,0 +1,292 @@
+"""End-to-end benchmarks of the /api/menu hot path with stubbed network layers.
+
+Usage: python benchmarks/bench_hot_path.py [--iterations N] [--output FILE]
+       [--compare BASELINE.json [--threshold 1.25]]
+
+Drives the Flask app through its test client. Page download and LLM calls are
+replaced by in-process stubs, so every number is our own overhead: cache hits
+(memory and SQLite tier), the miss path, SQLite under concurrent clients, date
+parsing, price normalization and HTML parsing. The result is one JSON
+document. With --compare, every *_ms metric that got slower, and every
+*ops_per_s metric that dropped, by more than the threshold factor is reported,
+and the exit status is 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("CACHE_SWEEP_INTERVAL", "0")
+
+from app import create_app  # noqa: E402
+from app.db import db  # noqa: E402
+from app.services import menu_service  # noqa: E402
+from app.services.cache import memory_cache  # noqa: E402
+from app.services.llm_client import normalize_prices_tool  # noqa: E402
+from app.services.utils import parse_input_date  # noqa: E402
+from benchmarks.bench_parsers import FIXTURES, bench as bench_parser  # noqa: E402
+
+TARGET_DATE = date.today() + timedelta(days=1)
+PAGE_TEXT = (FIXTURES / "weekly_menu.html").read_text(encoding="utf-8")
+
+
+def summarize(samples_ms: list[float]) -> dict:
+    ordered = sorted(samples_ms)
+    if len(ordered) >= 2:
+        cuts = statistics.quantiles(ordered, n=100, method="inclusive")
+        p50, p90, p99 = cuts[49], cuts[89], cuts[98]
+    else:
+        p50 = p90 = p99 = ordered[0]
+    return {
+        "n": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 4),
+        "p50_ms": round(p50, 4),
+        "p90_ms": round(p90, 4),
+        "p99_ms": round(p99, 4),
+    }
+
+
+def _stub_menu(url: str, target_date: date) -> dict:
+    return {
+        "restaurant_name": "Benchmark",
+        "date": target_date.isoformat(),
+        "day_of_week": target_date.strftime("%A"),
+        "menu_items": [
+            {"category": "main", "name": f"Jídlo {n}", "price": 150 + n}
+            for n in range(6)
+        ],
+        "daily_menu": True,
+        "source_url": url,
+    }
+
+
+@contextmanager
+def stubbed_app():
+    """A testing app on a throwaway database with fetch and LLM stubbed out."""
+    patched = {
+        "fetch_page_text": lambda url: f"{url}\n{PAGE_TEXT}",
+        "call_openai_menu": lambda url, page_text, target_date, mode="strict": (
+            _stub_menu(url, target_date)
+        ),
+        "WEEKLY_EXTRACTION": False,
+    }
+    saved = {name: getattr(menu_service, name) for name in patched}
+    saved_db_path = db.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = str(Path(tmp) / "bench_menu_cache.db")
+        for name, value in patched.items():
+            setattr(menu_service, name, value)
+        memory_cache.clear()
+        try:
+            app = create_app()
+            app.testing = True
+            yield app
+        finally:
+            for name, value in saved.items():
+                setattr(menu_service, name, value)
+            db.close_connections()
+            db.DB_PATH = saved_db_path
+            memory_cache.clear()
+
+
+def _timed_post(client, url: str) -> float:
+    payload = {"url": url, "date": TARGET_DATE.isoformat()}
+    start = time.perf_counter()
+    resp = client.post("/api/menu", json=payload)
+    elapsed = (time.perf_counter() - start) * 1000
+    if resp.status_code != 200:
+        raise RuntimeError(f"/api/menu returned {resp.status_code}: {resp.json}")
+    return elapsed
+
+
+def bench_cache_hits(app, iterations: int) -> dict:
+    url = "https://bench.example/hit"
+    with app.test_client() as client:
+        _timed_post(client, url)
+        memory = [_timed_post(client, url) for _ in range(iterations)]
+
+        max_entries = memory_cache.max_entries
+        memory_cache.max_entries = 0
+        memory_cache.clear()
+        try:
+            sqlite = [_timed_post(client, url) for _ in range(iterations)]
+        finally:
+            memory_cache.max_entries = max_entries
+    return {"memory": summarize(memory), "sqlite": summarize(sqlite)}
+
+
+def bench_miss_path(app, iterations: int) -> dict:
+    with app.test_client() as client:
+        samples = [
+            _timed_post(client, f"https://bench.example/miss/{n}")
+            for n in range(iterations)
+        ]
+    return summarize(samples)
+
+
+def bench_sqlite_contention(iterations: int, clients: tuple[int, ...]) -> dict:
+    results = {}
+    menu = _stub_menu("https://bench.example/db", TARGET_DATE)
+    for n_clients in clients:
+        samples: list[float] = []
+        lock = threading.Lock()
+
+        def worker(worker_id: int) -> None:
+            local = []
+            for n in range(iterations):
+                url = f"https://bench.example/db/{worker_id}/{n % 50}"
+                start = time.perf_counter()
+                db.save_menu(url, TARGET_DATE.isoformat(), menu)
+                db.get_cached_menu(url, TARGET_DATE.isoformat())
+                local.append((time.perf_counter() - start) * 1000)
+            with lock:
+                samples.extend(local)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(n_clients)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - started
+        results[f"clients_{n_clients}"] = {
+            **summarize(samples),
+            "ops_per_s": round(len(samples) / wall, 1),
+        }
+    return results
+
+
+def _throughput(fn, args_list: list, iterations: int) -> dict:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for args in args_list:
+            fn(*args)
+    elapsed = time.perf_counter() - start
+    calls = iterations * len(args_list)
+    return {
+        "calls": calls,
+        "ops_per_s": round(calls / elapsed, 1),
+        "per_call_us": round(elapsed / calls * 1e6, 3),
+    }
+
+
+def bench_helpers(iterations: int) -> dict:
+    dates = [("2025-11-19",), ("19.11.2025",), ("19. 11. 2025",), ("19.11.",)]
+    prices = [(["145,-", "145 Kč", "99.50 CZK", None, "cena dle váhy"] * 2,)]
+    return {
+        "parse_input_date": _throughput(parse_input_date, dates, iterations * 10),
+        "normalize_prices_tool": _throughput(
+            normalize_prices_tool, prices, iterations * 10
+        ),
+    }
+
+
+def bench_parsers(iterations: int) -> dict:
+    from app.services.scraper import PARSERS
+
+    results = {}
+    for path in sorted(FIXTURES.glob("*.html")):
+        html = path.read_text(encoding="utf-8")
+        results[path.name] = {
+            name: bench_parser(html, name, iterations) for name in PARSERS
+        }
+    return results
+
+
+def run_suite(iterations: int = 200, clients: tuple[int, ...] = (1, 4, 16)) -> dict:
+    with stubbed_app() as app:
+        results = {
+            "cache_hit": bench_cache_hits(app, iterations),
+            "miss_path": bench_miss_path(app, iterations),
+            "sqlite_contention": bench_sqlite_contention(iterations, clients),
+        }
+    results["helpers"] = bench_helpers(iterations)
+    results["html_parse"] = bench_parsers(max(1, iterations // 10))
+    return results
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(results: dict, prefix: str = "") -> dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+def regressions(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Metrics that got worse than `threshold` times the baseline."""
+    now, before = flatten(current), flatten(baseline)
+    found = []
+    for name, value in now.items():
+        old = before.get(name)
+        if not old or not value:
+            continue
+        if name.endswith("_ms") and value / old > threshold:
+            found.append(f"{name}: {old} -> {value} ms")
+        elif name.endswith("ops_per_s") and old / value > threshold:
+            found.append(f"{name}: {old} -> {value} ops/s")
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+        },
+        "results": run_suite(args.iterations),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        found = regressions(report["results"], baseline["results"], args.threshold)
+        for line in found:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        sys.exit(1 if found else 0)
+
+
+if __name__ == "__main__":
+    main()
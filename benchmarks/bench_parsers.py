@@ -0,0 +1,50 @@
+"""Compare the HTML-to-text backends on the saved fixture pages.
+
+Usage: python benchmarks/bench_parsers.py [--repeat N]
+Prints one JSON document with per-backend timings for every fixture.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.scraper import PARSERS, html_to_text  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def bench(html: str, parser: str, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = html_to_text(html, parser=parser)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "text_chars": len(text),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    results = {}
+    for path in sorted(FIXTURES.glob("*.html")):
+        html = path.read_text(encoding="utf-8")
+        results[path.name] = {
+            "bytes": len(html.encode("utf-8")),
+            "parsers": {name: bench(html, name, args.repeat) for name in PARSERS},
+        }
+    print(json.dumps({"repeat": args.repeat, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
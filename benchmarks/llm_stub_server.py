@@ -0,0 +1,277 @@
+"""Local OpenAI-compatible chat-completions server for offline load tests.
+
+Replays recorded responses (benchmarks/recordings/chat_completions.json) with
+configurable latency and error rate. Point the service at it with
+LLM_BASE_URL=http://127.0.0.1:8089/v1.
+
+Usage: python benchmarks/llm_stub_server.py [--port 8089] [--latency-ms 800]
+       [--jitter-ms 200] [--error-rate 0.02] [--error-status 429]
+       [--stream-delay-ms 50]
+
+Each recorded response has a "when" filter, and the first one that matches is
+returned. The filter keys are "has_tools" (the request offers tools),
+"after_tool" (the conversation contains a tool result) and "contains" (a
+substring of the last user message). Object contents are serialized to JSON.
+$date, $weekday and $week_0..$week_6 are then filled in from the first ISO
+date in the prompt, and $source_url from its "Page URL:" line.
+
+Requests with "stream": true get the same content as chat.completion.chunk
+Server-Sent Events, a few characters per chunk (--stream-delay-ms apart).
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from string import Template
+
+RECORDINGS = Path(__file__).resolve().parent / "recordings" / "chat_completions.json"
+
+_ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_PAGE_URL_RE = re.compile(r"Page URL: (\S+)")
+
+
+def load_recordings(path: Path = RECORDINGS) -> list[dict]:
+    return json.loads(path.read_text(encoding="utf-8"))["responses"]
+
+
+def _last_user_message(messages: list[dict]) -> str:
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            return str(message.get("content") or "")
+    return ""
+
+
+def _matches(when: dict, payload: dict) -> bool:
+    messages = payload.get("messages", [])
+    if "has_tools" in when and bool(payload.get("tools")) != when["has_tools"]:
+        return False
+    after_tool = any(m.get("role") == "tool" for m in messages)
+    if "after_tool" in when and after_tool != when["after_tool"]:
+        return False
+    return when.get("contains", "") in _last_user_message(messages)
+
+
+def _template_values(prompt: str) -> dict:
+    m = _ISO_DATE_RE.search(prompt)
+    day = date.fromisoformat(m.group(0)) if m else date.today()
+    monday = day - timedelta(days=day.weekday())
+    url = _PAGE_URL_RE.search(prompt)
+    values = {
+        "date": day.isoformat(),
+        "weekday": day.strftime("%A"),
+        "source_url": url.group(1) if url else "",
+    }
+    values.update(
+        {f"week_{n}": (monday + timedelta(days=n)).isoformat() for n in range(7)}
+    )
+    return values
+
+
+def completion_for(payload: dict, recordings: list[dict]) -> dict:
+    """Build a chat.completion body replaying the first matching recording."""
+    recording = next(r for r in recordings if _matches(r.get("when", {}), payload))
+    message = dict(recording["message"])
+    content = message.get("content")
+    if content is not None:
+        if not isinstance(content, str):
+            content = json.dumps(content, ensure_ascii=False)
+        prompt = _last_user_message(payload.get("messages", []))
+        message["content"] = Template(content).safe_substitute(_template_values(prompt))
+
+    prompt_tokens = len(json.dumps(payload.get("messages", []))) // 4
+    completion_tokens = len(json.dumps(message)) // 4
+    return {
+        "id": f"chatcmpl-stub-{random.getrandbits(32):08x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": payload.get("model", "stub"),
+        "choices": [
+            {
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if message.get("tool_calls") else "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def stream_chunks(completion: dict, size: int = 16) -> list[dict]:
+    """Split a chat.completion into the chunks a streamed response would send."""
+    message = completion["choices"][0]["message"]
+    content = message.get("content") or ""
+    base = {
+        "id": completion["id"],
+        "object": "chat.completion.chunk",
+        "created": completion["created"],
+        "model": completion["model"],
+    }
+    deltas = [{"role": "assistant", "content": ""}]
+    deltas += [{"content": content[i : i + size]} for i in range(0, len(content), size)]
+    chunks = [
+        dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": None}])
+        for delta in deltas
+    ]
+    chunks.append(
+        dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])
+    )
+    chunks.append(dict(base, choices=[], usage=completion["usage"]))
+    return chunks
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Chunked transfer encoding, used for streamed completions, needs HTTP/1.1.
+    protocol_version = "HTTP/1.1"
+    # Overridden per server by make_server().
+    recordings: list[dict] = []
+    latency: float = 0.0
+    stream_delay: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 429
+    stats: dict = {}
+
+    def _send_json(self, status: int, body: dict, headers: dict | None = None):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "stub"}]})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        self.stats["requests"] += 1
+
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        if random.random() < self.error_rate:
+            self.stats["errors"] += 1
+            self._send_json(
+                self.error_status,
+                {"error": {"message": "stub error", "type": "stub"}},
+                {"Retry-After": "1"} if self.error_status == 429 else None,
+            )
+            return
+
+        completion = completion_for(payload, self.recordings)
+        if payload.get("stream"):
+            self._send_stream(completion)
+        else:
+            self._send_json(200, completion)
+
+    def _send_stream(self, completion: dict) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        events = [
+            f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+            for chunk in stream_chunks(completion)
+        ]
+        events.append("data: [DONE]\n\n")
+        for event in events:
+            data = event.encode("utf-8")
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+            if self.stream_delay > 0:
+                time.sleep(self.stream_delay)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+def make_server(
+    host: str = "127.0.0.1",
+    port: int = 8089,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    error_status: int = 429,
+    recordings: list[dict] | None = None,
+    stream_delay: float = 0.0,
+) -> ThreadingHTTPServer:
+    handler = type(
+        "ConfiguredStubHandler",
+        (StubHandler,),
+        {
+            "recordings": recordings if recordings is not None else load_recordings(),
+            "latency": latency,
+            "jitter": jitter,
+            "error_rate": error_rate,
+            "error_status": error_status,
+            "stream_delay": stream_delay,
+            "stats": {"requests": 0, "errors": 0},
+        },
+    )
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.stats = handler.stats
+    return server
+
+
+def start_in_thread(**kwargs) -> ThreadingHTTPServer:
+    """Serve in a daemon thread; the base URL is http://host:server_port/v1."""
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Local OpenAI-compatible stub server for load tests."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--jitter-ms", type=float, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--stream-delay-ms", type=float, default=50)
+    parser.add_argument("--recordings", type=Path, default=RECORDINGS)
+    args = parser.parse_args()
+
+    server = make_server(
+        host=args.host,
+        port=args.port,
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        recordings=load_recordings(args.recordings),
+        stream_delay=args.stream_delay_ms / 1000,
+    )
+    print(f"LLM stub listening on http://{args.host}:{server.server_port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Local Redis-protocol (RESP2) server for tests and multi-node experiments.
+
+Keeps keys in memory and implements the commands the shared menu cache uses:
+PING, AUTH, SELECT, GET, MGET, SET (with EX/PX), DEL, EXISTS, TTL, DBSIZE and
+FLUSHDB. Point the service at it with CACHE_BACKEND=redis and
+CACHE_REDIS_URL=redis://127.0.0.1:6390/0.
+
+Usage: python benchmarks/resp_stub_server.py [--port 6390]
+"""
+
+import argparse
+import socketserver
+import threading
+import time
+from collections import Counter
+
+
+def encode_reply(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, Exception):
+        return b"-ERR %s\r\n" % str(value).encode("utf-8")
+    if isinstance(value, bool):
+        return b":%d\r\n" % int(value)
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, str):
+        return b"+%s\r\n" % value.encode("utf-8")
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(encode_reply(v) for v in value)
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def read_command(reader) -> list[bytes] | None:
+    line = reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        return line.split()
+    args = []
+    for _ in range(int(line[1:-2])):
+        length = int(reader.readline()[1:-2])
+        args.append(reader.read(length + 2)[:-2])
+    return args
+
+
+class Store:
+    def __init__(self):
+        self.data: dict[bytes, tuple[bytes, float | None]] = {}
+        self.calls: Counter = Counter()
+        self.lock = threading.Lock()
+
+    def _get(self, key: bytes) -> bytes | None:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.time():
+            del self.data[key]
+            return None
+        return entry[0]
+
+    def execute(self, args: list[bytes]):
+        name = args[0].decode("ascii").upper()
+        self.calls[name] += 1
+        with self.lock:
+            if name == "PING":
+                return "PONG"
+            if name in ("AUTH", "SELECT"):
+                return "OK"
+            if name == "GET":
+                return self._get(args[1])
+            if name == "MGET":
+                return [self._get(key) for key in args[1:]]
+            if name == "SET":
+                expires = None
+                options = [a.decode("ascii").upper() for a in args[3::2]]
+                for option, value in zip(options, args[4::2]):
+                    if option == "EX":
+                        expires = time.time() + int(value)
+                    elif option == "PX":
+                        expires = time.time() + int(value) / 1000
+                self.data[args[1]] = (args[2], expires)
+                return "OK"
+            if name == "DEL":
+                return sum(self.data.pop(key, None) is not None for key in args[1:])
+            if name == "EXISTS":
+                return sum(self._get(key) is not None for key in args[1:])
+            if name == "TTL":
+                if self._get(args[1]) is None:
+                    return -2
+                expires = self.data[args[1]][1]
+                return -1 if expires is None else int(expires - time.time())
+            if name == "DBSIZE":
+                return len(self.data)
+            if name == "FLUSHDB":
+                self.data.clear()
+                return "OK"
+        return ValueError(f"unknown command '{name}'")
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        while True:
+            try:
+                args = read_command(self.rfile)
+            except (ConnectionError, ValueError):
+                return
+            if not args:
+                return
+            self.wfile.write(encode_reply(self.server.store.execute(args)))
+
+
+class RespServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address):
+        super().__init__(address, RespHandler)
+        self.store = Store()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+
+def start_in_thread(host: str = "127.0.0.1", port: int = 0) -> RespServer:
+    server = RespServer((host, port))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Local Redis-protocol stub server for the shared menu cache."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+
+    server = RespServer((args.host, args.port))
+    print(f"Redis-protocol stub listening on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 from app import create_app
+from app.services.jobs import resume_pending_jobs
 
 app = create_app()
 
 if __name__ == "__main__":
+    resume_pending_jobs()
     app.run(host="127.0.0.1", port=5000, debug=False)
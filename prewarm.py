@@ -0,0 +1,48 @@
+import argparse
+import json
+import logging
+
+from app.db.db import add_subscription, list_subscriptions, remove_subscription
+from app.services.cache import init_db
+from app.services.prewarm import prewarm, prewarm_bulk
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Fill the menu cache for subscribed restaurants."
+    )
+    parser.add_argument("--add", metavar="URL", help="subscribe a restaurant URL")
+    parser.add_argument("--remove", metavar="URL", help="unsubscribe a URL")
+    parser.add_argument("--list", action="store_true", help="list subscriptions")
+    parser.add_argument(
+        "--week",
+        action="store_true",
+        help="also pre-warm the remaining working days of this week",
+    )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="extract through one offline LLM batch job instead of live calls",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    init_db()
+
+    if args.add:
+        added = add_subscription(args.add)
+        print(f"{'Subscribed' if added else 'Already subscribed'}: {args.add}")
+    elif args.remove:
+        removed = remove_subscription(args.remove)
+        print(f"{'Unsubscribed' if removed else 'Not subscribed'}: {args.remove}")
+    elif args.list:
+        for url in list_subscriptions():
+            print(url)
+    else:
+        kwargs = {"include_week": True} if args.week else {}
+        run = prewarm_bulk if args.bulk else prewarm
+        print(json.dumps(run(**kwargs), indent=2))
+
+
+if __name__ == "__main__":
+    main()
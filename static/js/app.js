@@ -9,8 +9,116 @@ const today = new Date().toISOString().slice(0, 10);
 dateInput.value = today;
 dateInput.min = today;
 
-function showLoading(on) {
+const STAGE_LABELS = {
+  queued: "Čeká ve frontě…",
+  running: "Zpracovává se…",
+  downloading: "Stahuji stránku…",
+  parsing: "Čtu stránku…",
+  extracting: "Hledám menu…",
+  normalizing_prices: "Převádím ceny…",
+  validating: "Kontroluji výsledek…",
+};
+
+const loadingText = document.createElement("p");
+loadingText.className = "loading-text";
+loadingOverlay.appendChild(loadingText);
+
+function showLoading(on, text = "") {
   loadingOverlay.classList.toggle("hidden", !on);
+  loadingText.textContent = text;
+}
+
+function showStage(stage) {
+  loadingText.textContent = STAGE_LABELS[stage] || stage;
+}
+
+// Follow a queued job over Server-Sent Events; fall back to polling if the
+// stream is cut (e.g. by a proxy). Resolves with the finished job.
+function waitForJob(job) {
+  return new Promise((resolve, reject) => {
+    const events = new EventSource(job.events_url);
+
+    events.addEventListener("stage", (e) => showStage(JSON.parse(e.data).stage));
+    events.addEventListener("done", (e) => {
+      events.close();
+      resolve(JSON.parse(e.data));
+    });
+    events.onerror = () => {
+      events.close();
+      pollJob(job.status_url).then(resolve, reject);
+    };
+  });
+}
+
+async function pollJob(statusUrl) {
+  for (;;) {
+    const res = await fetch(statusUrl);
+    const job = await res.json();
+    if (!res.ok) throw new Error(job.error || "Job lookup failed.");
+    if (job.status === "done" || job.status === "failed") return job;
+    showStage(job.stage);
+    await new Promise((r) => setTimeout(r, 1000));
+  }
+}
+
+// Stream the extraction and render each dish as soon as the model writes it.
+// Resolves with the final menu, or rejects with the error body (error.data).
+// A stream cut before any result resolves with null so the caller can fall
+// back to a job.
+function streamMenu(url, dateVal) {
+  return new Promise((resolve, reject) => {
+    const params = new URLSearchParams({ url, date: dateVal });
+    const events = new EventSource("/api/menu/stream?" + params);
+    let list = null;
+    let heading = null;
+
+    events.addEventListener("start", (e) => {
+      showStage("extracting");
+      [heading, list] = renderHeader(JSON.parse(e.data));
+    });
+    events.addEventListener("restaurant", (e) => {
+      if (heading) heading.textContent = JSON.parse(e.data).restaurant_name;
+    });
+    events.addEventListener("item", (e) => {
+      showLoading(false);
+      if (list) list.appendChild(renderItem(JSON.parse(e.data)));
+    });
+    events.addEventListener("done", (e) => {
+      events.close();
+      resolve(JSON.parse(e.data));
+    });
+    events.addEventListener("error", (e) => {
+      events.close();
+      if (e.data) {
+        const err = new Error("Menu extraction failed.");
+        err.data = JSON.parse(e.data);
+        reject(err);
+      } else {
+        resolve(null);
+      }
+    });
+  });
+}
+
+async function fetchMenuJob(url, dateVal) {
+  showLoading(true, STAGE_LABELS.queued);
+  const res = await fetch("/api/menu/jobs", {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json"
+    },
+    body: JSON.stringify({ url, date: dateVal }),
+  });
+
+  let data = await res.json();
+  let ok = res.ok;
+
+  if (res.status === 202) {
+    const job = await waitForJob(data);
+    data = job.result || {};
+    ok = job.status === "done";
+  }
+  return { data, ok };
 }
 
 form.addEventListener("submit", async (e) => {
@@ -23,20 +131,24 @@ form.addEventListener("submit", async (e) => {
 
   if (!url || !dateVal) return;
 
-  showLoading(true);
+  showLoading(true, STAGE_LABELS.running);
 
   try {
-    const res = await fetch("/api/menu", {
-  method: "POST",
-  headers: {
-    "Content-Type": "application/json"
-  },
-  body: JSON.stringify({ url, date: dateVal }),
-});
+    let data = null;
+    let ok = true;
+    try {
+      data = await streamMenu(url, dateVal);
+    } catch (err) {
+      if (!err.data) throw err;
+      data = err.data;
+      ok = false;
+    }
 
-    const data = await res.json();
+    if (data === null) {
+      ({ data, ok } = await fetchMenuJob(url, dateVal));
+    }
 
-    if (!res.ok) {
+    if (!ok) {
       errorDiv.textContent = data.error || "An unknown error occurred.";
       resultDiv.innerHTML = "";
       return;
@@ -51,6 +163,57 @@ form.addEventListener("submit", async (e) => {
   }
 });
 
+// Card with an empty item list that streamed rows are appended to.
+function renderHeader(data) {
+  const container = document.createElement("div");
+  container.className = "card";
+
+  const heading = document.createElement("h2");
+  heading.textContent = "Neznámá restaurace";
+  const dateP = document.createElement("p");
+  dateP.innerHTML = `<strong>Datum:</strong> ${data.date} (${data.day_of_week})`;
+  const list = document.createElement("div");
+
+  container.append(heading, dateP, list);
+  resultDiv.innerHTML = "";
+  resultDiv.appendChild(container);
+  return [heading, list];
+}
+
+function renderItem(item) {
+  const div = document.createElement("div");
+  div.className = "menu-item";
+
+  const category = item.category || "";
+  const name = item.name || "";
+  const price =
+    item.price !== null && item.price !== undefined
+      ? item.price + " Kč"
+      : "—";
+  const weight = item.weight || "";
+
+  div.innerHTML = `
+    <strong>${category}</strong><br/>
+    <span>${name}</span><br/>
+    <span>${weight ? weight + " | " : ""}${price}</span>
+  `;
+
+  if (item.allergens && item.allergens.length) {
+    const alDiv = document.createElement("div");
+    alDiv.innerHTML = "<small>Alergeny:</small> ";
+    item.allergens.forEach((a) => {
+      const b = document.createElement("span");
+      b.className = "badge";
+      b.textContent = a;
+      alDiv.appendChild(b);
+    });
+    div.appendChild(alDiv);
+  }
+
+  return div;
+}
+
+
 function renderResult(data) {
   const container = document.createElement("div");
   container.className = "card";
@@ -84,38 +247,7 @@ function renderResult(data) {
   if (!items.length) {
     list.innerHTML = "<p><em>No menu found for the selected date.</em></p>";
   } else {
-    items.forEach((item) => {
-      const div = document.createElement("div");
-      div.className = "menu-item";
-
-      const category = item.category || "";
-      const name = item.name || "";
-      const price =
-        item.price !== null && item.price !== undefined
-          ? item.price + " Kč"
-          : "—";
-      const weight = item.weight || "";
-
-      div.innerHTML = `
-        <strong>${category}</strong><br/>
-        <span>${name}</span><br/>
-        <span>${weight ? weight + " | " : ""}${price}</span>
-      `;
-
-      if (item.allergens && item.allergens.length) {
-        const alDiv = document.createElement("div");
-        alDiv.innerHTML = "<small>Alergeny:</small> ";
-        item.allergens.forEach((a) => {
-          const b = document.createElement("span");
-          b.className = "badge";
-          b.textContent = a;
-          alDiv.appendChild(b);
-        });
-        div.appendChild(alDiv);
-      }
-
-      list.appendChild(div);
-    });
+    items.forEach((item) => list.appendChild(renderItem(item)));
   }
 
   container.appendChild(list);
@@ -0,0 +1,14 @@
+import pytest
+
+from app.db import db
+from app.services.cache import memory_cache
+
+
+@pytest.fixture
+def test_db(tmp_path, monkeypatch):
+    """A fresh SQLite database under tmp_path and an empty memory tier."""
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "test_menu_cache.db"))
+    db.init_db()
+    memory_cache.clear()
+    yield tmp_path
+    db.close_connections()
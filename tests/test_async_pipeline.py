@@ -0,0 +1,132 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("asgiref")
+
+import httpx
+
+import main
+from app.asgi import create_asgi_app
+from app.db import db
+from app.services import async_http, async_menu_service
+from app.services.host_health import host_health
+
+
+@pytest.fixture
+def test_db(test_db, monkeypatch):
+    monkeypatch.setattr(async_menu_service, "WEEKLY_EXTRACTION", False)
+    host_health.reset()
+
+
+def _chat_response(content: dict) -> dict:
+    return {"choices": [{"message": {"content": json.dumps(content)}}]}
+
+
+def test_async_pipeline_overlaps_requests(test_db, monkeypatch):
+    in_flight = {"now": 0, "max": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.05)
+        in_flight["now"] -= 1
+        if request.url.host == "api.openai.com":
+            payload = json.loads(request.content)
+            page = payload["messages"][1]["content"].rsplit("Webpage text:", 1)[1]
+            return httpx.Response(
+                200,
+                json=_chat_response(
+                    {
+                        "date": "2030-01-01",
+                        "day_of_week": "Tuesday",
+                        "menu_items": [{"name": page.strip("-\n ")}],
+                        "source_url": "x",
+                    }
+                ),
+            )
+        return httpx.Response(200, html=f"<body>Menu of {request.url.path}</body>")
+
+    monkeypatch.setattr(
+        async_http,
+        "_new_client",
+        lambda name: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    async def run():
+        try:
+            return await asyncio.gather(
+                *(
+                    async_menu_service.handle_menu_request_async(
+                        f"https://e{i}.com/{i}", "2030-01-01"
+                    )
+                    for i in range(5)
+                )
+            )
+        finally:
+            await async_http.close_async_clients()
+
+    results = asyncio.run(run())
+
+    assert [status for _, status in results] == [200] * 5
+    assert results[3][0]["menu_items"][0]["name"] == "Menu of /3"
+    assert results[3][0]["source_url"] == "https://e3.com/3"
+    assert in_flight["max"] == 5
+
+
+def test_asgi_app_serves_menu_and_delegates_to_flask(test_db, monkeypatch):
+    async def fake_handle(url, date_str):
+        return {"url": url, "date": date_str}, 200
+
+    monkeypatch.setattr("app.asgi.handle_menu_request_async", fake_handle)
+    asgi_app = create_asgi_app(main.app)
+
+    async def run():
+        transport = httpx.ASGITransport(app=asgi_app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            menu = await client.post(
+                "/api/menu", json={"url": "https://e.com", "date": "2030-01-01"}
+            )
+            health = await client.get("/api/health")
+        return menu, health
+
+    menu, health = asyncio.run(run())
+
+    assert menu.status_code == 200
+    assert menu.json() == {"url": "https://e.com", "date": "2030-01-01"}
+    assert health.json()["status"] == "ok"
+
+
+def test_blocking_database_work_stays_off_the_event_loop(test_db, monkeypatch):
+    def slow_cached_response(url, date_iso):
+        # A lookup waiting on a locked database.
+        time.sleep(0.3)
+        return {"menu_items": [{"name": "Guláš"}], "cached": True}, 200
+
+    monkeypatch.setattr(async_menu_service, "cached_response", slow_cached_response)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        body, status = await async_menu_service.handle_menu_request_async(
+            "https://example.com/menu", "2031-01-08"
+        )
+        task.cancel()
+        return body, status, ticks
+
+    body, status, ticks = asyncio.run(run())
+
+    assert status == 200 and body["cached"] is True
+    assert ticks >= 10
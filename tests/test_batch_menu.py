@@ -0,0 +1,102 @@
+import threading
+import time
+from datetime import date
+
+import pytest
+
+import main
+from app.db import db
+from app.services import menu_service
+
+
+@pytest.fixture
+def test_client(test_db, monkeypatch):
+    def fake_fetch_page_text(url: str) -> str:
+        return f"Fake page text with some menu for {url}"
+
+    monkeypatch.setattr(menu_service, "fetch_page_text", fake_fetch_page_text)
+    monkeypatch.setattr(menu_service, "WEEKLY_EXTRACTION", False)
+
+    with main.app.test_client() as client:
+        yield client
+
+
+def _fake_menu(url, target_date: date) -> dict:
+    return {
+        "restaurant_name": "Test Restaurant",
+        "date": target_date.isoformat(),
+        "day_of_week": target_date.strftime("%A"),
+        "menu_items": [{"category": "main", "name": "Fake Schnitzel", "price": 150}],
+        "daily_menu": True,
+        "source_url": url,
+    }
+
+
+def test_batch_extracts_concurrently_and_reuses_cache(test_client, monkeypatch):
+    lock = threading.Lock()
+    calls = {"count": 0, "in_flight": 0, "max_in_flight": 0}
+
+    def fake_call_openai_menu(url, page_text, target_date, mode="strict"):
+        with lock:
+            calls["count"] += 1
+            calls["in_flight"] += 1
+            calls["max_in_flight"] = max(calls["max_in_flight"], calls["in_flight"])
+        time.sleep(0.05)
+        with lock:
+            calls["in_flight"] -= 1
+        return _fake_menu(url, target_date)
+
+    monkeypatch.setattr(menu_service, "call_openai_menu", fake_call_openai_menu)
+
+    items = [
+        {"url": f"https://example.com/{i}", "date": "2030-01-01"} for i in range(4)
+    ]
+    items.append({"url": "https://example.com/0", "date": "2030-01-01"})
+    items.append({"date": "2030-01-01"})
+
+    resp = test_client.post("/api/menus", json={"items": items})
+    assert resp.status_code == 200
+    data = resp.get_json()
+
+    results = data["results"]
+    assert len(results) == 6
+    assert [r["status"] for r in results] == [200, 200, 200, 200, 200, 400]
+    assert all("elapsed_ms" in r for r in results)
+    assert results[4]["result"]["restaurant_name"] == "Test Restaurant"
+    assert calls["count"] == 4
+    assert calls["max_in_flight"] > 1
+
+    resp2 = test_client.post("/api/menus", json={"items": items[:4]})
+    data2 = resp2.get_json()
+    assert data2["cached_count"] == 4
+    assert all(r["result"]["cached"] is True for r in data2["results"])
+    assert calls["count"] == 4
+
+
+def test_batch_requires_items(test_client):
+    resp = test_client.post("/api/menus", json={})
+    assert resp.status_code == 400
+
+
+def test_batch_item_timings_and_bad_types(test_client, monkeypatch):
+    def fake_call_openai_menu(url, page_text, target_date, mode="strict"):
+        time.sleep(0.5 if url.endswith("slow") else 0.01)
+        return _fake_menu(url, target_date)
+
+    monkeypatch.setattr(menu_service, "BATCH_MAX_WORKERS", 2)
+    monkeypatch.setattr(menu_service, "call_openai_menu", fake_call_openai_menu)
+
+    items = [
+        {"url": "https://example.com/slow", "date": "2030-01-01"},
+        {"url": "https://example.com/fast", "date": "2030-01-01"},
+        {"url": ["https://example.com/list"], "date": "2030-01-01"},
+        {"url": "https://example.com/fast", "date": 20300101},
+    ]
+    resp = test_client.post("/api/menus", json={"items": items})
+
+    assert resp.status_code == 200
+    slow, fast, bad_url, bad_date = resp.get_json()["results"]
+    assert slow["elapsed_ms"] >= 500
+    assert fast["elapsed_ms"] < 400
+    assert [bad_url["status"], bad_date["status"]] == [400, 400]
+    assert bad_url["result"]["error"] == "'url' and 'date' must be strings."
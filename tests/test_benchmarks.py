@@ -0,0 +1,25 @@
+from app.db import db
+from app.services import menu_service
+from benchmarks.bench_hot_path import regressions, run_suite
+
+
+def test_hot_path_suite_runs_and_restores_state():
+    db_path = db.DB_PATH
+    fetch = menu_service.fetch_page_text
+
+    results = run_suite(iterations=3, clients=(1, 2))
+
+    assert results["cache_hit"]["memory"]["n"] == 3
+    assert results["miss_path"]["p99_ms"] > 0
+    assert set(results["sqlite_contention"]) == {"clients_1", "clients_2"}
+    assert results["helpers"]["parse_input_date"]["ops_per_s"] > 0
+    assert "weekly_menu.html" in results["html_parse"]
+    assert db.DB_PATH == db_path
+    assert menu_service.fetch_page_text is fetch
+
+
+def test_regressions_compare_latency_and_throughput():
+    baseline = {"a": {"p99_ms": 1.0}, "b": {"ops_per_s": 1000.0}, "n": 5}
+    current = {"a": {"p99_ms": 2.0}, "b": {"ops_per_s": 900.0}, "n": 50}
+
+    assert regressions(current, baseline, threshold=1.25) == ["a.p99_ms: 1.0 -> 2.0 ms"]
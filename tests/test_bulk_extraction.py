@@ -0,0 +1,129 @@
+import json
+from datetime import date
+
+import pytest
+
+from app.db import db
+from app.services import bulk_extraction, prewarm
+from app.services.cache import get_cached_menu
+from app.services.llm_client import extraction_key
+from app.services.llm_batch import LocalBatchClient, from_jsonl
+
+
+def completion(body: dict) -> dict:
+    prompt = body["messages"][1]["content"]
+    if "broken.example" in prompt:
+        raise RuntimeError("model overloaded")
+    menu = {
+        "restaurant_name": "Jídelna",
+        "date": "",
+        "day_of_week": "",
+        "menu_items": [{"category": "main", "name": "Guláš", "price": "149,-"}],
+        "daily_menu": True,
+        "source_url": "",
+    }
+    return {"choices": [{"message": {"content": json.dumps(menu)}}]}
+
+
+@pytest.fixture
+def test_db(test_db, monkeypatch):
+    def fetch(url):
+        if "down" in url:
+            raise ConnectionError("refused")
+        return f"Denní menu {url}"
+
+    monkeypatch.setattr(bulk_extraction, "fetch_page_text", fetch)
+    return test_db
+
+
+def test_bulk_extraction_runs_one_batch_and_one_write(test_db, monkeypatch):
+    client = LocalBatchClient(test_db / "batches", completion, polls_to_complete=3)
+    save_menus = db.save_menus
+    transactions = []
+    monkeypatch.setattr(
+        db,
+        "save_menus",
+        lambda menus, *args: transactions.append(len(menus))
+        or save_menus(menus, *args),
+    )
+    learned = []
+    monkeypatch.setattr(
+        bulk_extraction,
+        "refresh_template",
+        lambda url, page_text, target_date, menu, source: learned.append(
+            (url, target_date, source)
+        ),
+    )
+    sleeps = []
+    monday, tuesday = date(2031, 1, 6), date(2031, 1, 7)
+    db.save_menu("https://a.example/", monday.isoformat(), {"menu_items": []})
+
+    summary = bulk_extraction.run_bulk_extraction(
+        [
+            ("https://a.example/", monday),
+            ("https://a.example/", tuesday),
+            ("https://b.example/", monday),
+            ("https://broken.example/", monday),
+            ("https://down.example/", monday),
+        ],
+        client=client,
+        sleep=sleeps.append,
+    )
+
+    assert summary["cached"] == 1
+    assert summary["submitted"] == 3
+    assert summary["saved"] == 2
+    assert len(sleeps) == 2
+    assert transactions == [2]
+    assert {(f["url"], f["error"]) for f in summary["failed"]} == {
+        ("https://broken.example/", "model overloaded"),
+        ("https://down.example/", "Failed to download page: refused"),
+    }
+
+    menu = get_cached_menu("https://b.example/", monday.isoformat())
+    assert menu["menu_items"][0]["price"] == 149.0
+    assert menu["date"] == "2031-01-06"
+    assert menu["source_url"] == "https://b.example/"
+    assert sorted(learned) == [
+        ("https://a.example/", tuesday, "batch"),
+        ("https://b.example/", monday, "batch"),
+    ]
+    stored = db.get_extraction(
+        extraction_key("Denní menu https://b.example/"), monday.isoformat()
+    )
+    assert stored["menu_items"] == menu["menu_items"]
+
+    batch_dir = test_db / "batches" / summary["batch_id"]
+    requests_sent = from_jsonl((batch_dir / "input.jsonl").read_bytes())
+    assert requests_sent[0]["url"] == "/v1/chat/completions"
+    assert "tools" not in requests_sent[0]["body"]
+    assert "Requested date (ISO): 2031-01-07" in (
+        requests_sent[0]["body"]["messages"][1]["content"]
+    )
+
+
+def test_unfinished_batch_times_out(test_db):
+    client = LocalBatchClient(test_db / "batches", completion, polls_to_complete=100)
+
+    with pytest.raises(bulk_extraction.BatchTimeoutError):
+        bulk_extraction.run_bulk_extraction(
+            [("https://a.example/", date(2031, 1, 6))],
+            client=client,
+            poll_interval=0,
+            timeout=0,
+        )
+
+
+def test_bulk_prewarm_of_subscriptions(test_db):
+    db.add_subscription("https://a.example/")
+    db.add_subscription("https://b.example/")
+
+    summary = prewarm.prewarm_bulk(
+        date(2031, 1, 9),
+        include_week=True,
+        client=LocalBatchClient(test_db / "batches", completion),
+    )
+
+    assert summary["dates"] == ["2031-01-09", "2031-01-10"]
+    assert summary["saved"] == 4
+    assert get_cached_menu("https://b.example/", "2031-01-10") is not None
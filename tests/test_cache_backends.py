@@ -0,0 +1,122 @@
+from datetime import date
+
+import pytest
+
+from app.db import db
+from app.services import cache, menu_service
+from app.services.cache_backends import (
+    MemoryBackend,
+    RedisBackend,
+    RespClient,
+    SQLiteBackend,
+)
+from benchmarks.resp_stub_server import start_in_thread
+
+MONDAY = "2031-01-06"
+
+
+def _menu(name: str) -> dict:
+    return {
+        "restaurant_name": name,
+        "date": MONDAY,
+        "day_of_week": "Monday",
+        "menu_items": [{"category": "main", "name": "Guláš", "price": 149.0}],
+        "daily_menu": True,
+        "source_url": "",
+    }
+
+
+@pytest.fixture
+def redis_server(test_db):
+    server = start_in_thread()
+    previous = cache.get_backend()
+    yield server
+    cache.set_backend(previous)
+    server.shutdown()
+    server.server_close()
+
+
+def _node(server, local=None) -> RedisBackend:
+    """A separate replica: its own connection pool and empty in-process tier."""
+    backend = RedisBackend(RespClient(server.url), local=local)
+    cache.set_backend(backend)
+    return backend
+
+
+def test_menu_saved_on_one_node_is_a_hit_on_another(redis_server):
+    _node(redis_server)
+    cache.save_menu("https://a.example/", MONDAY, _menu("A"))
+
+    _node(redis_server)
+    menu = cache.get_cached_menu("https://a.example/", MONDAY)
+    encoded = cache.get_cached_response("https://a.example/", MONDAY)
+
+    assert menu == _menu("A")
+    assert encoded.etag == cache.encode_menu_response(_menu("A")).etag
+    ttl = RespClient(redis_server.url).execute(
+        "TTL", f"menu:{MONDAY}:https://a.example/"
+    )
+    assert 0 < ttl <= (date(2031, 1, 7) - date.today()).days * 86400 + 86400
+
+
+def test_batched_reads_and_writes_use_one_round_trip(redis_server):
+    _node(redis_server)
+    menus = {(f"https://{i}.example/", MONDAY): _menu(str(i)) for i in range(20)}
+    cache.save_menus(menus)
+
+    _node(redis_server)
+    redis_server.store.calls.clear()
+    found = cache.get_cached_menus(list(menus) + [("https://none.example/", MONDAY)])
+
+    assert found == menus
+    assert redis_server.store.calls == {"MGET": 1}
+
+
+def test_unreachable_server_falls_back_to_local_sqlite(redis_server):
+    backend = _node(redis_server, local=SQLiteBackend())
+    cache.save_menu("https://a.example/", MONDAY, _menu("A"))
+    redis_server.shutdown()
+    redis_server.server_close()
+    backend.client.close()
+
+    _node(redis_server, local=SQLiteBackend())
+    assert cache.get_cached_menu("https://a.example/", MONDAY) == _menu("A")
+    assert cache.get_cached_response("https://a.example/", MONDAY) is not None
+    cache.save_menu("https://b.example/", MONDAY, _menu("B"))
+    assert db.get_cached_menu("https://b.example/", MONDAY) == _menu("B")
+
+
+def test_replicas_extract_each_menu_once(redis_server, monkeypatch):
+    calls = []
+
+    def fake_llm(url, page_text, target_date, content_key):
+        calls.append(url)
+        return _menu("Shared") | {"date": target_date.isoformat()}
+
+    monkeypatch.setattr(menu_service, "fetch_page_text", lambda url: "Denní menu")
+    monkeypatch.setattr(menu_service, "_extract_with_llm", fake_llm)
+    monkeypatch.setattr(menu_service, "TEMPLATE_EXTRACTION", False)
+
+    _node(redis_server)
+    first, _ = menu_service.handle_menu_request("https://a.example/", MONDAY)
+    _node(redis_server)
+    second, status = menu_service.handle_menu_request("https://a.example/", MONDAY)
+
+    assert calls == ["https://a.example/"]
+    assert (status, first["cached"], second["cached"]) == (200, False, True)
+
+
+def test_memory_backend_purges_past_days():
+    backend = MemoryBackend()
+    encoded = cache.encode_menu_response(_menu("A"))
+    backend.set_many(
+        {
+            ("https://a.example/", "2031-01-05"): (_menu("A"), encoded),
+            ("https://a.example/", MONDAY): (_menu("A"), encoded),
+        }
+    )
+
+    assert backend.purge(MONDAY) == 1
+    assert list(backend.get_many([("https://a.example/", MONDAY)])) == [
+        ("https://a.example/", MONDAY)
+    ]
@@ -0,0 +1,30 @@
+from datetime import date
+
+import pytest
+
+from app.db import db
+from app.services import sweeper
+
+
+@pytest.fixture
+def test_db(test_db, monkeypatch):
+    monkeypatch.setattr(sweeper, "_last_swept_day", None)
+
+
+def test_purge_runs_once_per_day(test_db):
+    db.save_menu("https://example.com/menu", "2030-01-01", {"menu_items": []})
+    db.save_menu("https://example.com/menu", "2030-01-03", {"menu_items": []})
+
+    assert sweeper.purge_if_due(date(2030, 1, 2)) is True
+    assert db.get_cached_menu("https://example.com/menu", "2030-01-01") is None
+    assert db.get_cached_menu("https://example.com/menu", "2030-01-03") is not None
+
+    assert sweeper.purge_if_due(date(2030, 1, 2)) is False
+
+
+def test_purge_uses_date_index(test_db):
+    with db.get_connection() as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN " + db.DELETE_OLD_SQL, ("2030-01-01",)
+        ).fetchall()
+    assert any("idx_menus_date" in row[-1] for row in plan)
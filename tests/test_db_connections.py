@@ -0,0 +1,23 @@
+from app.db import db
+
+
+def test_connections_are_reused_and_use_wal(test_db):
+    with db.get_connection() as conn:
+        first = conn
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+    with db.get_connection() as conn:
+        assert conn is first
+
+
+def test_readers_are_not_blocked_by_writer(test_db):
+    db.save_menu("https://example.com/menu", "2030-01-01", {"menu_items": []})
+
+    with db.get_connection() as writer:
+        writer.execute("BEGIN IMMEDIATE")
+        writer.execute("DELETE FROM menus")
+        assert db.get_cached_menu("https://example.com/menu", "2030-01-01") == {
+            "menu_items": []
+        }
+        writer.rollback()
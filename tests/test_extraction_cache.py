@@ -0,0 +1,175 @@
+import json
+from datetime import date
+
+from app.db import db
+from app.services import llm_client, menu_service
+
+
+def _week(url, dates):
+    return {
+        "days": {
+            d: {
+                "restaurant_name": "Jídelna",
+                "date": d,
+                "day_of_week": date.fromisoformat(d).strftime("%A"),
+                "menu_items": [{"name": f"Dish {d}", "price": 120.0}],
+                "daily_menu": True,
+                "source_url": url,
+            }
+            for d in dates
+        }
+    }
+
+
+def test_unchanged_weekly_page_is_extracted_once(test_db, monkeypatch):
+    page = {"text": "PONDĚLÍ 6.1. Guláš ÚTERÝ 7.1. Řízek"}
+    week_calls = []
+
+    monkeypatch.setattr(menu_service, "fetch_page_text", lambda url: page["text"])
+
+    def fake_week(url, page_text, target_date):
+        week_calls.append(target_date)
+        return _week(url, ["2031-01-06", "2031-01-07"])
+
+    def fail(*args, **kwargs):
+        raise AssertionError("single-day extraction should not be needed")
+
+    monkeypatch.setattr(menu_service, "call_openai_week_menu", fake_week)
+    monkeypatch.setattr(menu_service, "call_openai_menu", fail)
+
+    monday, status = menu_service.handle_menu_request("https://e.com", "2031-01-06")
+    tuesday, status2 = menu_service.handle_menu_request("https://e.com", "2031-01-07")
+
+    assert (status, status2) == (200, 200)
+    assert monday["menu_items"][0]["name"] == "Dish 2031-01-06"
+    assert tuesday["menu_items"][0]["name"] == "Dish 2031-01-07"
+    assert tuesday["day_of_week"] == "Tuesday"
+    assert len(week_calls) == 1
+
+    page["text"] = "PONDĚLÍ 6.1. Svíčková ÚTERÝ 7.1. Řízek"
+    menu_service.handle_menu_request("https://e.com", "2031-01-08")
+    assert len(week_calls) == 2
+
+
+def test_missing_day_falls_back_to_single_day_extraction(test_db, monkeypatch):
+    monkeypatch.setattr(menu_service, "fetch_page_text", lambda url: "Denní menu")
+    monkeypatch.setattr(
+        menu_service,
+        "call_openai_week_menu",
+        lambda url, page_text, target_date: _week(url, []),
+    )
+
+    def fake_call_openai_menu(url, page_text, target_date, mode="strict"):
+        return _week(url, [target_date.isoformat()])["days"][target_date.isoformat()]
+
+    monkeypatch.setattr(menu_service, "call_openai_menu", fake_call_openai_menu)
+
+    body, status = menu_service.handle_menu_request("https://e.com", "2031-01-06")
+
+    assert status == 200
+    key = llm_client.extraction_key("Denní menu")
+    assert db.get_extraction(key, "2031-01-06") is not None
+
+
+def test_week_call_sends_page_text_and_slices_days(monkeypatch):
+    sent = {}
+
+    class FakeResponse:
+        status_code = 200
+        headers: dict = {}
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            content = {
+                "restaurant_name": "Jídelna",
+                "days": [
+                    {"date": "2031-01-06", "menu_items": [{"name": "Guláš"}]},
+                    {"date": "not a date", "menu_items": []},
+                ],
+            }
+            return {"choices": [{"message": {"content": json.dumps(content)}}]}
+
+    def fake_post(url, headers, json, timeout):
+        sent.update(json)
+        return FakeResponse()
+
+    monkeypatch.setattr(llm_client.requests, "post", fake_post)
+
+    result = llm_client.call_openai_week_menu(
+        "https://e.com", "PONDĚLÍ 6.1. Guláš", date(2031, 1, 8)
+    )
+
+    assert "PONDĚLÍ 6.1. Guláš" in sent["messages"][1]["content"]
+    assert list(result["days"]) == ["2031-01-06"]
+    assert result["days"]["2031-01-06"]["day_of_week"] == "Monday"
+    assert result["days"]["2031-01-06"]["source_url"] == "https://e.com"
+
+
+def test_week_days_keep_their_daily_menu_flag():
+    content = {
+        "restaurant_name": "Jídelna",
+        "days": [
+            {"date": "2031-01-06", "menu_items": [{"name": "Guláš"}]},
+            {
+                "date": "2031-01-07",
+                "menu_items": [{"name": "Pizza"}],
+                "daily_menu": False,
+            },
+        ],
+    }
+
+    days = llm_client.week_menu_from_content(json.dumps(content), "https://e.com")[
+        "days"
+    ]
+
+    assert days["2031-01-06"]["daily_menu"] is True
+    assert days["2031-01-07"]["daily_menu"] is False
+
+
+def test_day_missing_from_a_weekly_page_is_remembered(test_db, monkeypatch):
+    week_calls = []
+    monkeypatch.setattr(menu_service, "fetch_page_text", lambda url: "Týdenní menu")
+
+    def fake_week(url, page_text, target_date):
+        week_calls.append(target_date)
+        return _week(url, ["2031-01-06", "2031-01-07"])
+
+    def fail(*args, **kwargs):
+        raise AssertionError("single-day extraction should not be needed")
+
+    monkeypatch.setattr(menu_service, "call_openai_week_menu", fake_week)
+    monkeypatch.setattr(menu_service, "call_openai_menu", fail)
+
+    first, status = menu_service.handle_menu_request("https://e.com", "2031-01-11")
+    again, status2 = menu_service.handle_menu_request("https://e.com", "2031-01-11")
+
+    assert (status, status2) == (200, 200)
+    assert first["menu_items"] == again["menu_items"] == []
+    assert again["day_of_week"] == "Saturday"
+    assert len(week_calls) == 1
+
+
+def test_day_missing_from_a_truncated_weekly_page_is_asked_for(test_db, monkeypatch):
+    week = "\n".join(f"{n}. Polévka dne číslo {n} s chlebem" for n in range(1000))
+    page_text = f"Týdenní menu\n{week}\nSobota 11.1.\nSvíčková"
+    monkeypatch.setattr(menu_service, "fetch_page_text", lambda url: page_text)
+    monkeypatch.setattr(
+        menu_service,
+        "call_openai_week_menu",
+        lambda url, text, target_date: _week(url, ["2031-01-06", "2031-01-07"]),
+    )
+    day_calls = []
+
+    def fake_day(url, text, target_date, mode="strict"):
+        day_calls.append(mode)
+        return _week(url, [target_date.isoformat()])["days"][target_date.isoformat()]
+
+    monkeypatch.setattr(menu_service, "call_openai_menu", fake_day)
+
+    body, status = menu_service.handle_menu_request("https://e.com", "2031-01-11")
+
+    assert status == 200
+    assert body["day_of_week"] == "Saturday" and body["menu_items"]
+    assert day_calls == ["strict"]
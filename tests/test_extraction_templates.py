@@ -0,0 +1,180 @@
+import sqlite3
+from datetime import date
+
+from app.db import db
+from app.services import menu_service
+from app.services.templates import apply_template, learn_template
+
+MONDAY_PAGE = """
+Restaurace U Lípy
+Pondělí 6.1.
+Polévka
+Česnečka (1,7) 45 Kč
+Hlavní jídla
+150g Svíčková na smetaně (1,3,7) 165 Kč
+150g Kuřecí řízek (1,3) 139 Kč
+Úterý 7.1.
+Kulajda (7) 49 Kč
+Hlavní jídla
+120g Guláš (1) 149 Kč
+200g Zeleninové rizoto (7) 129 Kč
+Otevřeno 11–14 h
+"""
+
+MONDAY_MENU = {
+    "restaurant_name": "U Lípy",
+    "date": "2031-01-06",
+    "day_of_week": "Monday",
+    "menu_items": [
+        {
+            "category": "soup",
+            "name": "Česnečka",
+            "price": 45.0,
+            "allergens": ["1", "7"],
+            "weight": None,
+        },
+        {
+            "category": "main",
+            "name": "Svíčková na smetaně",
+            "price": 165.0,
+            "allergens": ["1", "3", "7"],
+            "weight": "150g",
+        },
+        {
+            "category": "main",
+            "name": "Kuřecí řízek",
+            "price": 139.0,
+            "allergens": ["1", "3"],
+            "weight": "150g",
+        },
+    ],
+    "daily_menu": True,
+    "source_url": "https://lipa.example/",
+}
+
+
+def test_learned_template_extracts_another_day():
+    template = learn_template(MONDAY_PAGE, date(2031, 1, 6), MONDAY_MENU)
+
+    menu = apply_template(
+        template, MONDAY_PAGE, "https://lipa.example/", date(2031, 1, 7)
+    )
+
+    assert menu["restaurant_name"] == "U Lípy"
+    assert menu["day_of_week"] == "Tuesday"
+    assert menu["menu_items"] == [
+        {
+            "category": "soup",
+            "name": "Kulajda",
+            "price": 49.0,
+            "allergens": ["7"],
+            "weight": None,
+        },
+        {
+            "category": "main",
+            "name": "Guláš",
+            "price": 149.0,
+            "allergens": ["1"],
+            "weight": "120g",
+        },
+        {
+            "category": "main",
+            "name": "Zeleninové rizoto",
+            "price": 129.0,
+            "allergens": ["7"],
+            "weight": "200g",
+        },
+    ]
+
+
+def test_template_rejects_pages_that_no_longer_fit():
+    template = learn_template(MONDAY_PAGE, date(2031, 1, 6), MONDAY_MENU)
+    redesigned = "Pondělí 13.1.\nDnes vaříme: Kulajda za 49 korun, Guláš za 149 korun"
+
+    assert apply_template(template, redesigned, "u", date(2031, 1, 13)) is None
+    # A weekly page without the requested day must not fall back to the whole page.
+    assert apply_template(template, MONDAY_PAGE, "u", date(2031, 1, 8)) is None
+
+
+def test_no_template_when_dishes_are_not_on_the_page():
+    menu = {
+        **MONDAY_MENU,
+        "menu_items": [
+            {"name": "Polévka dle denní nabídky", "price": 40.0},
+            {"name": "Hotovka", "price": 120.0},
+        ],
+    }
+
+    assert learn_template(MONDAY_PAGE, date(2031, 1, 6), menu) is None
+
+
+def test_llm_is_skipped_once_a_template_is_learned(test_db, monkeypatch):
+    llm_calls = []
+
+    def fake_llm(url, page_text, target_date, content_key):
+        llm_calls.append(target_date)
+        return dict(MONDAY_MENU, menu_items=list(MONDAY_MENU["menu_items"]))
+
+    monkeypatch.setattr(menu_service, "fetch_page_text", lambda url: MONDAY_PAGE)
+    monkeypatch.setattr(menu_service, "_extract_with_llm", fake_llm)
+
+    monday, _ = menu_service.handle_menu_request("https://lipa.example/", "2031-01-06")
+    tuesday, status = menu_service.handle_menu_request(
+        "https://lipa.example/", "2031-01-07"
+    )
+
+    assert status == 200
+    assert llm_calls == [date(2031, 1, 6)]
+    assert [item["name"] for item in tuesday["menu_items"]] == [
+        "Kulajda",
+        "Guláš",
+        "Zeleninové rizoto",
+    ]
+    assert db.get_cached_menu("https://lipa.example/", "2031-01-07") is not None
+    assert db.template_stats() == {"templates": 1, "hits": 1, "misses": 0}
+
+
+def test_rejected_template_falls_back_to_llm(test_db, monkeypatch):
+    db.save_template(
+        "https://lipa.example/",
+        learn_template(MONDAY_PAGE, date(2031, 1, 6), MONDAY_MENU),
+    )
+    monkeypatch.setattr(
+        menu_service, "fetch_page_text", lambda url: "Pondělí 13.1.\nNový web"
+    )
+    monkeypatch.setattr(
+        menu_service,
+        "_extract_with_llm",
+        lambda url, page_text, target_date, key: {
+            **MONDAY_MENU,
+            "menu_items": [{"name": "Guláš", "price": 149.0}],
+        },
+    )
+
+    body, status = menu_service.handle_menu_request(
+        "https://lipa.example/", "2031-01-13"
+    )
+
+    assert status == 200
+    assert body["menu_items"][0]["name"] == "Guláš"
+    assert db.template_stats()["misses"] == 1
+
+
+def test_template_refresh_failures_never_fail_the_request(monkeypatch, caplog):
+    monkeypatch.setattr(menu_service, "TEMPLATE_EXTRACTION", True)
+
+    def fail_with(error):
+        def learn(*args):
+            raise error
+
+        monkeypatch.setattr(menu_service, "learn_from_extraction", learn)
+        menu_service.refresh_template(
+            "https://lipa.example/", MONDAY_PAGE, date(2031, 1, 6), MONDAY_MENU
+        )
+
+    fail_with(ValueError("price"))
+    assert caplog.records == []
+
+    fail_with(sqlite3.OperationalError("database is locked"))
+    assert "https://lipa.example/" in caplog.records[0].getMessage()
+    assert caplog.records[0].levelname == "WARNING"
@@ -0,0 +1,58 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.db import db
+from app.services import fetcher
+from app.services.scraper import fetch_page
+
+PAGE = "<html><body><h1>Denní menu</h1><p>Guláš 145,-</p></body></html>"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    requests_seen: list = []
+
+    def do_GET(self):
+        type(self).requests_seen.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = PAGE.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(test_db):
+    _Handler.requests_seen = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}/menu"
+    httpd.shutdown()
+    fetcher.close_sessions()
+
+
+def test_second_fetch_is_conditional_and_served_from_store(server):
+    first = fetch_page(server)
+    second = fetch_page(server)
+
+    assert first.not_modified is False
+    assert second.not_modified is True
+    assert "Guláš 145,-" in second.text
+    assert second.text == first.text
+    assert _Handler.requests_seen[1]["If-None-Match"] == '"v1"'
+    assert "gzip" in _Handler.requests_seen[0]["Accept-Encoding"]
+
+
+def test_sessions_are_shared_per_host(server):
+    assert fetcher.get_session(server) is fetcher.get_session(server + "?day=2")
+    assert fetcher.get_session(server) is not fetcher.get_session("https://e.com/")
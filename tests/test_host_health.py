@@ -0,0 +1,116 @@
+import socket
+import threading
+import time
+
+import pytest
+import requests
+
+from app.db import db
+from app.services import host_health as host_health_module
+from app.services import fetcher
+from app.services.host_health import HostHealth, HostUnavailableError, host_health
+
+URL = "https://broken.example/menu"
+
+
+class FakeHTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.response = type("R", (), {"status_code": status_code})()
+
+
+def test_circuit_opens_then_probes_once_and_closes():
+    health = HostHealth(threshold=3, cooldown=30, negative_ttl=0)
+    for n in range(3):
+        health.before_request(f"{URL}/{n}", now=100.0)
+        health.record_failure(f"{URL}/{n}", TimeoutError("timed out"), now=100.0)
+
+    with pytest.raises(HostUnavailableError, match="after 3 failures"):
+        health.before_request(f"{URL}/other", now=110.0)
+
+    assert health.before_request(f"{URL}/probe", now=131.0) is True
+    with pytest.raises(HostUnavailableError, match="probed"):
+        health.before_request(f"{URL}/other", now=131.0)
+
+    health.record_success(f"{URL}/probe", 0.2)
+    assert health.before_request(f"{URL}/other", now=132.0) is False
+
+
+def test_failed_probe_reopens_the_circuit():
+    health = HostHealth(threshold=1, cooldown=30, negative_ttl=0)
+    health.record_failure(URL, ConnectionError("refused"), now=0.0)
+
+    assert health.before_request(URL, now=31.0) is True
+    health.record_failure(URL, ConnectionError("refused"), now=31.0)
+
+    with pytest.raises(HostUnavailableError):
+        health.before_request(URL, now=40.0)
+
+
+def test_failed_urls_are_negatively_cached_but_4xx_keep_the_host_up():
+    health = HostHealth(threshold=1, cooldown=30, negative_ttl=60)
+    health.record_failure(URL, FakeHTTPError(404), now=0.0)
+
+    with pytest.raises(HostUnavailableError, match="failed recently"):
+        health.before_request(URL, now=10.0)
+    assert health.before_request("https://broken.example/other", now=10.0) is False
+    assert health.before_request(URL, now=61.0) is False
+
+
+def test_transient_4xx_are_not_negatively_cached():
+    health = HostHealth(threshold=1, cooldown=30, negative_ttl=60)
+    for status in (403, 429):
+        health.record_failure(URL, FakeHTTPError(status), now=0.0)
+
+        assert health.before_request(URL, now=1.0) is False
+
+
+def test_read_timeout_adapts_to_observed_latency():
+    health = HostHealth(min_timeout=2, max_timeout=15, connect_timeout=5)
+    assert health.timeouts(URL) == (5, 15)
+
+    for _ in range(10):
+        health.record_success(URL, 0.3)
+
+    connect, read = health.timeouts(URL)
+    assert read == 2
+    assert connect == 2
+
+
+def test_concurrent_fetches_per_host_are_limited(monkeypatch):
+    monkeypatch.setattr(host_health_module, "FETCH_HOST_CONCURRENCY", 1)
+    health = HostHealth()
+    order = []
+
+    def fetch(name):
+        with health.guard(URL):
+            order.append(f"start-{name}")
+            time.sleep(0.05)
+            order.append(f"end-{name}")
+
+    threads = [threading.Thread(target=fetch, args=(n,)) for n in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert order[1].startswith("end-")
+
+
+def test_dead_site_fails_fast_after_first_error(test_db):
+    host_health.reset()
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    url = f"http://127.0.0.1:{port}/menu"
+
+    try:
+        with pytest.raises(requests.ConnectionError):
+            fetcher.fetch_html(url)
+        started = time.monotonic()
+        with pytest.raises(HostUnavailableError):
+            fetcher.fetch_html(url)
+        assert time.monotonic() - started < 0.05
+    finally:
+        host_health.reset()
+        fetcher.close_sessions()
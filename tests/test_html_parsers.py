@@ -0,0 +1,95 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from app.db import db
+from app.services import fetcher
+from app.services.fetcher import decode_body
+from app.services.scraper import PARSERS, html_to_text
+from app.services.text_reduction import clean_page_text
+
+FIXTURES = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures"
+
+
+@pytest.mark.parametrize("parser", sorted(PARSERS))
+@pytest.mark.parametrize("fixture", ["weekly_menu.html", "script_heavy.html"])
+def test_backends_extract_equivalent_text(parser, fixture):
+    html = (FIXTURES / fixture).read_text(encoding="utf-8")
+
+    text = clean_page_text(html_to_text(html, parser=parser))
+    reference = clean_page_text(html_to_text(html, parser="html.parser"))
+
+    assert text.split() == reference.split()
+    assert "Svíčková na smetaně, houskový knedlík" in text
+    assert "dataLayer" not in text
+    assert "font-family" not in text
+    assert "cookies" not in text
+    assert "Kontakt" not in text
+
+
+CONSENT_CLASS_ON_BODY = """
+<html><head><title>t</title></head>
+<body class="home cookie-consent-pending">
+  <div id="cookie-banner">Používáme cookies</div>
+  <main><p>Svíčková 159 Kč</p></main>
+</body></html>
+"""
+
+
+@pytest.mark.parametrize("parser", sorted(PARSERS))
+def test_consent_class_on_body_keeps_the_page(parser):
+    text = clean_page_text(html_to_text(CONSENT_CLASS_ON_BODY, parser=parser))
+
+    assert text == "Svíčková 159 Kč"
+
+
+@pytest.mark.parametrize("parser", sorted(PARSERS))
+def test_boilerplate_is_matched_by_whole_class_tokens(parser):
+    html = (
+        '<html><body><div class="gdpr-compliant-content">'
+        "<p>Svíčková 159 Kč</p>"
+        '<div class="cookie_notice">Používáme cookies</div>'
+        "</div></body></html>"
+    )
+
+    assert html_to_text(html, parser=parser).split() == ["Svíčková", "159", "Kč"]
+
+
+def test_decode_body_prefers_header_then_meta_charset():
+    body = "<meta charset='windows-1250'><p>Řízek</p>".encode("cp1250")
+
+    assert "Řízek" in decode_body(body, "text/html")
+    assert "Řízek" in decode_body(body, "text/html; charset=windows-1250")
+    assert "Řízek" not in decode_body(body, "text/html; charset=utf-8")
+
+
+class _HugeHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.end_headers()
+        self.wfile.write(b"<html><body><p>Menu</p>")
+        try:
+            for _ in range(256):
+                self.wfile.write(b"<p>" + b"x" * 4096 + b"</p>")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+def test_download_is_capped(test_db, monkeypatch):
+    monkeypatch.setattr(fetcher, "FETCH_MAX_BYTES", 10_000)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _HugeHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    try:
+        page = fetcher.fetch_html(f"http://127.0.0.1:{httpd.server_port}/")
+    finally:
+        httpd.shutdown()
+        fetcher.close_sessions()
+
+    assert page.html.startswith("<html><body><p>Menu</p>")
+    assert len(page.html) == 10_000
@@ -0,0 +1,92 @@
+import json
+from datetime import date
+
+from app.services import llm_client
+
+
+class FakeResponse:
+    status_code = 200
+    headers: dict = {}
+
+    def __init__(self, message: dict):
+        self._message = message
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"choices": [{"message": self._message}]}
+
+
+def _menu_content(price) -> str:
+    return json.dumps(
+        {
+            "date": "2030-01-01",
+            "day_of_week": "Tuesday",
+            "menu_items": [{"name": "Guláš", "price": price}],
+            "source_url": "https://e.com",
+        }
+    )
+
+
+def test_local_mode_uses_one_round_trip(monkeypatch):
+    payloads = []
+
+    def fake_post(url, headers, json, timeout):
+        payloads.append(json)
+        return FakeResponse({"content": _menu_content("145,- Kč")})
+
+    monkeypatch.setattr(llm_client, "PRICE_MODE", "local")
+    monkeypatch.setattr(llm_client.requests, "post", fake_post)
+
+    menu = llm_client.call_openai_menu(
+        "https://e.com", "Guláš 145,- Kč", date(2030, 1, 1)
+    )
+
+    assert len(payloads) == 1
+    assert "tools" not in payloads[0]
+    assert "normalize_prices" not in payloads[0]["messages"][0]["content"]
+    assert menu["menu_items"][0]["price"] == 145.0
+
+
+def test_tool_mode_is_still_available(monkeypatch):
+    responses = [
+        FakeResponse(
+            {
+                "content": None,
+                "tool_calls": [
+                    {
+                        "id": "call_1",
+                        "type": "function",
+                        "function": {
+                            "name": "normalize_prices",
+                            "arguments": json.dumps({"prices": ["99,-"]}),
+                        },
+                    }
+                ],
+            }
+        ),
+        FakeResponse({"content": _menu_content(99)}),
+    ]
+    payloads = []
+
+    def fake_post(url, headers, json, timeout):
+        payloads.append(json)
+        return responses.pop(0)
+
+    monkeypatch.setattr(llm_client, "PRICE_MODE", "tool")
+    monkeypatch.setattr(llm_client.requests, "post", fake_post)
+
+    menu = llm_client.call_openai_menu("https://e.com", "Guláš 99,-", date(2030, 1, 1))
+
+    assert len(payloads) == 2
+    assert payloads[0]["tools"][0]["function"]["name"] == "normalize_prices"
+    assert payloads[1]["messages"][-1]["content"] == '{"normalized": [99.0]}'
+    assert menu["menu_items"][0]["price"] == 99.0
+
+
+def test_extraction_key_depends_on_price_mode(monkeypatch):
+    monkeypatch.setattr(llm_client, "PRICE_MODE", "local")
+    local_key = llm_client.extraction_key("page")
+    monkeypatch.setattr(llm_client, "PRICE_MODE", "tool")
+    assert llm_client.extraction_key("page") != local_key
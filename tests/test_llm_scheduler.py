@@ -0,0 +1,181 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import requests
+
+from app.services import llm_scheduler
+from app.services.llm_scheduler import (
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    LLMScheduler,
+    TokenBucket,
+    llm_priority,
+    retry_after_seconds,
+)
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None, usage=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._usage = usage
+
+    def json(self):
+        return {"usage": {"total_tokens": self._usage}} if self._usage else {}
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(per_minute=60, now=0.0)
+
+    bucket.take(60, now=0.0)
+
+    assert bucket.wait_time(1, now=0.0) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now=1.0) == pytest.approx(0.0)
+    assert bucket.wait_time(1000, now=1.0) == pytest.approx(59.0)
+
+
+def test_retry_after_header_forms():
+    assert retry_after_seconds({"Retry-After": "3"}) == 3.0
+    assert retry_after_seconds({"retry-after-ms": "250"}) == 0.25
+    assert retry_after_seconds({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0
+    assert retry_after_seconds({}) is None
+
+
+def test_retries_throttled_calls_honouring_retry_after(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(llm_scheduler.time, "sleep", sleeps.append)
+    scheduler = LLMScheduler(requests_per_minute=0, tokens_per_minute=0)
+    responses = iter(
+        [
+            FakeResponse(429, {"Retry-After": "0.01"}),
+            FakeResponse(503),
+            FakeResponse(200, usage=120),
+        ]
+    )
+
+    response = scheduler.run(lambda: next(responses), tokens=100)
+
+    assert response.status_code == 200
+    assert sleeps[0] == 0.01
+    assert 1.0 <= sleeps[1] <= 2.0
+    assert scheduler.stats()["retries"] == 2
+
+
+def test_gives_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr(llm_scheduler.time, "sleep", lambda s: None)
+    scheduler = LLMScheduler(0, 0, max_retries=2, backoff_base=0.001)
+    calls = []
+
+    def send():
+        calls.append(1)
+        return FakeResponse(429)
+
+    assert scheduler.run(send, tokens=1).status_code == 429
+    assert len(calls) == 3
+    assert scheduler.run(lambda: FakeResponse(400), tokens=1).status_code == 400
+
+
+def test_interactive_calls_overtake_queued_batch_work():
+    scheduler = LLMScheduler(requests_per_minute=0, tokens_per_minute=0)
+    scheduler.paused_until = time.monotonic() + 0.2
+    order = []
+
+    def call(name, priority):
+        with llm_priority(priority):
+            scheduler.run(lambda: order.append(name) or FakeResponse(200), tokens=1)
+
+    threads = [
+        threading.Thread(target=call, args=(f"batch-{i}", PRIORITY_BATCH))
+        for i in range(3)
+    ]
+    for t in threads:
+        t.start()
+    while scheduler.stats()["queued"] < 3:
+        time.sleep(0.005)
+    interactive = threading.Thread(target=call, args=("user", PRIORITY_INTERACTIVE))
+    interactive.start()
+    for t in threads + [interactive]:
+        t.join(timeout=5)
+
+    assert order[0] == "user"
+    assert sorted(order[1:]) == ["batch-0", "batch-1", "batch-2"]
+
+
+def test_token_budget_charges_reported_usage():
+    scheduler = LLMScheduler(requests_per_minute=0, tokens_per_minute=6000)
+
+    scheduler.run(lambda: FakeResponse(200, usage=5500), tokens=1000)
+
+    assert scheduler.tokens.wait_time(1000, time.monotonic()) > 0
+
+
+def test_async_waiters_do_not_hold_threads():
+    scheduler = LLMScheduler(requests_per_minute=0, tokens_per_minute=0)
+    scheduler.paused_until = time.monotonic() + 0.2
+
+    async def call():
+        async def send():
+            return FakeResponse(200)
+
+        return await scheduler.run_async(send, tokens=1)
+
+    async def run_all():
+        waiters = [asyncio.ensure_future(call()) for _ in range(100)]
+        await asyncio.sleep(0.05)
+        queued = scheduler.stats()["queued"]
+        # The default executor is still free while 100 calls wait.
+        await asyncio.wait_for(asyncio.to_thread(lambda: None), timeout=1)
+        return queued, await asyncio.gather(*waiters)
+
+    started = threading.active_count()
+    queued, responses = asyncio.run(run_all())
+
+    assert queued == 100
+    assert len(responses) == 100
+    assert threading.active_count() <= started + 1
+
+
+def test_retried_responses_are_closed():
+    scheduler = LLMScheduler(requests_per_minute=0, tokens_per_minute=0, backoff_base=0)
+    closed = []
+
+    class ClosingResponse(FakeResponse):
+        def close(self):
+            closed.append(self.status_code)
+
+    responses = iter([ClosingResponse(503), ClosingResponse(200)])
+    response = scheduler.run(lambda: next(responses), tokens=1)
+
+    assert response.status_code == 200
+    assert closed == [503]
+
+
+def test_only_connect_errors_are_retried():
+    scheduler = LLMScheduler(requests_per_minute=0, tokens_per_minute=0, backoff_base=0)
+    errors = iter([requests.ConnectionError("refused"), requests.ReadTimeout("slow")])
+    calls = []
+
+    def send():
+        calls.append(1)
+        raise next(errors)
+
+    with pytest.raises(requests.ReadTimeout):
+        scheduler.run(send, tokens=1)
+    assert len(calls) == 2
+
+
+def test_retries_stop_at_the_retry_budget(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(llm_scheduler.time, "sleep", sleeps.append)
+    scheduler = LLMScheduler(0, 0, max_retries=10, retry_budget=5)
+    responses = iter(
+        [
+            FakeResponse(429, {"Retry-After": "3"}),
+            FakeResponse(429, {"Retry-After": "9"}),
+        ]
+    )
+
+    assert scheduler.run(lambda: next(responses), tokens=1).status_code == 429
+    assert sleeps == [3.0]
@@ -0,0 +1,82 @@
+from datetime import date
+
+import pytest
+import requests
+
+from app.services import llm_client
+from app.services.llm_client import LLMBackend, set_backend
+from benchmarks.llm_stub_server import start_in_thread
+
+
+@pytest.fixture
+def stub():
+    server = start_in_thread(port=0)
+    previous = set_backend(
+        LLMBackend(
+            base_url=f"http://127.0.0.1:{server.server_port}/v1",
+            model="stub-model",
+            api_key="test",
+            timeout=5,
+        )
+    )
+    yield server
+    set_backend(previous)
+    server.shutdown()
+
+
+def test_single_day_extraction_against_stub(stub):
+    menu = llm_client.call_openai_menu(
+        "https://example.com/menu", "Středa 19.11.", date(2031, 1, 8)
+    )
+
+    assert menu["date"] == "2031-01-08"
+    assert [item["price"] for item in menu["menu_items"]] == [45, 165, 159, 149]
+    assert stub.stats["requests"] == 1
+
+
+def test_tool_call_turn_is_replayed(stub, monkeypatch):
+    monkeypatch.setattr(llm_client, "PRICE_MODE", "tool")
+
+    menu = llm_client.call_openai_menu(
+        "https://example.com/menu", "Středa 19.11.", date(2031, 1, 8)
+    )
+
+    assert stub.stats["requests"] == 2
+    assert menu["menu_items"][1]["price"] == 165
+
+
+def test_week_extraction_fills_prompt_dates(stub):
+    week = llm_client.call_openai_week_menu(
+        "https://example.com/menu", "Týdenní menu", date(2031, 1, 8)
+    )
+
+    assert sorted(week["days"]) == [
+        "2031-01-06",
+        "2031-01-07",
+        "2031-01-08",
+        "2031-01-09",
+        "2031-01-10",
+    ]
+
+
+def test_injected_errors_carry_retry_after():
+    server = start_in_thread(port=0, error_rate=1.0)
+    try:
+        resp = requests.post(
+            f"http://127.0.0.1:{server.server_port}/v1/chat/completions",
+            json={"model": "stub", "messages": []},
+            timeout=5,
+        )
+    finally:
+        server.shutdown()
+
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "1"
+    assert server.stats["errors"] == 1
+
+
+def test_backend_model_is_part_of_the_extraction_key(stub):
+    key = llm_client.extraction_key("page")
+    set_backend(LLMBackend(base_url="http://x/v1", model="other", api_key="k"))
+
+    assert llm_client.extraction_key("page") != key
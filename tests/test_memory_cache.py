@@ -0,0 +1,41 @@
+from app.db import db
+from app.services import cache
+from app.services.cache import MemoryMenuCache
+
+
+def test_lru_evicts_least_recently_used():
+    mem = MemoryMenuCache(max_entries=2)
+    mem.put("a", "2030-01-01", {"n": "a"})
+    mem.put("b", "2030-01-01", {"n": "b"})
+    assert mem.get("a", "2030-01-01") == {"n": "a"}
+
+    mem.put("c", "2030-01-01", {"n": "c"})
+
+    assert mem.get("b", "2030-01-01") is None
+    assert mem.get("a", "2030-01-01") is not None
+    assert mem.stats()["hits"] == 2
+    assert mem.stats()["misses"] == 1
+
+
+def test_entries_expire_after_their_day():
+    mem = MemoryMenuCache(max_entries=10)
+    mem.put("a", "2030-01-01", {"n": "a"})
+    end_of_day = cache._end_of_day("2030-01-01")
+
+    assert mem.get("a", "2030-01-01", now=end_of_day - 1) is not None
+    assert mem.get("a", "2030-01-01", now=end_of_day) is None
+
+
+def test_hits_are_served_without_touching_sqlite(test_db, monkeypatch):
+    cache.save_menu("https://example.com/menu", "2030-01-01", {"menu_items": []})
+
+    def fail(*args, **kwargs):
+        raise AssertionError("SQLite should not be queried on a memory hit")
+
+    monkeypatch.setattr(db, "get_cached_menu", fail)
+
+    menu = cache.get_cached_menu("https://example.com/menu", "2030-01-01")
+    menu["cached"] = True
+    assert cache.get_cached_menu("https://example.com/menu", "2030-01-01") == {
+        "menu_items": []
+    }
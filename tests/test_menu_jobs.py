@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import main
+from app import create_app
+from app.db import db
+from app.services import jobs, menu_service
+from app.metrics import span
+
+PAYLOAD = {"url": "https://example.com/jobs", "date": "2031-01-08"}
+
+
+@pytest.fixture
+def client(test_db, monkeypatch):
+    monkeypatch.setattr(menu_service, "fetch_page_text", lambda url: f"Menu {url}")
+    monkeypatch.setattr(menu_service, "WEEKLY_EXTRACTION", False)
+
+    release = threading.Event()
+    calls = []
+
+    def fake_call_openai_menu(url, page_text, target_date, mode="strict"):
+        calls.append(url)
+        with span("llm.request"):
+            release.wait(5)
+        return {
+            "restaurant_name": "Test",
+            "date": target_date.isoformat(),
+            "day_of_week": target_date.strftime("%A"),
+            "menu_items": [{"category": "main", "name": "Guláš", "price": 150}],
+            "daily_menu": True,
+            "source_url": url,
+        }
+
+    monkeypatch.setattr(menu_service, "call_openai_menu", fake_call_openai_menu)
+    with main.app.test_client() as test_client:
+        test_client.release = release
+        test_client.calls = calls
+        yield test_client
+    release.set()
+    jobs.shutdown_job_workers()
+
+
+def _wait_for(client, job_id, status, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        body = client.get(f"/api/menu/jobs/{job_id}").json
+        if body["status"] == status:
+            return body
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} never reached {status}: {body}")
+
+
+def test_job_runs_in_background_and_reports_progress(client):
+    resp = client.post("/api/menu/jobs", json=PAYLOAD)
+
+    assert resp.status_code == 202
+    job = resp.json
+    assert resp.headers["Location"] == job["status_url"]
+
+    running = _wait_for(client, job["job_id"], "running")
+    deadline = time.monotonic() + 5
+    while running["stage"] != "extracting" and time.monotonic() < deadline:
+        running = client.get(job["status_url"]).json
+    assert running["stage"] == "extracting"
+
+    duplicate = client.post("/api/menu/jobs", json=PAYLOAD)
+    assert duplicate.json["job_id"] == job["job_id"]
+
+    client.release.set()
+    done = _wait_for(client, job["job_id"], "done")
+    assert done["http_status"] == 200
+    assert done["result"]["menu_items"][0]["name"] == "Guláš"
+    assert client.calls == [PAYLOAD["url"]]
+
+    cached = client.post("/api/menu/jobs", json=PAYLOAD)
+    assert cached.status_code == 200
+    assert cached.json["cached"] is True
+
+
+def test_event_stream_ends_with_result(client):
+    job = client.post("/api/menu/jobs", json=PAYLOAD).json
+    client.release.set()
+
+    resp = client.get(job["events_url"])
+
+    assert resp.mimetype == "text/event-stream"
+    text = resp.get_data(as_text=True)
+    assert text.rstrip().split("\n\n")[-1].startswith("event: done")
+    assert '"status": "done"' in text
+
+
+def test_unknown_job_and_validation_errors(client):
+    assert client.get("/api/menu/jobs/nope").status_code == 404
+    assert client.post("/api/menu/jobs", json={"date": "2031-01-08"}).status_code == 400
+
+
+def test_interrupted_jobs_are_resumed(client):
+    db.create_job("stale", PAYLOAD["url"], PAYLOAD["date"])
+    assert db.claim_job("stale", "dead-worker")
+    client.release.set()
+
+    with db.get_connection() as conn, conn:
+        conn.execute("UPDATE menu_jobs SET updated_at = 0 WHERE id = 'stale'")
+
+    assert jobs.resume_pending_jobs() == 1
+    assert _wait_for(client, "stale", "done")["http_status"] == 200
+
+
+def test_building_the_app_does_not_resume_jobs(client):
+    db.create_job("queued", PAYLOAD["url"], PAYLOAD["date"])
+
+    create_app()
+
+    assert db.get_job("queued")["status"] == "queued"
+    assert client.calls == []
+
+
+def test_asgi_startup_resumes_jobs(client):
+    pytest.importorskip("httpx")
+    pytest.importorskip("asgiref")
+    from app.asgi import create_asgi_app
+
+    db.create_job("queued", PAYLOAD["url"], PAYLOAD["date"])
+    client.release.set()
+    messages = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+    sent = []
+
+    async def receive():
+        return next(messages)
+
+    async def send(message):
+        sent.append(message["type"])
+
+    asyncio.run(create_asgi_app(main.app)({"type": "lifespan"}, receive, send))
+
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+    assert _wait_for(client, "queued", "done")["http_status"] == 200
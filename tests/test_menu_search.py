@@ -0,0 +1,119 @@
+import pytest
+
+import main
+from app.db import db
+
+
+def _menu(name, items):
+    return {
+        "restaurant_name": name,
+        "date": "",
+        "day_of_week": "",
+        "menu_items": [
+            {"category": c, "name": n, "price": p, "allergens": a, "weight": None}
+            for c, n, p, a in items
+        ],
+        "daily_menu": True,
+        "source_url": "",
+    }
+
+
+@pytest.fixture
+def client(test_db):
+    db.save_menu(
+        "https://a.example/",
+        "2031-01-06",
+        _menu(
+            "A",
+            [
+                ("soup", "Česnečka", 45, ["1"]),
+                ("Main", "Svíčková na smetaně", 165, ["1", "7"]),
+                ("main", "Kuřecí řízek", 139, ["1", "3"]),
+            ],
+        ),
+    )
+    db.save_menu(
+        "https://b.example/",
+        "2031-01-06",
+        _menu(
+            "B",
+            [
+                ("main", "Zeleninové rizoto", 129, ["7"]),
+                ("main", "Smažený květák", None, []),
+            ],
+        ),
+    )
+    db.save_menu(
+        "https://b.example/",
+        "2031-01-08",
+        _menu("B", [("main", "Svíčková", 149, ["7"])]),
+    )
+    with main.app.test_client() as test_client:
+        yield test_client
+
+
+def _names(resp):
+    assert resp.status_code == 200, resp.json
+    return [item["name"] for item in resp.json["items"]]
+
+
+def test_cheap_mains_without_allergen(client):
+    resp = client.get(
+        "/api/menus/search?date=2031-01-06&category=main&max_price=150"
+        "&exclude_allergens=7"
+    )
+
+    assert _names(resp) == ["Kuřecí řízek"]
+    assert resp.json["items"][0]["allergens"] == ["1", "3"]
+    assert resp.json["items"][0]["url"] == "https://a.example/"
+
+
+def test_full_text_ignores_diacritics_and_spans_the_week(client):
+    resp = client.get("/api/menus/search?q=svickova&week=2031-01-07")
+
+    assert _names(resp) == ["Svíčková na smetaně", "Svíčková"]
+    assert resp.json["date_from"] == "2031-01-06"
+    assert resp.json["date_to"] == "2031-01-12"
+
+
+def test_filters_by_restaurant_and_pages(client):
+    first = client.get(
+        "/api/menus/search?date_from=2031-01-06&date_to=2031-01-08"
+        "&url=https://b.example/&limit=2"
+    )
+    second = client.get(
+        "/api/menus/search?date_from=2031-01-06&date_to=2031-01-08"
+        f"&url=https://b.example/&limit=2&offset={first.json['next_offset']}"
+    )
+
+    assert _names(first) == ["Zeleninové rizoto", "Smažený květák"]
+    assert _names(second) == ["Svíčková"]
+    assert second.json["next_offset"] is None
+
+
+def test_search_index_follows_purges(client):
+    db.delete_old_cache("2031-01-07")
+
+    resp = client.get("/api/menus/search?q=svíčková&week=2031-01-06")
+    assert _names(resp) == ["Svíčková"]
+
+
+def test_search_uses_indexes(client):
+    with db.get_connection() as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM menu_items "
+            "WHERE category = 'main' AND price <= 150"
+        ).fetchall()
+    assert any("idx_menu_items_category_price" in row[-1] for row in plan)
+
+
+def test_invalid_parameters(client):
+    assert client.get("/api/menus/search?date=nope").status_code == 400
+    assert client.get("/api/menus/search?limit=0").status_code == 400
+    assert client.get("/api/menus/search?max_price=abc").status_code == 400
+    assert (
+        client.get(
+            "/api/menus/search?date_from=2031-01-08&date_to=2031-01-06"
+        ).status_code
+        == 400
+    )
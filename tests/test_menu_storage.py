@@ -0,0 +1,99 @@
+import json
+import sqlite3
+
+from app.db import db
+
+MENU = {
+    "restaurant_name": "Jídelna",
+    "date": "2030-01-01",
+    "day_of_week": "Tuesday",
+    "menu_items": [
+        {
+            "category": "soup",
+            "name": "Česnečka",
+            "price": 45.0,
+            "allergens": ["1", "7"],
+            "weight": "0,33l",
+        },
+        {
+            "category": "main",
+            "name": "Svíčková",
+            "price": None,
+            "allergens": [],
+            "weight": None,
+        },
+    ],
+    "daily_menu": True,
+    "source_url": "https://example.com/menu",
+}
+
+
+def test_menu_round_trips_and_is_normalized(test_db):
+    db.save_menu("https://example.com/menu", "2030-01-01", MENU)
+
+    assert db.get_cached_menu("https://example.com/menu", "2030-01-01") == MENU
+    with db.get_connection() as conn:
+        menu_row = conn.execute(
+            "SELECT restaurant_name, item_count, daily_menu FROM menus"
+        ).fetchone()
+        items = conn.execute(
+            "SELECT position, category, name, price FROM menu_items ORDER BY position"
+        ).fetchall()
+        allergens = conn.execute(
+            "SELECT allergen FROM menu_item_allergens ORDER BY allergen"
+        ).fetchall()
+
+    assert menu_row == ("Jídelna", 2, 1)
+    assert items == [(0, "soup", "Česnečka", 45.0), (1, "main", "Svíčková", None)]
+    assert allergens == [("1",), ("7",)]
+
+
+def test_resaving_and_purging_replace_child_rows(test_db):
+    db.save_menu("https://example.com/menu", "2030-01-01", MENU)
+    db.save_menu("https://example.com/menu", "2030-01-01", MENU)
+
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM menu_items").fetchone()[0] == 2
+
+    assert db.delete_old_cache("2030-01-02") == 1
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM menu_items").fetchone()[0] == 0
+        assert (
+            conn.execute("SELECT COUNT(*) FROM menu_item_allergens").fetchone()[0] == 0
+        )
+
+
+def test_legacy_menu_cache_rows_are_migrated(tmp_path, monkeypatch):
+    path = tmp_path / "legacy.db"
+    legacy = sqlite3.connect(path)
+    legacy.execute(
+        "CREATE TABLE menu_cache (url TEXT NOT NULL, date TEXT NOT NULL, "
+        "menu_json TEXT NOT NULL, created_at TEXT NOT NULL, PRIMARY KEY (url, date))"
+    )
+    legacy.execute(
+        "INSERT INTO menu_cache VALUES (?, ?, ?, ?)",
+        (
+            "https://example.com/menu",
+            "2030-01-01",
+            json.dumps(MENU, ensure_ascii=False),
+            "2029-12-31T10:00:00+00:00",
+        ),
+    )
+    legacy.commit()
+    legacy.close()
+    monkeypatch.setattr(db, "DB_PATH", str(path))
+
+    try:
+        db.init_db()
+        db.init_db()
+
+        assert db.get_cached_menu("https://example.com/menu", "2030-01-01") == MENU
+        with db.get_connection() as conn:
+            tables = {
+                row[0]
+                for row in conn.execute("SELECT name FROM sqlite_master")
+                if row[0]
+            }
+        assert "menu_cache" not in tables
+    finally:
+        db.close_connections()
@@ -0,0 +1,98 @@
+import json
+from datetime import date
+
+import pytest
+
+import main
+from app.db import db
+from app.services import menu_stream
+from app.services.cache import get_cached_menu
+from app.services.llm_client import LLMBackend, set_backend
+from app.services.llm_stream import MenuItemParser, stream_openai_menu
+from benchmarks.llm_stub_server import start_in_thread
+
+URL = "https://example.com/menu"
+DATE = "2031-01-08"
+
+
+@pytest.fixture
+def stub(test_db):
+    server = start_in_thread(port=0)
+    previous = set_backend(
+        LLMBackend(
+            base_url=f"http://127.0.0.1:{server.server_port}/v1",
+            model="stub-model",
+            api_key="test",
+            timeout=5,
+        )
+    )
+    yield server
+    set_backend(previous)
+    server.shutdown()
+
+
+def _events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_parser_returns_each_item_once_its_object_closes():
+    text = (
+        '```json\n{"restaurant_name": "U \\"Lípy\\"", "menu_items": ['
+        '{"name": "Vývar {s nudlemi}", "allergens": ["1", "9"], "price": "45,-"},'
+        '{"name": "Guláš", "price": 159}], "daily_menu": true}\n```'
+    )
+    parser = MenuItemParser()
+    seen = []
+    for end, ch in enumerate(text):
+        for item in parser.feed(ch):
+            seen.append((item["name"], text[: end + 1].endswith("}")))
+
+    assert seen == [("Vývar {s nudlemi}", True), ("Guláš", True)]
+    assert parser.fields["restaurant_name"] == 'U "Lípy"'
+
+
+def test_streamed_items_precede_the_validated_menu(stub):
+    events = list(stream_openai_menu(URL, "Středa 19.11.", date(2031, 1, 8)))
+
+    kinds = [kind for kind, _ in events]
+    menu = events[-1][1]
+    items = [value for kind, value in events if kind == "item"]
+    assert kinds[-1] == "menu" and "restaurant" in kinds
+    assert items == menu["menu_items"]
+    assert [item["price"] for item in items] == [45, 165, 159, 149]
+    assert stub.stats["requests"] == 1
+
+
+def test_stream_route_sends_items_then_caches_the_menu(stub, monkeypatch):
+    monkeypatch.setattr(menu_stream, "fetch_page_text", lambda url: "Středa 19.11.")
+
+    client = main.app.test_client()
+    query = {"url": URL, "date": DATE}
+    first = client.get("/api/menu/stream", query_string=query)
+    events = _events(first.get_data(as_text=True))
+    again = client.get("/api/menu/stream", query_string=query)
+
+    assert first.mimetype == "text/event-stream"
+    kinds = [kind for kind, _ in events]
+    assert kinds[0] == "start" and kinds[-1] == "done"
+    assert kinds.count("item") == 4
+    done = events[-1][1]
+    assert done["cached"] is False and len(done["menu_items"]) == 4
+    assert get_cached_menu(URL, DATE)["menu_items"] == done["menu_items"]
+
+    cached = _events(again.get_data(as_text=True))
+    assert [kind for kind, _ in cached] == ["done"]
+    assert cached[0][1]["cached"] is True
+    assert stub.stats["requests"] == 1
+
+
+def test_stream_route_reports_errors_with_status(stub):
+    resp = main.app.test_client().get("/api/menu/stream", query_string={"date": DATE})
+
+    assert _events(resp.get_data(as_text=True)) == [
+        ("error", {"error": "Missing 'url' in JSON payload.", "status": 400})
+    ]
@@ -0,0 +1,99 @@
+import pytest
+
+import app as app_package
+from app.db import db
+from app.metrics import LLM_TOKENS, MENU_REQUESTS, STAGE_SECONDS, Registry, span
+from app.services import menu_service
+from app.services.llm_scheduler import LLMScheduler
+
+
+@pytest.fixture
+def client(test_db, monkeypatch):
+    monkeypatch.setattr(app_package, "SERVER_TIMING", True)
+    monkeypatch.setattr(menu_service, "fetch_page_text", lambda url: f"Menu {url}")
+    monkeypatch.setattr(menu_service, "WEEKLY_EXTRACTION", False)
+
+    def fake_call_openai_menu(url, page_text, target_date, mode="strict"):
+        with span("llm.request"):
+            pass
+        return {
+            "restaurant_name": "Test",
+            "date": target_date.isoformat(),
+            "day_of_week": target_date.strftime("%A"),
+            "menu_items": [{"category": "main", "name": "Guláš", "price": 150}],
+            "daily_menu": True,
+            "source_url": url,
+        }
+
+    monkeypatch.setattr(menu_service, "call_openai_menu", fake_call_openai_menu)
+    flask_app = app_package.create_app()
+    flask_app.testing = True
+    with flask_app.test_client() as test_client:
+        yield test_client
+
+
+def test_counters_and_histograms_render_as_prometheus_text():
+    registry = Registry()
+    hits = registry.counter("hits_total", "Hits.", ["cache"])
+    seconds = registry.histogram("stage_seconds", "Stages.", ["stage"])
+    registry.gauges("pool", "Pool.", lambda: {"size": 3})
+
+    hits.inc(cache="hit")
+    hits.inc(2, cache="miss")
+    seconds.observe(0.003, stage='a"b')
+
+    text = registry.render()
+    assert '# TYPE hits_total counter\nhits_total{cache="hit"} 1\n' in text
+    assert 'hits_total{cache="miss"} 2' in text
+    assert 'stage_seconds_bucket{stage="a\\"b",le="0.001"} 0' in text
+    assert 'stage_seconds_bucket{stage="a\\"b",le="0.005"} 1' in text
+    assert 'stage_seconds_count{stage="a\\"b"} 1' in text
+    assert 'pool{kind="size"} 3' in text
+
+
+def test_menu_request_is_instrumented(client):
+    misses = MENU_REQUESTS.value(cache="miss")
+    hits = MENU_REQUESTS.value(cache="hit")
+    saves = STAGE_SECONDS.count(stage="db.save_menu")
+    payload = {"url": "https://example.com/metrics", "date": "2031-01-08"}
+
+    first = client.post("/api/menu", json=payload)
+    second = client.post("/api/menu", json=payload)
+
+    assert MENU_REQUESTS.value(cache="miss") == misses + 1
+    assert MENU_REQUESTS.value(cache="hit") == hits + 1
+    assert STAGE_SECONDS.count(stage="db.save_menu") == saves + 1
+    timing = first.headers["Server-Timing"]
+    assert "llm.request;dur=" in timing and "menu.extract;dur=" in timing
+    assert "total;dur=" in timing
+    assert "llm.request" not in second.headers["Server-Timing"]
+
+    metrics = client.get("/api/metrics")
+    assert metrics.status_code == 200
+    assert metrics.mimetype == "text/plain"
+    assert 'menu_stage_duration_seconds_count{stage="request"}' in metrics.text
+    assert 'menu_memory_cache{kind="entries"}' in metrics.text
+    assert "Server-Timing" not in metrics.headers
+
+
+def test_llm_token_usage_is_counted():
+    class FakeResponse:
+        status_code = 200
+        headers: dict = {}
+
+        def json(self):
+            return {
+                "usage": {
+                    "prompt_tokens": 1200,
+                    "completion_tokens": 300,
+                    "total_tokens": 1500,
+                }
+            }
+
+    prompt = LLM_TOKENS.value(kind="prompt")
+    completion = LLM_TOKENS.value(kind="completion")
+
+    LLMScheduler(0, 0).run(FakeResponse, tokens=1000)
+
+    assert LLM_TOKENS.value(kind="prompt") == prompt + 1200
+    assert LLM_TOKENS.value(kind="completion") == completion + 300
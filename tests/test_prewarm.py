@@ -0,0 +1,73 @@
+import threading
+from datetime import date, datetime
+
+import pytest
+
+from app.db import db
+from app.services import menu_service, prewarm
+from app.services.cache import get_cached_menu
+
+
+@pytest.fixture
+def subscribed(test_db, monkeypatch):
+    monkeypatch.setattr(
+        menu_service, "fetch_page_text", lambda url: f"Fake page for {url}"
+    )
+    monkeypatch.setattr(menu_service, "WEEKLY_EXTRACTION", False)
+    for i in range(3):
+        db.add_subscription(f"https://example.com/{i}")
+
+
+def test_subscriptions_registry(subscribed):
+    assert db.add_subscription("https://example.com/0") is False
+    assert db.remove_subscription("https://example.com/1") is True
+    assert db.remove_subscription("https://example.com/1") is False
+    assert db.list_subscriptions() == ["https://example.com/0", "https://example.com/2"]
+
+
+def test_prewarm_dates_cover_rest_of_working_week():
+    wednesday = date(2030, 1, 2)
+
+    assert prewarm.prewarm_dates(wednesday, False) == [wednesday]
+    assert [d.day for d in prewarm.prewarm_dates(wednesday, True)] == [2, 3, 4]
+    assert prewarm.prewarm_dates(date(2030, 1, 5), True) == [date(2030, 1, 5)]
+
+
+def test_prewarm_fills_cache_for_every_subscription(subscribed, monkeypatch):
+    lock = threading.Lock()
+    calls = []
+
+    def fake_call_openai_menu(url, page_text, target_date, mode="strict"):
+        with lock:
+            calls.append((url, target_date))
+        return {
+            "restaurant_name": "Test",
+            "date": target_date.isoformat(),
+            "day_of_week": target_date.strftime("%A"),
+            "menu_items": [{"category": "main", "name": "Guláš", "price": 150}],
+            "daily_menu": True,
+            "source_url": url,
+        }
+
+    monkeypatch.setattr(menu_service, "call_openai_menu", fake_call_openai_menu)
+    thursday = date(2030, 1, 3)
+
+    summary = prewarm.prewarm(
+        today=thursday, include_week=True, concurrency=2, rate_per_minute=0
+    )
+
+    assert summary["subscriptions"] == 3
+    assert summary["warmed"] == 6 and summary["failed"] == 0
+    assert len(calls) == 6
+    assert get_cached_menu("https://example.com/2", "2030-01-04") is not None
+
+    again = prewarm.prewarm(today=thursday, include_week=True, rate_per_minute=0)
+    assert again["warmed"] == 6
+    assert len(calls) == 6
+
+
+def test_seconds_until_next_run():
+    now = datetime(2030, 1, 2, 9, 30)
+
+    assert prewarm.seconds_until("10:00", now) == 30 * 60
+    assert prewarm.seconds_until("09:00", now) == 23.5 * 3600
@@ -0,0 +1,128 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+
+import main
+from app.db import db
+from app.domain.responses import encode_menu_response, negotiate
+from app.services import menu_service
+from app.services.cache import memory_cache, save_menu
+
+URL = "https://example.com/menu"
+DATE = "2031-01-06"
+MENU = {
+    "restaurant_name": "Jídelna",
+    "date": DATE,
+    "day_of_week": "Monday",
+    "menu_items": [{"category": "main", "name": "Svíčková", "price": 165.0}],
+    "daily_menu": True,
+    "source_url": URL,
+}
+
+
+@pytest.fixture
+def client(test_db, monkeypatch):
+    save_menu(URL, DATE, MENU)
+
+    def no_extraction(*args, **kwargs):
+        raise AssertionError("cache hits must not reach the extraction path")
+
+    monkeypatch.setattr(menu_service, "handle_menu_request", no_extraction)
+    monkeypatch.setattr("app.route.routes.handle_menu_request", no_extraction)
+    with main.app.test_client() as test_client:
+        yield test_client
+
+
+def test_hit_is_served_compressed_with_etag(client):
+    resp = client.get(
+        f"/api/menu?url={URL}&date={DATE}", headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert resp.status_code == 200
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.headers["Vary"] == "Accept-Encoding"
+    assert resp.headers["ETag"].endswith('-gzip"')
+    assert json.loads(gzip.decompress(resp.data)) == {**MENU, "cached": True}
+
+
+def test_if_none_match_returns_304(client):
+    first = client.post("/api/menu", json={"url": URL, "date": DATE})
+    etag = first.headers["ETag"]
+
+    again = client.post(
+        "/api/menu", json={"url": URL, "date": DATE}, headers={"If-None-Match": etag}
+    )
+    polled = client.get(
+        f"/api/menu?url={URL}&date={DATE}",
+        headers={"If-None-Match": etag, "Accept-Encoding": "gzip"},
+    )
+
+    assert first.status_code == 200
+    assert first.json["cached"] is True
+    assert "Content-Encoding" not in first.headers
+    assert (again.status_code, again.data) == (304, b"")
+    assert polled.status_code == 304
+
+
+def test_changed_menu_gets_a_new_etag(client):
+    etag = client.get(f"/api/menu?url={URL}&date={DATE}").headers["ETag"]
+    save_menu(URL, DATE, {**MENU, "restaurant_name": "Nová jídelna"})
+
+    resp = client.get(
+        f"/api/menu?url={URL}&date={DATE}", headers={"If-None-Match": etag}
+    )
+
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+    assert resp.json["restaurant_name"] == "Nová jídelna"
+
+
+def test_rows_without_stored_response_are_encoded_on_demand(client):
+    with db.get_connection() as conn, conn:
+        conn.execute("UPDATE menus SET etag = NULL, response_gzip = NULL")
+    memory_cache.clear()
+
+    resp = client.get(f"/api/menu?url={URL}&date={DATE}")
+
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] == f'"{encode_menu_response(MENU).etag}"'
+
+
+def test_negotiate_prefers_identity_without_accept_encoding():
+    encoded = encode_menu_response(MENU)
+
+    status, body, headers = negotiate(encoded, None, None)
+    assert status == 200
+    assert json.loads(body)["cached"] is True
+    assert "Content-Encoding" not in headers
+
+    status, _, headers = negotiate(encoded, "br;q=1, gzip;q=0.5", None)
+    expected = "br" if encoded.br is not None else "gzip"
+    assert headers["Content-Encoding"] == expected
+
+    status, body, _ = negotiate(encoded, "gzip", "*")
+    assert (status, body) == (304, b"")
+
+
+def test_asgi_serves_stored_hit(client):
+    httpx = pytest.importorskip("httpx")
+    pytest.importorskip("asgiref")
+    from app.asgi import create_asgi_app
+
+    async def run():
+        transport = httpx.ASGITransport(app=create_asgi_app(main.app))
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            first = await c.post("/api/menu", json={"url": URL, "date": DATE})
+            second = await c.post(
+                "/api/menu",
+                json={"url": URL, "date": DATE},
+                headers={"If-None-Match": first.headers["ETag"]},
+            )
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first.json()["menu_items"][0]["name"] == "Svíčková"
+    assert second.status_code == 304
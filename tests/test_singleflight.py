@@ -0,0 +1,100 @@
+import threading
+import time
+from datetime import date
+
+import pytest
+
+from app.db import db
+from app.services import menu_service
+from app.services.singleflight import SingleFlight
+
+
+@pytest.fixture
+def test_db(test_db, monkeypatch):
+    monkeypatch.setattr(menu_service, "EXTRACTION_LEASE_POLL", 0.01)
+    monkeypatch.setattr(menu_service, "WEEKLY_EXTRACTION", False)
+
+
+def test_concurrent_callers_share_one_execution():
+    group = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def work():
+        calls.append(1)
+        release.wait(1)
+        return "menu"
+
+    results = []
+
+    def caller():
+        results.append(group.do("key", work))
+
+    threads = [threading.Thread(target=caller) for _ in range(5)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert all(result == "menu" for result, _ in results)
+
+
+def test_concurrent_misses_extract_once(test_db, monkeypatch):
+    calls = []
+
+    def fake_fetch_page_text(url):
+        calls.append(url)
+        time.sleep(0.05)
+        return "page"
+
+    def fake_call_openai_menu(url, page_text, target_date, mode="strict"):
+        return {"menu_items": [{"name": "Guláš"}], "source_url": url}
+
+    monkeypatch.setattr(menu_service, "fetch_page_text", fake_fetch_page_text)
+    monkeypatch.setattr(menu_service, "call_openai_menu", fake_call_openai_menu)
+
+    results = []
+
+    def caller():
+        results.append(menu_service.handle_menu_request("https://e.com", "2030-01-01"))
+
+    threads = [threading.Thread(target=caller) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert [status for _, status in results] == [200] * 4
+
+
+def test_waiter_uses_result_of_other_process(test_db, monkeypatch):
+    assert db.acquire_lease("https://e.com", "2030-01-01", "other-worker", ttl=60)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("should wait for the lease holder instead")
+
+    monkeypatch.setattr(menu_service, "fetch_page_text", fail)
+
+    def other_worker_finishes():
+        time.sleep(0.05)
+        db.save_menu("https://e.com", "2030-01-01", {"menu_items": [{"name": "x"}]})
+        db.release_lease("https://e.com", "2030-01-01", "other-worker")
+
+    threading.Thread(target=other_worker_finishes).start()
+    body, status = menu_service._extract_menu_coalesced(
+        "https://e.com", date(2030, 1, 1)
+    )
+
+    assert status == 200
+    assert body["cached"] is True
+
+
+def test_expired_lease_can_be_taken_over(test_db):
+    assert db.acquire_lease("u", "2030-01-01", "a", ttl=10, now=100)
+    assert not db.acquire_lease("u", "2030-01-01", "b", ttl=10, now=105)
+    assert db.acquire_lease("u", "2030-01-01", "b", ttl=10, now=111)
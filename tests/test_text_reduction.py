@@ -0,0 +1,89 @@
+from datetime import date
+
+from app.services.scraper import html_to_text
+from app.services.text_reduction import (
+    clean_page_text,
+    find_date_headings,
+    reduce_page_text,
+)
+
+WEEKLY_PAGE = """
+Jídelna U Lípy
+Polední menu 17.–21. 11. 2025
+
+Tento web používá cookies. Souhlasím
+
+
+PONDĚLÍ 17.11.2025
+Gulášová polévka   45,-
+Svíčková na smetaně 149,-
+ÚTERÝ
+18. 11. 2025
+Kulajda 49,-
+Smažený sýr 155,-
+STŘEDA 19.11.2025
+Dršťková polévka 45,-
+Vepřový řízek    159,-
+Čtvrtek 20.11.
+Hovězí vývar 45,-
+Copyright © 2025 Jídelna U Lípy
+"""
+
+
+def test_reduce_keeps_only_requested_day_and_header():
+    reduced = reduce_page_text(WEEKLY_PAGE, date(2025, 11, 19))
+
+    assert reduced.startswith("Jídelna U Lípy\nPolední menu")
+    assert "STŘEDA 19.11.2025\nDršťková polévka 45,-\nVepřový řízek 159,-" in reduced
+    assert "Svíčková" not in reduced
+    assert "Hovězí vývar" not in reduced
+    assert "cookies" not in reduced
+
+
+def test_weekday_and_date_on_separate_lines_form_one_heading():
+    headings = find_date_headings(reduce_page_text(WEEKLY_PAGE))
+
+    assert [(h.weekday, h.day, h.month) for h in headings] == [
+        (0, 17, 11),
+        (1, 18, 11),
+        (2, 19, 11),
+        (3, 20, 11),
+    ]
+    assert "Kulajda" in reduce_page_text(WEEKLY_PAGE, date(2025, 11, 18))
+
+
+def test_page_without_matching_heading_is_only_cleaned():
+    reduced = reduce_page_text(WEEKLY_PAGE, date(2025, 11, 24))
+
+    assert "Svíčková na smetaně 149,-" in reduced
+    assert "Copyright" not in reduced
+    assert "\n\n" not in reduced
+
+
+def test_html_to_text_drops_navigation_scripts_and_cookie_banners():
+    html = """
+    <html><body>
+      <nav><a href="/">Domů</a><a href="/kontakt">Kontakt</a></nav>
+      <div id="cookie-banner">Používáme cookies</div>
+      <script>var tracking = 1;</script>
+      <main><h2>Středa</h2><p>Vepřový řízek 159,-</p></main>
+      <footer>Adresa a otevírací doba</footer>
+    </body></html>
+    """
+    text = html_to_text(html)
+
+    assert "Vepřový řízek 159,-" in text
+    for boilerplate in ("Domů", "cookies", "tracking", "otevírací"):
+        assert boilerplate not in text
+
+
+def test_dishes_mentioning_boilerplate_words_are_kept():
+    text = clean_page_text(
+        "Domácí cookie s čokoládou 45 Kč\n"
+        "Cookies & cream 60 Kč\n"
+        "Nastavení cookies\n"
+        "© 2025 Restaurace U Lípy. Všechna práva vyhrazena.\n"
+        "Powered by WordPress"
+    )
+
+    assert text == "Domácí cookie s čokoládou 45 Kč\nCookies & cream 60 Kč"